@@ -2,7 +2,9 @@
 自定义组合图形识别
 """
 
+import numpy as np
 import pandas as pd
+from collections import deque
 from laboratory.singleK import is_limit, is_one_board
 from laboratory.multipleK import get_last_limit_day, get_limit_board_number, get_daily_bars_by_date, is_volume_decreasing, get_ma, is_ma_bullish, get_macd
 from utils.logger import info, error, debug
@@ -129,4 +131,190 @@ def _is_exist_one_board(stock_code: str, daily_bars: pd.DataFrame, m: int = 10)
     for index, row in daily_bars_last.iterrows():
         if is_one_board(stock_code, row['close'], row['preClose'], row['low'], row['high']):
             return True
-    return False
\ No newline at end of file
+    return False
+
+
+class VolumeConsolidationScreener:
+    """
+    涨停后缩量盘整图形的增量筛选器
+    逐日输入新K线时以O(1)更新每只股票的状态（最近涨停日及连板数、最近{m}根K线的一字板数量、
+    涨停日次日至今的成交量递减、最高价、最低价与最低收盘价），无需每日重新检查最近{window}根K线；
+    条件1~7全部满足时，才使用最近{window}根收盘价计算均线（条件8、9）
+
+    判断结果与is_limit_board_after_volume_consolidation对同一股票最近{window}根K线的判断一致（后者作为参考实现）
+    """
+
+    def __init__(self, n: int = 5, m: int = 10, k: int = 2, window: int = 90):
+        """
+        初始化筛选器
+        Args:
+            n: 最近{n}个交易日内存在涨停板，且最近一次涨停最多是二板
+            m: 最近{m}个交易日内不能存在一字板
+            k: 最近{k}个交易日不能是涨停板
+            window: 对应参考实现的日K线数量（如选股时读取的最近90根日K线）
+        """
+        if k < 1 or window < max(n, m) + 2:
+            error(f"无效的筛选参数: n={n}, m={m}, k={k}, window={window}，要求k>=1且window>=max(n, m)+2")
+            raise ValueError(f"无效的筛选参数: n={n}, m={m}, k={k}, window={window}，要求k>=1且window>=max(n, m)+2")
+        self.n = n
+        self.m = m
+        self.k = k
+        self.window = window
+        self.states = {} # 各股票状态 {stock_code: _ConsolidationState}
+
+    def update(self, stock_code: str, bar) -> bool:
+        """
+        输入股票的下一根日K线并更新状态
+        Args:
+            stock_code: 股票代码
+            bar: 日K线，需包含close、preClose、low、high、volume字段
+        Returns:
+            bool: 是否成功
+        """
+        state = self.states.get(stock_code)
+        if state is None:
+            state = self.states[stock_code] = _ConsolidationState(self.m, self.window)
+        close, pre_close, low, high, volume = bar['close'], bar['preClose'], bar['low'], bar['high'], bar['volume']
+        state.position += 1
+        state.closes.append(close)
+
+        # 最近{m}根K线的一字板数量
+        if len(state.one_boards) == self.m:
+            state.one_board_count -= state.one_boards[0]
+        one_board = is_one_board(stock_code, close, pre_close, low, high)
+        state.one_boards.append(one_board)
+        state.one_board_count += one_board
+
+        if is_limit(stock_code, close, pre_close):
+            # 新的涨停日：记录连板数并重置涨停日次日至今的状态
+            state.streak += 1
+            state.limit_position = state.position
+            state.limit_streak = state.streak
+            state.limit_close = close
+            state.limit_volume = volume
+            state.after_count = 0
+            state.next_volume = None
+            state.prev_volume = None
+            state.decreasing = True
+            state.min_low = np.nan
+            state.max_high = np.nan
+            state.min_close = np.nan
+            return True
+
+        state.streak = 0
+        if state.limit_position >= 0:
+            state.after_count += 1
+            if state.after_count == 1:
+                state.next_volume = volume
+            elif volume > state.prev_volume:
+                state.decreasing = False
+            state.prev_volume = volume
+            # 与pandas的min、max一致，忽略缺失值
+            if not np.isnan(low) and not (state.min_low <= low):
+                state.min_low = low
+            if not np.isnan(high) and not (state.max_high >= high):
+                state.max_high = high
+            if not np.isnan(close) and not (state.min_close <= close):
+                state.min_close = close
+        return True
+
+    def is_match(self, stock_code: str) -> bool:
+        """
+        判断股票截至最近一根日K线是否符合涨停后缩量盘整图形
+        Args:
+            stock_code: 股票代码
+        Returns:
+            bool: 是否符合图形要求
+        """
+        state = self.states.get(stock_code)
+        # 条件1：最近{n}个交易日内存在涨停板，且最近一次涨停最多是二板
+        if state is None or state.limit_position < 0 or state.position - state.limit_position >= self.n:
+            return False
+        if state.limit_streak > 2:
+            return False
+        # 条件2：最近{m}个交易日内不能存在一字板
+        if state.one_board_count > 0:
+            return False
+        # 条件3：最近一次涨停日至少早于当前{k}个交易日
+        if state.after_count + 1 <= self.k:
+            return False
+        # 条件4：涨停日次日的成交量不低于涨停日的80%
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = np.float64(state.next_volume) / np.float64(state.limit_volume)
+        if volume_ratio < 0.8:
+            return False
+        # 条件5：涨停日次日至今成交量逐日递减
+        if state.after_count < 2 or not state.decreasing:
+            return False
+        # 条件6：涨停日次日至今日内震荡幅度处于涨停日价格的-3%~6%之间
+        limit_price = state.limit_close
+        if state.min_low / limit_price - 1 < -0.03 or state.max_high / limit_price - 1 > 0.06:
+            return False
+        # 条件7：涨停日次日至今收盘价不破涨停日价格，误差0.005
+        if state.min_close < limit_price * (1 - 0.005):
+            return False
+        # 条件8、9：今日收盘价高于30日均线，且均线多头排列（使用最近{window}根收盘价，与参考实现一致）
+        daily_bars = pd.DataFrame({'close': list(state.closes)})
+        if state.closes[-1] <= get_ma(daily_bars=daily_bars, period=30):
+            return False
+        if not is_ma_bullish(daily_bars=daily_bars):
+            return False
+        return True
+
+    def get_close(self, stock_code: str) -> float:
+        """
+        获取股票最近一根日K线的收盘价
+        Args:
+            stock_code: 股票代码
+        Returns:
+            float: 收盘价，无数据时返回None
+        """
+        state = self.states.get(stock_code)
+        return state.closes[-1] if state is not None else None
+
+    def screen_bars(self, daily_bars: dict, trade_dates: list) -> dict:
+        """
+        按时间顺序输入各股票日K线，筛选每个交易日收盘后符合图形的股票
+        （交易日没有K线的股票使用此前最近一根K线时的状态，与读取截至该交易日的日K线一致）
+        Args:
+            daily_bars: 各股票日K线 {stock_code: DataFrame}，index为日期'YYYYMMDD'
+            trade_dates: 需要筛选的交易日列表（升序）
+        Returns:
+            dict: {trade_date: [(stock_code, close)]}，顺序同daily_bars
+        """
+        result = {trade_date: [] for trade_date in trade_dates}
+        for stock_code, daily_bar in daily_bars.items():
+            dates = daily_bar.index.astype(str).str[:8].tolist()
+            bars = daily_bar[['close', 'preClose', 'low', 'high', 'volume']].to_dict('records')
+            cursor = 0
+            for trade_date in trade_dates:
+                while cursor < len(bars) and dates[cursor] <= trade_date:
+                    self.update(stock_code, bars[cursor])
+                    cursor += 1
+                if self.is_match(stock_code):
+                    result[trade_date].append((stock_code, self.get_close(stock_code)))
+        return result
+
+
+class _ConsolidationState:
+    """
+    单只股票的增量筛选状态
+    """
+
+    def __init__(self, m: int, window: int):
+        self.position = -1 # 最近一根K线的序号
+        self.closes = deque(maxlen=window) # 最近{window}根收盘价
+        self.one_boards = deque(maxlen=m) # 最近{m}根K线是否一字板
+        self.one_board_count = 0 # 最近{m}根K线的一字板数量
+        self.streak = 0 # 截至最近一根K线的连续涨停数
+        self.limit_position = -1 # 最近一次涨停日的序号，-1表示不存在
+        self.limit_streak = 0 # 最近一次涨停是第几板
+        self.limit_close = np.nan # 最近一次涨停日收盘价
+        self.limit_volume = np.nan # 最近一次涨停日成交量
+        self.after_count = 0 # 涨停日次日至今的K线数量
+        self.next_volume = None # 涨停日次日成交量
+        self.prev_volume = None # 最近一根K线成交量
+        self.decreasing = True # 涨停日次日至今成交量是否逐日递减
+        self.min_low = np.nan # 涨停日次日至今最低价
+        self.max_high = np.nan # 涨停日次日至今最高价
+        self.min_close = np.nan # 涨停日次日至今最低收盘价
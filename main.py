@@ -1,13 +1,310 @@
 """
 MoneyDog 主程序入口
-量化交易系统主程序
+量化交易系统命令行：
+    python main.py backtest  回测（默认命令）
+    python main.py sweep     滚动窗口参数寻优
+    python main.py download  下载历史行情数据并构建分时K线归档
+    python main.py bench     性能测试（分阶段计时）
+配置文件只读取一次，命令行参数作为覆盖项应用后显式传递给策略，同一台机器上可并行运行多个不同配置的任务
 """
 
-from utils.logger import info
+import os
+import sys
+import ast
+import time
+import argparse
+from datetime import datetime
+from utils.logger import info, error, configure_logger
+from utils.config import CONFIG_FILE, load_config
+from utils.checkpoint import find_latest_checkpoint
+from utils.profiler import PhaseTimer, run_profiled
+from utils.util import get_elapsed_time_str
+from utils.walkforward import METRICS, run_walk_forward
 from strategys.BuyOnDips import BuyOnDips
 
+# 子命令
+COMMANDS = ('backtest', 'sweep', 'download', 'bench')
+
+
+def parse_universe(value: str) -> str:
+    """
+    解析股票池子集参数
+    Args:
+        value: 逗号分隔的股票代码，或股票代码文件路径（每行一个或逗号分隔）
+    Returns:
+        str: 逗号分隔的股票代码
+    """
+    if os.path.isfile(value):
+        with open(value, encoding='utf-8') as f:
+            value = f.read()
+    return ','.join(stock_code.strip() for stock_code in value.replace('\n', ',').split(',') if stock_code.strip())
+
+
+def parse_param_grid(grid: list) -> dict:
+    """
+    解析参数网格
+    Args:
+        grid: 参数列表，格式为 key=value1,value2（值按Python字面量解析，无法解析时作为字符串）
+    Returns:
+        dict: 参数网格，如{'price_min': [5.0, 8.0]}
+    """
+    param_grid = {}
+    for item in grid or []:
+        key, sep, values = item.partition('=')
+        if not sep or not key.strip():
+            error(f"无效的参数网格: {item}，格式应为 key=value1,value2")
+            raise ValueError(f"无效的参数网格: {item}，格式应为 key=value1,value2")
+        param_grid[key.strip()] = [_parse_value(value.strip()) for value in values.split(',') if value.strip()]
+    return param_grid
+
+
+def _parse_value(value: str):
+    """
+    按Python字面量解析参数值，无法解析时返回字符串
+    """
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    构建命令行解析器
+    Returns:
+        argparse.ArgumentParser: 命令行解析器
+    """
+    # 所有子命令共用的参数
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-c', '--config', default=CONFIG_FILE, help="配置文件路径（默认: %(default)s）")
+    common.add_argument('-s', '--set', action='append', default=[], metavar='SECTION.key=value', help="覆盖配置项，可重复指定")
+    common.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], help="日志级别")
+    common.add_argument('--profile', action='store_true', help="使用cProfile分析当前进程的函数耗时")
+    common.add_argument('--profile-output', metavar='PATH', help="cProfile分析结果文件路径（默认: results/profile_<命令>_<时间>.prof）")
+    common.add_argument('--start', help="回测开始时间，覆盖[BACKTEST]backtest_start_time")
+    common.add_argument('--end', help="回测结束时间，覆盖[BACKTEST]backtest_end_time")
+    common.add_argument('--universe', type=parse_universe, metavar='CODES|FILE', help="股票池子集：逗号分隔的股票代码或股票代码文件")
+    common.add_argument('--universe-limit', type=int, metavar='N', help="只使用股票池的前N只股票")
+    common.add_argument('--backend', choices=['xtdata', 'archive'], help="分时数据来源：xtdata直接读取行情数据，archive读取分时K线归档")
+    common.add_argument('--archive-dir', metavar='DIR', help="分时K线归档目录，覆盖[DATA]minute_archive")
+
+    parser = argparse.ArgumentParser(prog='moneydog', description="MoneyDog 量化交易回测系统")
+    subparsers = parser.add_subparsers(dest='command', metavar='{' + ','.join(COMMANDS) + '}')
+
+    backtest = subparsers.add_parser('backtest', parents=[common], help="回测（默认命令）")
+    backtest.add_argument('--name', help="策略名称（用于区分结果文件）")
+    backtest.add_argument('--price-min', type=float, default=5.0, help="价格区间选股：最低价格（默认: %(default)s）")
+    backtest.add_argument('--price-max', type=float, default=60.0, help="价格区间选股：最高价格（默认: %(default)s）")
+    backtest.add_argument('--workers', type=int, help="两阶段模式的图形筛选进程数，覆盖[DATA]screening_workers")
+    backtest.add_argument('--checkpoint-interval', type=int, metavar='N', help="检查点保存间隔，覆盖[BACKTEST]checkpoint_interval")
+    backtest.add_argument('--resume', nargs='?', const='', default=None, metavar='CHECKPOINT',
+                          help="从检查点继续运行（不指定路径时使用配置[BACKTEST]checkpoint_file，包含{trade_date}时使用最新的检查点）")
+
+    sweep = subparsers.add_parser('sweep', parents=[common], help="滚动窗口参数寻优")
+    sweep.add_argument('--grid', action='append', default=[], metavar='key=v1,v2', help="参数网格，可重复指定，如 --grid price_min=5,8")
+    sweep.add_argument('--train-days', type=int, help="训练窗口运行天数，覆盖[WALKFORWARD]train_days")
+    sweep.add_argument('--test-days', type=int, help="测试窗口运行天数，覆盖[WALKFORWARD]test_days")
+    sweep.add_argument('--step-days', type=int, help="窗口滚动步长，覆盖[WALKFORWARD]step_days")
+    sweep.add_argument('--metric', choices=METRICS, help="寻优指标，覆盖[WALKFORWARD]metric")
+    sweep.add_argument('--workers', type=int, help="并行进程数，覆盖[WALKFORWARD]workers")
+    sweep.add_argument('--output', metavar='PATH', help="样本外资产曲线输出文件（csv）")
+
+    download = subparsers.add_parser('download', parents=[common], help="下载历史行情数据并构建分时K线归档")
+    download.add_argument('--download-start', help="下载开始时间，覆盖[DOWNLOAD]download_start_time")
+
+    bench = subparsers.add_parser('bench', parents=[common], help="性能测试（不输出回测结果，输出各阶段耗时）")
+    bench.add_argument('--workers', type=int, help="两阶段模式的图形筛选进程数，覆盖[DATA]screening_workers")
+    return parser
+
+
+def _get_option_nargs(parser: argparse.ArgumentParser) -> dict:
+    """
+    获取解析器及其子命令的全部选项的参数个数
+    Returns:
+        dict: {选项: nargs}，开关选项的nargs为0
+    """
+    option_nargs = {}
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            for subparser in action.choices.values():
+                option_nargs.update(_get_option_nargs(subparser))
+        for option in action.option_strings:
+            option_nargs[option] = action.nargs
+    return option_nargs
+
+
+def _find_command(argv: list, parser: argparse.ArgumentParser) -> int:
+    """
+    定位子命令在命令行参数中的位置（跳过选项的参数值，如 --name backtest 中的backtest不是子命令）
+    Returns:
+        int: 子命令位置，未指定子命令时返回-1
+    """
+    option_nargs = _get_option_nargs(parser)
+    index = 0
+    while index < len(argv):
+        token = argv[index]
+        if token == '--':
+            break
+        if token in COMMANDS:
+            return index
+        if token.startswith('-') and '=' not in token:
+            nargs = option_nargs.get(token, 0)
+            has_value = index + 1 < len(argv) and not argv[index + 1].startswith('-')
+            if nargs != 0 and has_value and not (nargs == '?' and argv[index + 1] in COMMANDS):
+                index += 1
+        index += 1
+    return -1
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """
+    解析命令行参数
+    未指定子命令时默认为backtest（兼容 python main.py --resume），
+    子命令之前的参数移至子命令之后解析（如 python main.py -c other.ini backtest）
+    Args:
+        argv: 命令行参数，默认为sys.argv[1:]
+    Returns:
+        argparse.Namespace: 解析结果
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    parser = build_parser()
+    index = _find_command(argv, parser)
+    if index < 0:
+        if argv[:1] not in (['-h'], ['--help']):
+            argv.insert(0, 'backtest')
+    elif index > 0:
+        argv = [argv[index]] + argv[:index] + argv[index + 1:]
+    return parser.parse_args(argv)
+
+
+def get_overrides(args: argparse.Namespace) -> list:
+    """
+    将命令行参数转换为配置覆盖项（优先级：配置文件 < --set < 专用参数）
+    Args:
+        args: 命令行解析结果
+    Returns:
+        list: 覆盖项列表，格式为 SECTION.key=value
+    """
+    overrides = list(args.set)
+    options = [
+        ('LOGGING.level', args.log_level),
+        ('BACKTEST.backtest_start_time', args.start),
+        ('BACKTEST.backtest_end_time', args.end),
+        ('DATA.universe', args.universe),
+        ('DATA.universe_limit', args.universe_limit),
+        ('DATA.minute_archive', args.archive_dir),
+    ]
+    if args.backend == 'xtdata':
+        options.append(('DATA.minute_archive', ''))
+    if args.command in ('backtest', 'bench'):
+        options.append(('DATA.screening_workers', args.workers))
+    if args.command == 'backtest':
+        options.append(('BACKTEST.checkpoint_interval', args.checkpoint_interval))
+    elif args.command == 'sweep':
+        options.extend([
+            ('WALKFORWARD.train_days', args.train_days),
+            ('WALKFORWARD.test_days', args.test_days),
+            ('WALKFORWARD.step_days', args.step_days),
+            ('WALKFORWARD.metric', args.metric),
+            ('WALKFORWARD.workers', args.workers),
+        ])
+    elif args.command == 'download':
+        options.extend([
+            ('DOWNLOAD.download_required', 'true'),
+            ('DOWNLOAD.download_start_time', args.download_start),
+            ('DATA.screening_workers', 0),
+        ])
+    if args.command in ('sweep', 'bench'):
+        # 批量运行与性能测试不下载行情数据、不保存检查点
+        options.extend([('DOWNLOAD.download_required', 'false'), ('BACKTEST.checkpoint_interval', 0)])
+    overrides.extend(f"{name}={value}" for name, value in options if value is not None)
+    return overrides
+
+
+def run_backtest(args: argparse.Namespace, config) -> bool:
+    """
+    回测
+    """
+    strategy = BuyOnDips(name=args.name, price_min=args.price_min, price_max=args.price_max, config=config)
+    if args.resume is not None:
+        # 未指定路径时使用配置的检查点文件（按交易日分别保存时取最新的检查点）
+        return strategy.run(resume_from=args.resume or find_latest_checkpoint(strategy.checkpoint_file))
+    return strategy.run()
+
+
+def run_sweep(args: argparse.Namespace, config) -> bool:
+    """
+    滚动窗口参数寻优
+    """
+    result = run_walk_forward(BuyOnDips, parse_param_grid(args.grid), config=config)
+    for window in result['windows']:
+        info(f"窗口 {window['index']} 测试 {window['test'][0]}-{window['test'][1]} 参数: {window['params']}，收益率: {window['test_metrics']['total_return'] * 100:.2f}%")
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        result['equity_curve'].to_csv(args.output, index=False)
+        info(f"样本外资产曲线已保存: {args.output}")
+    return True
+
+
+def run_download(args: argparse.Namespace, config) -> bool:
+    """
+    下载历史行情数据并构建分时K线归档（配置了归档目录时）
+    """
+    return BuyOnDips(config=config).prepare()
+
+
+def run_bench(args: argparse.Namespace, config) -> bool:
+    """
+    性能测试：运行回测（不输出结果），输出各阶段调用次数与耗时（阶段之间可能嵌套，占比之和可超过100%）
+    """
+    strategy = BuyOnDips(config=config)
+    timer = PhaseTimer()
+    for method_name, phase in (
+        ('prepare', 'prepare'),
+        ('_precompute_pattern_hits', 'pattern_screening'),
+        ('_get_selected_stock_list', 'stock_selection'),
+        ('_set_cached', 'indicator_bundles'),
+        ('on_bar', 'on_bar'),
+    ):
+        timer.wrap(strategy, method_name, phase)
+    timer.wrap(strategy.feed, 'get_minute_bars', 'minute_bars')
+    timer.wrap(strategy.broker, 'record_position_and_account_change', 'settle')
+    start_time = time.perf_counter()
+    strategy.run(report=False)
+    total_seconds = time.perf_counter() - start_time
+    days = max(len(strategy.trade_calendar) - 1, 1)
+    info(f"性能测试: {days} 个交易日，{len(strategy.global_stock_list)} 只股票，总耗时: {total_seconds:.3f} 秒，平均每个交易日: {total_seconds / days:.3f} 秒\n{timer.report(total_seconds)}")
+    return True
+
+
+def main(argv: list = None) -> int:
+    """
+    命令行入口
+    Args:
+        argv: 命令行参数，默认为sys.argv[1:]
+    Returns:
+        int: 退出码
+    """
+    args = parse_args(argv)
+    config = load_config(args.config, get_overrides(args))
+    configure_logger(config)
+    if args.backend == 'archive' and not config.get('DATA', 'minute_archive', fallback=''):
+        build_parser().error("--backend archive 需要通过 --archive-dir 或配置[DATA]minute_archive指定归档目录")
+
+    command = {'backtest': run_backtest, 'sweep': run_sweep, 'download': run_download, 'bench': run_bench}[args.command]
+    info(f"MoneyDog 主程序运行开始: {args.command}")
+    start_time = time.time()
+    if args.profile:
+        output = args.profile_output or os.path.join('results', f"profile_{args.command}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+        result = run_profiled(lambda: command(args, config), output)
+    else:
+        result = command(args, config)
+    info(f"MoneyDog 主程序运行结束: {args.command}，耗时: {get_elapsed_time_str(start_time)}")
+    return 0 if result else 1
+
+
 # 主程序入口
 if __name__ == "__main__":
-    info("MoneyDog 主程序运行开始")
-    strategy = BuyOnDips()
-    strategy.run()
\ No newline at end of file
+    sys.exit(main())
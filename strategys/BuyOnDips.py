@@ -4,46 +4,141 @@
 import time
 import configparser
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 
-from utils.data import get_stock_list_in_main_board, get_trade_calendar, get_daily_bars, download_stock_history_data
-from utils.logger import info, debug
-from utils.util import generate_minute_snapshot, get_elapsed_time_str, add_num_date_days
+from utils.data import get_stock_list_in_main_board_async, get_trade_calendar_async, get_daily_bars, download_stock_history_data, run_concurrently
+from utils.logger import info, debug, warning
+from utils.util import get_elapsed_time_str, add_num_date_days
 from utils.broker import Broker
+from utils.engine import Strategy, DataFeed, ExecutionHandler, BacktestEngine
+from utils.archive import MinuteArchive
+from utils.cache import ScreeningCache, BundleCache, CACHE_DIR
+from utils.config import get_config
+from utils.universe import UniverseFilter
 from laboratory.multipleK import get_last_limit_day_kline, get_ma, get_volume_change_rate, get_average_volume, get_macd, is_macd_top
-from laboratory.custom import is_limit_board_after_volume_consolidation
+from laboratory.custom import is_limit_board_after_volume_consolidation, VolumeConsolidationScreener
 from laboratory.singleK import get_limit_price, is_limit
 
-config = configparser.ConfigParser()
-config.read('config.ini', encoding='utf-8')
-
-class BuyOnDips:
-    def __init__(self):
+# 选股图形筛选使用的日K线数量
+PATTERN_BARS = 90
+
+def match_pattern(daily_bars: dict) -> list:
+    """
+    选股图形筛选（不依赖持仓状态与价格区间参数）
+    Args:
+        daily_bars: 各股票日K线数据 {stock_code: DataFrame}
+    Returns:
+        list: 符合图形的股票及最新收盘价 [(stock_code, close)]，顺序同daily_bars
+    """
+    result = []
+    for stock_code, daily_bar in daily_bars.items():
+        if is_limit_board_after_volume_consolidation(stock_code, daily_bar):
+            result.append((stock_code, daily_bar.iloc[-1]['close']))
+    return result
+
+def screen_pattern(task: tuple) -> tuple:
+    """
+    读取单个交易日的日K线并进行选股图形筛选（模块级函数，可在子进程中执行）
+    Args:
+        task: (trade_date, stock_list)
+    Returns:
+        tuple: (trade_date, [(stock_code, close)])
+    """
+    trade_date, stock_list = task
+    daily_bars = get_daily_bars(stock_list=stock_list, period="1d", end_time=trade_date, count=PATTERN_BARS)
+    return trade_date, match_pattern(daily_bars)
+
+def screen_pattern_incremental(task: tuple) -> dict:
+    """
+    读取一批股票覆盖全部交易日的日K线，使用增量筛选器逐日进行选股图形筛选（模块级函数，可在子进程中执行）
+    Args:
+        task: (stock_list, trade_dates, count)，count为截至最后一个交易日读取的日K线数量
+    Returns:
+        dict: {trade_date: [(stock_code, close)]}
+    """
+    stock_list, trade_dates, count = task
+    daily_bars = get_daily_bars(stock_list=stock_list, period="1d", end_time=trade_dates[-1], count=count)
+    return VolumeConsolidationScreener(window=PATTERN_BARS).screen_bars(daily_bars, trade_dates)
+
+class BuyOnDips(Strategy):
+    def __init__(self, name: str = None, price_min: float = 5.0, price_max: float = 60.0, backtest_start_time: str = None, backtest_end_time: str = None, download_required: str = None, config: configparser.ConfigParser = None):
+        """
+        初始化策略
+        Args:
+            name: 策略名称（多策略运行时用于区分结果与归属交易），默认使用类名
+            price_min: 价格区间选股：最低价格
+            price_max: 价格区间选股：最高价格
+            backtest_start_time: 回测开始时间，默认读取配置[BACKTEST]
+            backtest_end_time: 回测结束时间，默认读取配置[BACKTEST]
+            download_required: 是否需要下载（'true'/'false'），默认读取配置[DOWNLOAD]
+            config: 配置，默认读取配置文件config.ini
+        """
+        self.name = name
+        if config is None:
+            config = get_config()
+        self.config = config
         self.start_time = time.time()
         self.download_start_time = config.get('DOWNLOAD', 'download_start_time')
-        self.download_required = config.get('DOWNLOAD', 'download_required')
-        self.backtest_start_time = config.get('BACKTEST', 'backtest_start_time')
-        self.backtest_end_time = config.get('BACKTEST', 'backtest_end_time')
-        self.price_min = 5.0 # 价格区间选股：最低价格
-        self.price_max = 60.0 # 价格区间选股：最高价格
-        self.broker = Broker()
-
-    def run(self) -> bool:
-        """
-        策略运行
+        self.download_required = download_required or config.get('DOWNLOAD', 'download_required')
+        self.backtest_start_time = backtest_start_time or config.get('BACKTEST', 'backtest_start_time')
+        self.backtest_end_time = backtest_end_time or config.get('BACKTEST', 'backtest_end_time')
+        self.price_min = price_min # 价格区间选股：最低价格
+        self.price_max = price_max # 价格区间选股：最高价格
+        self.broker = Broker(config)
+        # 股票池子集（为空时使用全部大盘股票；universe_limit大于0时只取前N只，用于快速验证与性能测试）
+        self.universe = [stock_code.strip() for stock_code in config.get('DATA', 'universe', fallback='').split(',') if stock_code.strip()]
+        self.universe_limit = config.getint('DATA', 'universe_limit', fallback=0)
+        # 分时K线归档目录（为空时不使用归档，直接读取行情数据）
+        minute_archive_dir = config.get('DATA', 'minute_archive', fallback='')
+        self.minute_archive = MinuteArchive(minute_archive_dir) if minute_archive_dir else None
+        # 选股结果缓存（行情数据重新下载后自动失效）
+        self.cache_dir = config.get('DATA', 'cache_dir', fallback=CACHE_DIR)
+        self.screening_cache = ScreeningCache(self.cache_dir) if config.getboolean('DATA', 'screening_cache', fallback=False) else None
+        # 个股盘前指标缓存（内存LRU + 磁盘）
+        if config.getboolean('DATA', 'bundle_cache', fallback=False):
+            self.bundle_cache = BundleCache(
+                self.__class__.__name__,
+                self.cache_dir,
+                max_items=config.getint('DATA', 'bundle_cache_items', fallback=2048),
+                max_disk_bytes=config.getint('DATA', 'bundle_cache_mb', fallback=512) * 1024 * 1024
+            )
+        else:
+            self.bundle_cache = None
+        # 股票池预过滤（选股前按每日汇总表剔除价格区间外、停牌、ST、上市不足、流动性不足的股票，减少日K线读取）
+        if config.getboolean('UNIVERSE', 'prefilter', fallback=True):
+            self.universe_filter = UniverseFilter(
+                exclude_suspended=config.getboolean('UNIVERSE', 'exclude_suspended', fallback=False),
+                exclude_st=config.getboolean('UNIVERSE', 'exclude_st', fallback=False),
+                min_listing_days=config.getint('UNIVERSE', 'min_listing_days', fallback=0),
+                min_amount=config.getfloat('UNIVERSE', 'min_amount', fallback=0.0),
+                amount_window=config.getint('UNIVERSE', 'amount_window', fallback=20)
+            )
+        else:
+            self.universe_filter = None
+        # 两阶段模式：prepare时预先并行完成全部交易日的图形筛选（0为不启用，逐日筛选；1为在当前进程顺序筛选）
+        self.screening_workers = config.getint('DATA', 'screening_workers', fallback=0)
+        # 两阶段模式使用增量筛选：按股票分批读取一次日K线并逐日更新图形状态，不再按交易日重复读取最近90根日K线
+        self.incremental_screening = config.getboolean('DATA', 'incremental_screening', fallback=False)
+        self.pattern_hits = {} # 预先筛选的图形结果 {trade_date: [(stock_code, close)]}
+        # 检查点（每checkpoint_interval个交易日保存一次，为0时不保存）
+        self.checkpoint_interval = config.getint('BACKTEST', 'checkpoint_interval', fallback=0)
+        self.checkpoint_file = config.get('BACKTEST', 'checkpoint_file', fallback='results/checkpoint.ckpt')
+        # 行情数据源（日K线窗口复用、盘前指标缓存、分时快照生成）
+        self.feed = DataFeed(self.minute_archive, self.bundle_cache)
+
+    def run(self, resume_from: str = None, report: bool = True) -> bool:
+        """
+        策略运行（由回测引擎遍历交易日历逐日运行，最后一天不运行）
+        Args:
+            resume_from: 检查点文件路径，不为空时从检查点继续运行（可使用与保存时不同的策略参数分叉运行）
+            report: 回测结束时是否输出结果（性能测试时可关闭）
         Returns:
             bool: 是否成功
         """
-        self.prepare()
-        # 遍历交易日历，逐日运行（最后一天不运行）
-        for trade_date in self.trade_calendar[:-1]:
-            proceed = self.before_open(trade_date)
-            if proceed:
-                for minute_snapshot in self.minute_snapshots:
-                    self.on_minute(minute_snapshot)
-            self.after_close(trade_date)
-            info("=" * 100)
-        self.end_of_backtest()
-        return True
+        engine = BacktestEngine(self, self.feed, ExecutionHandler(self.broker), report=report)
+        if self.checkpoint_interval > 0:
+            engine.enable_checkpoint(self.checkpoint_file, self.checkpoint_interval)
+        return engine.run(resume_from)
         
     def prepare(self) -> bool:
         """
@@ -52,33 +147,185 @@ class BuyOnDips:
         2. 获取大盘股票池
         3. 如果下载配置为true，则下载历史日线数据
         4. 如果下载配置为true，则下载股票分时数据
+        5. 如果下载配置为true且配置了分时K线归档，则构建归档
+        6. 如果启用股票池预过滤，则构建每日汇总表
+        7. 如果启用两阶段模式，则预先并行完成全部交易日的图形筛选
         Returns:
             bool: 是否准备成功
         """
         
-        # 1. 获取交易日期列表
-        self.trade_calendar = get_trade_calendar(self.backtest_start_time, self.backtest_end_time)
+        # 1. 获取交易日期列表、2. 获取大盘股票池（相互独立，并发请求）
+        self.trade_calendar, self.global_stock_list = run_concurrently(
+            get_trade_calendar_async(self.backtest_start_time, self.backtest_end_time),
+            get_stock_list_in_main_board_async()
+        )
         info(f"获取交易日期列表完成: {len(self.trade_calendar)} 天")
-        
-        # 2. 获取大盘股票池
-        self.global_stock_list = get_stock_list_in_main_board()
+        self.global_stock_list = self._apply_universe(self.global_stock_list)
         info(f"获取大盘股票池完成: {len(self.global_stock_list)} 只股票")
 
-        # 3. 下载历史日线数据
+        # 3. ~ 5. 下载历史日线数据、分时数据并构建归档
         if self.download_required == "false":
             info(f"下载配置为false，跳过下载大盘股票池历史数据和分时数据")
-            return True
+        else:
+            self._download_history_data()
+
+        # 6. 构建股票池预过滤汇总表
+        if self.universe_filter is not None:
+            self.universe_filter.build(self.global_stock_list, self.trade_calendar[:-1])
+
+        # 7. 两阶段模式：预先完成全部交易日的图形筛选
+        if self.screening_workers > 0:
+            self._precompute_pattern_hits()
+        return True
 
+    def _apply_universe(self, stock_list: list) -> list:
+        """
+        按配置的股票池子集过滤大盘股票池
+        Args:
+            stock_list: 大盘股票池
+        Returns:
+            list: 过滤后的股票池（保持大盘股票池顺序）
+        """
+        if self.universe:
+            universe = set(self.universe)
+            missing = universe.difference(stock_list)
+            if missing:
+                warning(f"股票池子集中 {len(missing)} 只股票不在大盘股票池中，已忽略: {sorted(missing)}")
+            stock_list = [stock_code for stock_code in stock_list if stock_code in universe]
+        if self.universe_limit > 0:
+            stock_list = stock_list[:self.universe_limit]
+        return stock_list
+
+    def _download_history_data(self) -> bool:
+        """
+        下载大盘股票池历史日线数据、分时数据，并构建分时K线归档
+        Returns:
+            bool: 是否成功
+        """
+        # 3. 下载历史日线数据
         info(f"开始获取大盘股票池并下载历史数据")
         start_time = time.time()
-        download_stock_history_data(self.global_stock_list, self.download_start_time, "1d", True)
+        download_stock_history_data(self.global_stock_list, self.download_start_time, period="1d", process_bar=True, cache_dir=self.cache_dir)
         info(f"获取大盘股票池完成: {len(self.global_stock_list)} 只股票，耗时: {time.time() - start_time} 秒")
 
         # 4. 下载股票分时数据
         info(f"开始下载股票分时数据")
         start_time = time.time()
-        download_stock_history_data(self.global_stock_list, self.download_start_time, "1m", True)
+        download_stock_history_data(self.global_stock_list, self.download_start_time, period="1m", process_bar=True, cache_dir=self.cache_dir)
         info(f"下载股票分时数据完成: {len(self.global_stock_list)} 只股票，耗时: {time.time() - start_time} 秒")
+
+        # 5. 构建分时K线归档（回测首日不进行分时模拟）
+        if self.minute_archive is not None:
+            info(f"开始构建分时K线归档")
+            start_time = time.time()
+            self.minute_archive.build(self.global_stock_list, self.trade_calendar[1:], True)
+            info(f"构建分时K线归档完成，耗时: {time.time() - start_time} 秒")
+        return True
+
+    def _precompute_pattern_hits(self) -> bool:
+        """
+        预先完成全部交易日的图形筛选（两阶段模式第一阶段）
+        图形筛选只依赖行情数据、不依赖持仓状态，各交易日相互独立，按交易日分发至多个进程并行执行（启用增量筛选时按股票分批，见_precompute_pattern_hits_incremental）；
+        结果保存最新收盘价，价格区间在逐日运行时过滤，因此可被不同价格参数的策略复用（预过滤同样不按价格区间过滤）；已命中选股结果缓存的交易日跳过
+        Returns:
+            bool: 是否成功
+        """
+        trade_dates = [trade_date for trade_date in self.trade_calendar[:-1] if self._get_cached_selected_stock_list(trade_date) is None]
+        if not trade_dates:
+            return True
+        info(f"开始预先筛选选股图形: {len(trade_dates)} 个交易日，{self.screening_workers} 个进程")
+        start_time = time.time()
+        if self.incremental_screening:
+            self._precompute_pattern_hits_incremental(trade_dates)
+            info(f"预先筛选选股图形完成（增量筛选），耗时: {get_elapsed_time_str(start_time)}")
+            return True
+        tasks = [(trade_date, self._get_candidate_stock_list(trade_date, price_band=False)) for trade_date in trade_dates]
+        if self.screening_workers > 1:
+            with ProcessPoolExecutor(max_workers=self.screening_workers) as executor:
+                self.pattern_hits.update(executor.map(screen_pattern, tasks))
+        else:
+            self.pattern_hits.update(map(screen_pattern, tasks))
+        info(f"预先筛选选股图形完成，耗时: {get_elapsed_time_str(start_time)}")
+        return True
+
+    def _precompute_pattern_hits_incremental(self, trade_dates: list) -> bool:
+        """
+        使用增量筛选器预先完成图形筛选：按股票分批分发至多个进程，每批读取一次覆盖全部交易日的日K线，
+        逐日输入新K线更新图形状态（结果与逐日读取最近90根日K线筛选一致）；
+        图形状态需要连续的日K线，因此对全部股票更新状态，预过滤在筛选后应用
+        Args:
+            trade_dates: 需要筛选的交易日列表
+        Returns:
+            bool: 是否成功
+        """
+        positions = {trade_date: index for index, trade_date in enumerate(self.trade_calendar)}
+        count = positions[trade_dates[-1]] - positions[trade_dates[0]] + PATTERN_BARS
+        batch_size = min(500, max(1, -(-len(self.global_stock_list) // (max(self.screening_workers, 1) * 4))))
+        tasks = [(self.global_stock_list[start:start + batch_size], trade_dates, count) for start in range(0, len(self.global_stock_list), batch_size)]
+        if self.screening_workers > 1:
+            with ProcessPoolExecutor(max_workers=self.screening_workers) as executor:
+                results = list(executor.map(screen_pattern_incremental, tasks))
+        else:
+            results = list(map(screen_pattern_incremental, tasks))
+
+        # 各批次按大盘股票池顺序合并
+        for trade_date in trade_dates:
+            hits = [hit for result in results for hit in result[trade_date]]
+            if self.universe_filter is not None:
+                candidates = set(self._get_candidate_stock_list(trade_date, price_band=False))
+                hits = [hit for hit in hits if hit[0] in candidates]
+            self.pattern_hits[trade_date] = hits
+        return True
+
+    def prepare_from(self, strategy) -> bool:
+        """
+        复用其他策略已准备好的交易日历与大盘股票池（多策略运行时不重复获取与下载）
+        Args:
+            strategy: 已执行prepare的策略
+        Returns:
+            bool: 是否成功
+        """
+        self.trade_calendar = strategy.trade_calendar
+        self.global_stock_list = strategy.global_stock_list
+        # 图形筛选结果与价格区间参数无关，可直接复用
+        self.pattern_hits = strategy.pattern_hits
+        # 预过滤汇总表与价格区间参数无关，过滤条件相同时直接复用
+        if self.universe_filter is not None and strategy.universe_filter is not None and self.universe_filter.get_params() == strategy.universe_filter.get_params():
+            self.universe_filter = strategy.universe_filter
+        elif self.universe_filter is not None:
+            self.universe_filter.build(self.global_stock_list, self.trade_calendar[:-1])
+        return True
+
+    def get_state(self) -> dict:
+        """
+        获取随检查点保存的策略状态（交易日历、大盘股票池、预先筛选的图形结果与预过滤条件）
+        预过滤汇总表体积较大且可由行情数据重建，只保存过滤条件，恢复时重新构建
+        Returns:
+            dict: 策略状态
+        """
+        state = super().get_state()
+        state.update({
+            'global_stock_list': self.global_stock_list,
+            'pattern_hits': self.pattern_hits,
+            'universe_filter_params': self.universe_filter.get_params() if self.universe_filter is not None else None,
+        })
+        return state
+
+    def set_state(self, state: dict) -> bool:
+        """
+        从检查点恢复策略状态（按当前配置的预过滤条件重新构建汇总表）
+        Args:
+            state: 策略状态
+        Returns:
+            bool: 是否成功
+        """
+        state = dict(state)
+        universe_filter_params = state.pop('universe_filter_params', None)
+        super().set_state(state)
+        if self.universe_filter is not None:
+            if universe_filter_params is not None and universe_filter_params != self.universe_filter.get_params():
+                warning(f"预过滤条件与检查点不同，按当前配置构建: {universe_filter_params} -> {self.universe_filter.get_params()}")
+            self.universe_filter.build(self.global_stock_list, self.trade_calendar[:-1])
         return True
 
     def before_open(self, trade_date: str) -> bool:
@@ -89,17 +336,13 @@ class BuyOnDips:
         1. 获取自选股票列表（预买入）
         2. 获取持仓股票列表（预卖出）
         3. 缓存盘前指标数据（备用于盘中运行）
-        4. 获取当日分时线数据，并模拟分时快照数据
+        当日分时行情由回测引擎读取并生成快照（见get_bar_universe）
         Returns:
-            bool: 是否成功
+            bool: 是否需要回放当日分时行情
         """
         info(f"策略开盘前运行: 【{add_num_date_days(trade_date, 1, self.trade_calendar)}】")
-        # 资产概览
-        info(f"可用资金: {self.broker.available_amount:,.2f} 元，持仓价值: {self.broker.get_position_value():,.2f} 元，总资产: {self.broker.get_total_assets():,.2f} 元, 总盈利率: {self.broker.get_total_profit_rate():,.2f}%")
-        # 盘前清除volume为0的持仓股票信息、解锁昨日所有被锁定的持仓
-        self.broker.clean_position()
-        self.broker.unlock_position()
-        
+        # 资产概览、清除空持仓与解锁持仓由成交执行在盘前统一处理（共用同一账户的只处理一次）
+
         # 1. 获取持仓股票列表（预卖出）
         self.holding_stock_list = self._get_holding_stock_list()
 
@@ -110,38 +353,87 @@ class BuyOnDips:
 
         if not self.selected_stock_list and not self.holding_stock_list:
             info(f"没有自选股票和持仓股票，跳过策略开盘前运行")
-            self.minute_snapshots = []
             return False
 
         # 3. 缓存盘前指标数据（备用于盘中运行）
         self._set_cached(trade_date)
-
-        # 4. 获取当日股池的分时线行情数据，并模拟生成分时快照
-        self.minute_snapshots = self._simulate_minute_daily(add_num_date_days(trade_date, 1, self.trade_calendar))
-        
         return True
 
+    def get_bar_universe(self) -> list:
+        """
+        获取当日需要回放分时行情的股票列表（自选股票 + 持仓股票）
+        Returns:
+            list: 股票列表
+        """
+        return self.selected_stock_list + self.holding_stock_list
+
+    def _get_screening_cache_key(self, trade_date: str) -> str:
+        """
+        获取选股结果缓存键
+        Args:
+            trade_date: 交易日期
+        Returns:
+            str: 缓存键
+        """
+        params = {'price_min': self.price_min, 'price_max': self.price_max}
+        if self.universe_filter is not None:
+            params.update(self.universe_filter.get_params())
+        return self.screening_cache.make_key(trade_date, self.global_stock_list, is_limit_board_after_volume_consolidation, params)
+
+    def _get_candidate_stock_list(self, trade_date: str, price_band: bool = True) -> list:
+        """
+        获取需要进行图形筛选的股票列表（启用预过滤时按汇总表剔除，避免读取其日K线）
+        Args:
+            trade_date: 交易日期
+            price_band: 是否按价格区间过滤（预先筛选的图形结果需被不同价格参数的策略复用时不过滤）
+        Returns:
+            list: 股票列表
+        """
+        if self.universe_filter is None:
+            return self.global_stock_list
+        if price_band:
+            return self.universe_filter.filter(self.global_stock_list, trade_date, self.price_min, self.price_max)
+        return self.universe_filter.filter(self.global_stock_list, trade_date)
+
+    def _get_cached_selected_stock_list(self, trade_date: str) -> list:
+        """
+        从选股结果缓存读取自选股票列表
+        Args:
+            trade_date: 交易日期
+        Returns:
+            list: 自选股票列表，未启用缓存或未命中时返回None
+        """
+        if self.screening_cache is None:
+            return None
+        return self.screening_cache.get(trade_date, self._get_screening_cache_key(trade_date))
+
     def _get_selected_stock_list(self, trade_date: str) -> list:
         """
         获取自选股票列表（预买入）
+        优先读取选股结果缓存，其次使用两阶段模式预先筛选的图形结果，否则对预过滤后的股票读取日K线逐只筛选
         Args:
             trade_date: 交易日期
         Returns:
             list: 自选股票列表
         """
-        daily_bars = get_daily_bars(stock_list=self.global_stock_list, period="1d", end_time=trade_date, count=90)
-        result = []
-        for stock_code, daily_bar in daily_bars.items():
-            if is_limit_board_after_volume_consolidation(stock_code, daily_bar):
-                if daily_bar.iloc[-1]['close'] >= self.price_min and daily_bar.iloc[-1]['close'] <= self.price_max:
-                    result.append(stock_code)
+        result = self._get_cached_selected_stock_list(trade_date)
+        if result is not None:
+            info(f"获取自选股票列表（预买入）完成（命中缓存）: {len(result)} 只股票")
+            return result
+
+        hits = self.pattern_hits.get(trade_date)
+        if hits is None:
+            hits = match_pattern(self.feed.get_daily_bars(self._get_candidate_stock_list(trade_date), trade_date, PATTERN_BARS))
+        result = [stock_code for stock_code, close in hits if close >= self.price_min and close <= self.price_max]
+        if self.screening_cache is not None:
+            self.screening_cache.set(trade_date, self._get_screening_cache_key(trade_date), result)
         info(f"获取自选股票列表（预买入）完成: {len(result)} 只股票")
         debug(f"自选股票列表: {result}")
         return result
-    
+
     def _get_holding_stock_list(self) -> list:
         """
-        获取持仓股票列表（预卖出）
+        获取持仓股票列表（预卖出，共享账户时只包含本策略建仓的股票）
         Returns:
             list: 持仓股票列表
         """
@@ -149,7 +441,7 @@ class BuyOnDips:
         result = []
         # 检查每个持仓，volume大于0的才是实际持仓
         for stock_code, position in positions.items():
-            if position.get('volume', 0) > 0:
+            if position.get('volume', 0) > 0 and self.execution.is_owner(stock_code):
                 result.append(stock_code)
         info(f"获取持仓股票列表（预卖出）完成: {len(result)} 只股票")
         info(f"持仓股票列表: {result}")
@@ -158,6 +450,7 @@ class BuyOnDips:
     def _set_cached(self, trade_date: str) -> bool:
         """
         缓存盘前数据（备用于盘中运行）
+        行情指标只依赖(股票, 交易日, 数据版本)，优先从指标缓存读取；建仓相关数据依赖持仓状态，每日重新计算
         Args:
             trade_date: 交易日期
         Returns:
@@ -165,12 +458,15 @@ class BuyOnDips:
         """
         self.cached = {}
         stock_list = self.selected_stock_list + self.holding_stock_list
-        daily_bars = get_daily_bars(stock_list, "1d", start_time="", end_time=trade_date, count=30)
+
+        # 读取指标缓存，仅对未命中的股票获取日K线并计算指标（日K线从选股时读取的数据窗口中切片）
+        bundles = self.feed.get_indicator_bundles(stock_list, trade_date, self._get_indicator_bundle, count=30)
 
         # 缓存大盘数据
 
         # 缓存个股数据
-        for stock_code, daily_bar in daily_bars.items():
+        for stock_code, bundle in bundles.items():
+            daily_bar = bundle['daily_bar']
             # 获取建仓日
             build_date = self.broker.get_build_date(stock_code)
             # 建仓日前的涨停交易日K线数据
@@ -178,48 +474,45 @@ class BuyOnDips:
                 before_build_limit_day_kline = get_last_limit_day_kline(stock_code, daily_bar.loc[:build_date], 5)
             else:
                 before_build_limit_day_kline = pd.DataFrame()
-            
-            # 获取最近5天内的最后一次涨停日K线
-            last_limit_day_kline = get_last_limit_day_kline(stock_code, daily_bar, 5)
-
-            # 获取日成交量变化率
-            volume_change_rate = get_volume_change_rate(daily_bar)
-            # 获取日均成交量
-            average_volume = get_average_volume(daily_bar)
-            # 缓存个股数据
-            self.cached[stock_code] = {
-                'daily_bar': daily_bar, # 日K线数据
-                'limit_price_up': get_limit_price(stock_code, daily_bar.iloc[-1]['close'], 'up'), # 当日涨停价格
-                'limit_price_down': get_limit_price(stock_code, daily_bar.iloc[-1]['close'], 'down'), # 当日跌停价格
-                'day_ma4': get_ma(daily_bars=daily_bar, period=4), # 4日均价线
-                'day_ma9': get_ma(daily_bars=daily_bar, period=9), # 9日均价线
+
+            self.cached[stock_code] = dict(bundle)
+            self.cached[stock_code].update({
                 'build_date': build_date, # 建仓日期
                 'cost_price': self.broker.get_position_cost_price(stock_code), # 持仓成本
                 'before_build_limit_day_kline': before_build_limit_day_kline, # 已建仓票的建仓日前的涨停交易日K线数据
-                'last_limit_day_kline': last_limit_day_kline, # 最近5天内的最后一次涨停日K线数据
-                'volume': daily_bar.iloc[-1]['volume'], # 昨日成交量
-                'volume_change_rate': volume_change_rate.iloc[-1]['volume_change_rate'], # 昨日成交量变化率
-                'average_volume': average_volume.iloc[-2]['average_volume'], # 前日日均成交量
-                'is_limit_up': is_limit(stock_code, daily_bar.iloc[-1]['close'], daily_bar.iloc[-1]['preClose'], 'up'), # 昨日是否涨停
-            }
-
+            })
 
         return True
 
-    def _simulate_minute_daily(self, trade_date: str) -> list:
+    def _get_indicator_bundle(self, stock_code: str, daily_bar: pd.DataFrame) -> dict:
         """
-        模拟分时快照数据（每分钟累积数据）
+        计算个股盘前行情指标（不依赖持仓状态，可跨回测复用）
         Args:
-            trade_date: 交易日期
+            stock_code: 股票代码
+            daily_bar: 日K线数据
         Returns:
-            list: 各股票各分钟的快照数据 [{'minute': minute, 'snapshot': [{'stock_code': stock_code, 'bars': bars}]}]
-        """
-        stock_list = self.selected_stock_list + self.holding_stock_list
-        daily_bars = get_daily_bars(stock_list, "1m", trade_date, trade_date, count=-1)
-        snapshots = generate_minute_snapshot(daily_bars)
-        return snapshots
-    
-    def on_minute(self, snapshot: dict) -> bool:
+            dict: 行情指标
+        """
+        # 获取最近5天内的最后一次涨停日K线
+        last_limit_day_kline = get_last_limit_day_kline(stock_code, daily_bar, 5)
+        # 获取日成交量变化率
+        volume_change_rate = get_volume_change_rate(daily_bar)
+        # 获取日均成交量
+        average_volume = get_average_volume(daily_bar)
+        return {
+            'daily_bar': daily_bar, # 日K线数据
+            'limit_price_up': get_limit_price(stock_code, daily_bar.iloc[-1]['close'], 'up'), # 当日涨停价格
+            'limit_price_down': get_limit_price(stock_code, daily_bar.iloc[-1]['close'], 'down'), # 当日跌停价格
+            'day_ma4': get_ma(daily_bars=daily_bar, period=4), # 4日均价线
+            'day_ma9': get_ma(daily_bars=daily_bar, period=9), # 9日均价线
+            'last_limit_day_kline': last_limit_day_kline, # 最近5天内的最后一次涨停日K线数据
+            'volume': daily_bar.iloc[-1]['volume'], # 昨日成交量
+            'volume_change_rate': volume_change_rate.iloc[-1]['volume_change_rate'], # 昨日成交量变化率
+            'average_volume': average_volume.iloc[-2]['average_volume'], # 前日日均成交量
+            'is_limit_up': is_limit(stock_code, daily_bar.iloc[-1]['close'], daily_bar.iloc[-1]['preClose'], 'up'), # 昨日是否涨停
+        }
+
+    def on_bar(self, snapshot: dict) -> bool:
         """
         策略盘中分时线运行
         Args:
@@ -465,35 +758,13 @@ class BuyOnDips:
 
     def trade(self, signal: dict) -> bool:
         """
-        交易
+        交易（提交至回测引擎成交，收盘后的持仓更新与账户记录由引擎完成）
         Args:
             signal: 交易信号执行动作
         Returns:
             bool: 是否成功
         """
-        if signal['action'] == 'sell':
-            self.broker.sell(signal)
-        elif signal['action'] == 'buy':
-            self.broker.buy(signal)
-
-        return True
-
-    def after_close(self, trade_date: str) -> bool:
-        """
-        每日收盘后运行
-        Args:
-            trade_date: 交易日期
-        Returns:
-            bool: 是否成功
-        """
-        if self.minute_snapshots:
-            minute_snapshot = self.minute_snapshots[-1]
-            self.broker.update_position(minute_snapshot)
-        else:
-            info(f"没有分时快照数据，跳过盘后更新持仓信息")
-
-        self.broker.record_position_and_account_change(trade_date)
-
+        self.submit(signal)
         return True
 
     def end_of_backtest(self) -> bool:
@@ -502,7 +773,7 @@ class BuyOnDips:
         Returns:
             bool: 是否成功
         """
-        self.broker.download_transactions()
+        self.broker.download_transactions(self.name or '')
         self.broker.analyze_result()
         info(f"回测结束，运行耗时: {get_elapsed_time_str(self.start_time)}")
         return True
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+测试用账户
+记录调用事件，买卖按固定价格成交且不变动资金，总资产为可用资金（不计持仓价值），
+供回测引擎、检查点与滚动窗口测试共用
+"""
+
+import copy
+
+class FakeBroker:
+    """
+    记录型账户
+    """
+    def __init__(self, initial_amount: float = 100.0):
+        self.initial_amount = initial_amount
+        self.available_amount = initial_amount
+        self.events = []
+        self.transactions = []
+        self.positions = {}
+        self.position_and_account_changes = []
+        self.opened = 0
+
+    def get_state(self) -> dict:
+        return {
+            'available_amount': self.available_amount,
+            'positions': self.positions,
+            'transactions': self.transactions,
+            'position_and_account_changes': self.position_and_account_changes,
+        }
+
+    def set_state(self, state: dict) -> bool:
+        state = copy.deepcopy(state)
+        self.available_amount = state['available_amount']
+        self.positions = state['positions']
+        self.transactions = state['transactions']
+        self.position_and_account_changes = state['position_and_account_changes']
+        return True
+
+    def get_position(self, stock_code: str) -> dict:
+        return self.positions.get(stock_code, {})
+
+    def buy(self, signal: dict) -> bool:
+        self.events.append(('buy', signal['stock_code'], signal['time']))
+        self.positions[signal['stock_code']] = {'volume': 100, 'last_price': 10.0}
+        self.transactions.append({'action': 'buy', 'price': 10.0, 'volume': 100, 'commission': 5.0, 'tax': 0.0})
+        return True
+
+    def sell(self, signal: dict) -> bool:
+        self.events.append(('sell', signal['stock_code'], signal['time']))
+        self.positions[signal['stock_code']] = {'volume': 0}
+        self.transactions.append({'action': 'sell', 'price': 11.0, 'volume': 100, 'commission': 5.0, 'tax': 0.5})
+        return True
+
+    def update_position(self, minute_snapshot: dict) -> bool:
+        self.events.append(('update', minute_snapshot['minute']))
+        return True
+
+    def record_position_and_account_change(self, trade_date: str) -> bool:
+        self.events.append(('record', trade_date))
+        self.position_and_account_changes.append({'trade_date': trade_date, 'total_assets': round(self.get_total_assets(), 6)})
+        return True
+
+    def clean_position(self) -> bool:
+        self.opened += 1
+        return True
+
+    def unlock_position(self) -> bool:
+        return True
+
+    def get_position_value(self) -> float:
+        return 0.0
+
+    def get_total_assets(self) -> float:
+        return self.available_amount
+
+    def get_total_profit_rate(self) -> float:
+        return (self.get_total_assets() / self.initial_amount - 1) * 100
@@ -0,0 +1,112 @@
+"""
+分时K线归档测试模块
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import utils.archive as archive_module
+from utils.archive import MinuteArchive
+
+def _make_bars(trade_date: str, base_price: float) -> pd.DataFrame:
+    """
+    构造单日分时K线数据
+    """
+    index = [f"{trade_date}0930{i:02d}" for i in range(3)]
+    return pd.DataFrame({
+        'open': [base_price, base_price + 0.01, base_price + 0.02],
+        'high': [base_price + 0.05, base_price + 0.06, base_price + 0.07],
+        'low': [base_price - 0.05, base_price - 0.04, base_price - 0.03],
+        'close': [base_price + 0.01, base_price + 0.02, base_price + 0.03],
+        'volume': [1000, 2000, 3000],
+        'preClose': [base_price, base_price, base_price],
+    }, index=index)
+
+def test_minute_archive_round_trip():
+    """
+    测试分时K线归档写入与内存映射读取
+    """
+    with tempfile.TemporaryDirectory() as root:
+        archive = MinuteArchive(root)
+        daily_bars = {'000001.SZ': _make_bars('20250902', 11.11), '600000.SH': _make_bars('20250902', 9.87)}
+        assert archive.write(daily_bars, '20250902') == 2
+        # 重复写入应跳过
+        assert archive.write(daily_bars, '20250902') == 0
+        archive.write({'000001.SZ': _make_bars('20250903', 11.5)}, '20250903')
+
+        # 新实例从磁盘读取
+        archive = MinuteArchive(root)
+        result = archive.read(['000001.SZ', '600000.SH', '000002.SZ'], '20250902')
+        assert set(result.keys()) == {'000001.SZ', '600000.SH'}
+        for stock_code, bars in daily_bars.items():
+            pd.testing.assert_frame_equal(result[stock_code], bars, check_dtype=False)
+        assert list(archive.read(['000001.SZ'], '20250903')['000001.SZ']['close']) == [11.51, 11.52, 11.53]
+        print(result)
+
+def test_minute_archive_missing_values(monkeypatch):
+    """
+    测试缺失价格保留为NaN，当日无分时K线的股票记录为空且不再重复获取
+    """
+    with tempfile.TemporaryDirectory() as root:
+        archive = MinuteArchive(root)
+        bars = _make_bars('20250902', 11.11)
+        bars.loc[bars.index[1], 'close'] = np.nan
+        assert archive.write({'000001.SZ': bars, '600000.SH': pd.DataFrame()}, '20250902') == 1
+
+        archive = MinuteArchive(root)
+        result = archive.read(['000001.SZ', '600000.SH'], '20250902')
+        assert np.isnan(result['000001.SZ']['close'].iloc[1])
+        assert result['000001.SZ']['close'].iloc[2] == 11.14
+        assert result['600000.SH'].empty
+        assert archive.contains('600000.SH', '20250902')
+
+        requested = []
+        def _get_daily_bars(stock_list, period, start_time, end_time, count):
+            requested.append(list(stock_list))
+            return {}
+        monkeypatch.setattr(archive_module, 'get_daily_bars', _get_daily_bars)
+        archive.build(['000001.SZ', '600000.SH', '000002.SZ'], ['20250902'], process_bar=False)
+        archive.build(['000001.SZ', '600000.SH', '000002.SZ'], ['20250902'], process_bar=False)
+        assert requested == [['000002.SZ']]
+
+def test_minute_archive_shared_writers():
+    """
+    测试多个实例交替写入同一归档（写入前重新加载索引，不会分配相同的数据块）
+    """
+    with tempfile.TemporaryDirectory() as root:
+        archive_a = MinuteArchive(root)
+        archive_b = MinuteArchive(root)
+        archive_a.write({'000001.SZ': _make_bars('20250902', 11.11)}, '20250902')
+        archive_b.write({'600000.SH': _make_bars('20250902', 9.87)}, '20250902')
+        # 已由其他实例写入的股票跳过
+        assert archive_a.write({'600000.SH': _make_bars('20250902', 1.0)}, '20250902') == 0
+
+        result = MinuteArchive(root).read(['000001.SZ', '600000.SH'], '20250902')
+        assert list(result['000001.SZ']['close']) == [11.12, 11.13, 11.14]
+        assert list(result['600000.SH']['close']) == [9.88, 9.89, 9.90]
+
+def test_minute_archive_torn_write():
+    """
+    测试中断写入残留的不完整数据块在下次写入时被截断，归档仍可正常读取
+    """
+    with tempfile.TemporaryDirectory() as root:
+        archive = MinuteArchive(root)
+        archive.write({'000001.SZ': _make_bars('20250902', 11.11)}, '20250902')
+        with open(archive.data_file, 'ab') as f:
+            f.write(b'\x00' * 100)
+        archive.write({'600000.SH': _make_bars('20250902', 9.87)}, '20250902')
+
+        result = MinuteArchive(root).read(['000001.SZ', '600000.SH'], '20250902')
+        assert list(result['000001.SZ']['close']) == [11.12, 11.13, 11.14]
+        assert list(result['600000.SH']['close']) == [9.88, 9.89, 9.90]
+
+if __name__ == "__main__":
+    test_minute_archive_round_trip()
+    test_minute_archive_shared_writers()
+    test_minute_archive_torn_write()
@@ -0,0 +1,114 @@
+"""
+模拟交易账户测试模块
+使用临时配置文件构造真实的Broker，验证账户状态随检查点保存与恢复，以及多个策略共用账户时的持仓归属
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import load_config
+from utils.broker import Broker
+from utils.checkpoint import save_checkpoint, load_checkpoint
+from utils.engine import SharedExecutionHandler
+
+CONFIG_TEXT = """
+[BACKTEST]
+initial_amount = 100000
+commission_rate = 0.0001
+min_commission = 5
+tax_rate = 0.0005
+limit_vol_type = amount
+max_vol_rate = 0.05
+max_vol_amount = 20000
+"""
+
+def _make_broker(tmp_dir: str) -> Broker:
+    """
+    使用临时配置文件构造账户
+    """
+    path = os.path.join(tmp_dir, 'config.ini')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(CONFIG_TEXT)
+    return Broker(load_config(path))
+
+def _signal(action: str, stock_code: str, price: float, volume: int, time: str) -> dict:
+    """
+    构造交易信号
+    """
+    return {'action': action, 'stock_code': stock_code, 'price': price, 'volume': volume, 'time': time, 'desc': 'test'}
+
+def test_broker_state_round_trip():
+    """
+    测试账户状态经检查点文件保存后恢复到新账户，恢复后的账户与原账户互不影响且可继续交易
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        broker = _make_broker(tmp_dir)
+        assert broker.buy(_signal('buy', '000001.SZ', 10.0, 1000, '20250901093000'))
+        assert broker.buy(_signal('buy', '600000.SH', 8.0, 500, '20250901093100'))
+        broker.update_position({'minute': '20250901150000', 'snapshot': []})
+        broker.record_position_and_account_change('20250901')
+        broker.unlock_position()
+        assert broker.sell(_signal('sell', '600000.SH', 8.5, 500, '20250902093000'))
+        broker.record_position_and_account_change('20250902')
+
+        path = os.path.join(tmp_dir, 'checkpoint.ckpt')
+        save_checkpoint(path, {'broker': broker.get_state()})
+        state = load_checkpoint(path)['broker']
+
+        restored = _make_broker(tmp_dir)
+        assert restored.set_state(state)
+        for name in ('initial_amount', 'available_amount', 'positions', 'transactions', 'position_and_account_changes'):
+            assert getattr(restored, name) == getattr(broker, name)
+        assert restored.get_total_assets() == broker.get_total_assets()
+
+        # 同一状态恢复的账户互不影响
+        other = _make_broker(tmp_dir)
+        other.set_state(state)
+        restored.clean_position()
+        assert restored.sell(_signal('sell', '000001.SZ', 11.0, 1000, '20250903093000'))
+        assert other.get_position('000001.SZ')['volume'] == 1000
+        assert broker.get_position('000001.SZ')['volume'] == 1000
+        assert '600000.SH' in other.positions and '600000.SH' not in restored.positions
+        assert len(restored.transactions) == len(broker.transactions) + 1
+
+def test_shared_execution_handler():
+    """
+    测试共享账户：成交记录标注策略名称，持仓归属于建仓的策略，其他策略不能卖出，清仓后归属解除
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        broker = _make_broker(tmp_dir)
+        owners = {}
+        first = SharedExecutionHandler(broker, 'first', owners)
+        second = SharedExecutionHandler(broker, 'second', owners)
+
+        assert first.execute(_signal('buy', '000001.SZ', 10.0, 1000, '20250901093000'))
+        assert not second.execute(_signal('buy', '000001.SZ', 10.0, 500, '20250901093100'))
+        assert second.execute(_signal('buy', '600000.SH', 8.0, 500, '20250901093100'))
+        assert owners == {'000001.SZ': 'first', '600000.SH': 'second'}
+        assert [transaction['strategy'] for transaction in broker.transactions] == ['first', 'second']
+
+        # 当日买入的持仓锁定，卖出失败时不记录成交、不变更归属
+        assert not first.execute(_signal('sell', '000001.SZ', 10.5, 1000, '20250901100000'))
+        assert len(broker.transactions) == 2 and owners['000001.SZ'] == 'first'
+
+        broker.unlock_position()
+        assert not second.execute(_signal('sell', '000001.SZ', 10.5, 1000, '20250902093000'))
+        assert first.execute(_signal('sell', '000001.SZ', 10.5, 400, '20250902093000'))
+        assert owners['000001.SZ'] == 'first'
+        assert first.execute(_signal('sell', '000001.SZ', 10.6, 600, '20250902093100'))
+        assert owners == {'600000.SH': 'second'}
+        assert [transaction['strategy'] for transaction in broker.transactions] == ['first', 'second', 'first', 'first']
+        assert broker.get_position('000001.SZ')['volume'] == 0
+
+        # 清仓后其他策略可以买入
+        broker.clean_position()
+        assert second.execute(_signal('buy', '000001.SZ', 10.0, 100, '20250903093000'))
+        assert owners == {'000001.SZ': 'second', '600000.SH': 'second'}
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
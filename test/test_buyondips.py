@@ -0,0 +1,158 @@
+"""
+BuyOnDips策略测试模块
+验证两阶段模式（预先筛选图形、增量筛选）、股票池预过滤与逐日筛选的选股结果一致
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import strategys.BuyOnDips as buy_on_dips
+import utils.universe as universe
+from strategys.BuyOnDips import BuyOnDips, screen_pattern
+from utils.universe import UniverseFilter
+from test_custom import make_daily_bars
+
+def _make_daily_bars(trade_date: str) -> dict:
+    """
+    构造截至trade_date的日K线数据（收盘价与交易日相关，使各交易日选股结果不同）
+    """
+    day = int(trade_date[-2:])
+    return {
+        '000001.SZ': pd.DataFrame({'close': [10.0, 10.0 + day], 'volume': [100, 200]}),
+        '000002.SZ': pd.DataFrame({'close': [70.0, 70.0], 'volume': [100, 200]}),
+        '600000.SH': pd.DataFrame({'close': [8.0, 8.0], 'volume': [200, 100]}),
+        '600001.SH': pd.DataFrame({'close': [4.0, 30.0 - day], 'volume': [100, 300]}),
+    }
+
+class _Feed:
+    """
+    内存日K线数据源（记录读取的股票）
+    """
+    def __init__(self):
+        self.requested = []
+
+    def get_daily_bars(self, stock_list: list, end_time: str, count: int) -> dict:
+        self.requested.extend(stock_list)
+        daily_bars = _make_daily_bars(end_time)
+        return {stock_code: daily_bars[stock_code] for stock_code in stock_list if stock_code in daily_bars}
+
+def _make_strategy(price_min: float, price_max: float) -> BuyOnDips:
+    """
+    构造不读取配置文件的策略实例
+    """
+    strategy = BuyOnDips.__new__(BuyOnDips)
+    strategy.price_min = price_min
+    strategy.price_max = price_max
+    strategy.screening_cache = None
+    strategy.universe_filter = None
+    strategy.incremental_screening = False
+    strategy.pattern_hits = {}
+    strategy.global_stock_list = ['000001.SZ', '000002.SZ', '600000.SH', '600001.SH']
+    strategy.trade_calendar = ['20250901', '20250902', '20250903', '20250910', '20250925']
+    strategy.feed = _Feed()
+    return strategy
+
+def test_two_phase_screening(monkeypatch):
+    """
+    测试预先筛选的图形结果经价格区间过滤后与逐日筛选一致，且可被不同价格参数的策略复用
+    """
+    # 以放量作为测试用选股图形
+    monkeypatch.setattr(buy_on_dips, 'is_limit_board_after_volume_consolidation', lambda stock_code, daily_bars: daily_bars['volume'].iloc[-1] > daily_bars['volume'].iloc[-2])
+    monkeypatch.setattr(buy_on_dips, 'get_daily_bars', lambda stock_list, period, end_time, count: _make_daily_bars(end_time))
+
+    for price_min, price_max in [(5.0, 60.0), (12.0, 20.0)]:
+        inline = _make_strategy(price_min, price_max)
+        expected = {trade_date: inline._get_selected_stock_list(trade_date) for trade_date in inline.trade_calendar[:-1]}
+
+        two_phase = _make_strategy(price_min, price_max)
+        two_phase.screening_workers = 1
+        two_phase._precompute_pattern_hits()
+        assert sorted(two_phase.pattern_hits) == two_phase.trade_calendar[:-1]
+        variant = _make_strategy(price_min, price_max)
+        variant.prepare_from(two_phase)
+        for strategy in (two_phase, variant):
+            # 预先筛选后逐日运行不再读取日K线
+            strategy.feed = None
+            assert {trade_date: strategy._get_selected_stock_list(trade_date) for trade_date in strategy.trade_calendar[:-1]} == expected
+
+    assert screen_pattern(('20250902', []))[1] == [('000001.SZ', 12.0), ('000002.SZ', 70.0), ('600001.SH', 28.0)]
+
+def _make_summary_bars(stock_list: list, period: str, start_time: str, end_time: str, count: int) -> dict:
+    """
+    构造预过滤汇总表所需的日K线（各交易日收盘价与_make_daily_bars一致）
+    """
+    trade_calendar = ['20250901', '20250902', '20250903', '20250910']
+    summary_bars = {}
+    for stock_code in stock_list:
+        rows = [_make_daily_bars(trade_date)[stock_code].iloc[-1] for trade_date in trade_calendar]
+        summary_bars[stock_code] = pd.DataFrame(rows, index=trade_calendar)
+    return summary_bars
+
+def test_universe_prefilter(monkeypatch):
+    """
+    测试股票池预过滤后选股结果不变，且价格区间外的股票不再读取日K线
+    """
+    monkeypatch.setattr(buy_on_dips, 'is_limit_board_after_volume_consolidation', lambda stock_code, daily_bars: daily_bars['volume'].iloc[-1] > daily_bars['volume'].iloc[-2])
+    monkeypatch.setattr(universe, 'get_daily_bars', _make_summary_bars)
+
+    for price_min, price_max in [(5.0, 60.0), (12.0, 20.0)]:
+        inline = _make_strategy(price_min, price_max)
+        expected = {trade_date: inline._get_selected_stock_list(trade_date) for trade_date in inline.trade_calendar[:-1]}
+
+        prefiltered = _make_strategy(price_min, price_max)
+        prefiltered.universe_filter = UniverseFilter()
+        prefiltered.universe_filter.build(prefiltered.global_stock_list, prefiltered.trade_calendar[:-1])
+        assert {trade_date: prefiltered._get_selected_stock_list(trade_date) for trade_date in prefiltered.trade_calendar[:-1]} == expected
+        assert '000002.SZ' not in prefiltered.feed.requested
+        assert len(prefiltered.feed.requested) < len(inline.feed.requested)
+
+def test_universe_filter_state(monkeypatch):
+    """
+    测试检查点只保存预过滤条件，恢复时重新构建汇总表且选股结果不变
+    """
+    import pickle
+    monkeypatch.setattr(buy_on_dips, 'is_limit_board_after_volume_consolidation', lambda stock_code, daily_bars: daily_bars['volume'].iloc[-1] > daily_bars['volume'].iloc[-2])
+    monkeypatch.setattr(universe, 'get_daily_bars', _make_summary_bars)
+
+    strategy = _make_strategy(5.0, 60.0)
+    strategy.universe_filter = UniverseFilter(exclude_suspended=True)
+    strategy.universe_filter.build(strategy.global_stock_list, strategy.trade_calendar[:-1])
+    expected = {trade_date: strategy._get_selected_stock_list(trade_date) for trade_date in strategy.trade_calendar[:-1]}
+
+    state = strategy.get_state()
+    assert state['universe_filter_params'] == strategy.universe_filter.get_params()
+    assert b'UniverseFilter' not in pickle.dumps(state)
+
+    resumed = _make_strategy(5.0, 60.0)
+    resumed.universe_filter = UniverseFilter(exclude_suspended=True)
+    assert resumed.set_state(pickle.loads(pickle.dumps(state)))
+    assert resumed.universe_filter.closes is not None
+    assert not hasattr(resumed, 'universe_filter_params')
+    assert {trade_date: resumed._get_selected_stock_list(trade_date) for trade_date in resumed.trade_calendar[:-1]} == expected
+
+def test_incremental_screening(monkeypatch):
+    """
+    测试两阶段模式的增量筛选与逐日读取最近90根日K线筛选的图形结果一致
+    """
+    history = {stock_code: make_daily_bars(seed, 200) for seed, stock_code in enumerate(['000001.SZ', '600000.SH', '600001.SH'])}
+    monkeypatch.setattr(buy_on_dips, 'get_daily_bars', lambda stock_list, period, end_time, count: {stock_code: history[stock_code].loc[:end_time].iloc[-count:] for stock_code in stock_list})
+
+    pattern_hits = []
+    for incremental_screening in (False, True):
+        strategy = _make_strategy(5.0, 60.0)
+        strategy.global_stock_list = list(history)
+        strategy.trade_calendar = history['000001.SZ'].index[100:].tolist()
+        strategy.screening_workers = 1
+        strategy.incremental_screening = incremental_screening
+        strategy._precompute_pattern_hits()
+        pattern_hits.append(strategy.pattern_hits)
+    assert pattern_hits[0] == pattern_hits[1]
+    assert any(pattern_hits[1].values())
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
@@ -0,0 +1,119 @@
+"""
+缓存工具测试模块
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import laboratory.custom as custom
+import utils.cache as cache_module
+from utils.cache import ScreeningCache, BundleCache, bump_data_version, get_data_version, _get_dependency_modules
+
+def _pattern(stock_code: str, daily_bars, n: int = 5, m: int = 10) -> bool:
+    """
+    测试用选股图形函数
+    """
+    return True
+
+def test_screening_cache():
+    """
+    测试选股结果缓存命中与数据版本失效
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ScreeningCache(cache_dir)
+        universe = ['000001.SZ', '600000.SH']
+        key = cache.make_key('20250902', universe, _pattern, {'price_min': 5.0})
+        assert cache.get('20250902', key) is None
+        cache.set('20250902', key, ['000001.SZ'])
+        assert cache.get('20250902', key) == ['000001.SZ']
+
+        # 股票池顺序不影响缓存键，参数变化则缓存键变化
+        assert cache.make_key('20250902', universe[::-1], _pattern, {'price_min': 5.0}) == key
+        assert cache.make_key('20250902', universe, _pattern, {'price_min': 6.0}) != key
+        assert cache.make_key('20250902', universe, _pattern, {'price_min': 5.0, 'n': 3}) != key
+
+        # 分时数据版本更新不影响选股缓存，日线数据版本更新后缓存失效
+        assert get_data_version(cache_dir) == '0'
+        bump_data_version(cache_dir, '1m')
+        assert cache.make_key('20250902', universe, _pattern, {'price_min': 5.0}) == key
+        bump_data_version(cache_dir)
+        new_key = cache.make_key('20250902', universe, _pattern, {'price_min': 5.0})
+        assert new_key != key
+        assert cache.get('20250902', new_key) is None
+
+def test_bundle_cache():
+    """
+    测试个股指标缓存的内存LRU、磁盘命中与容量淘汰
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = BundleCache('test', cache_dir, max_items=2, max_disk_bytes=1024 * 1024)
+        calls = []
+        compute = lambda: calls.append(1) or {'ma': 1.0}
+        assert cache.get_or_compute('000001.SZ', '20250902', compute) == {'ma': 1.0}
+        assert cache.get_or_compute('000001.SZ', '20250902', compute) == {'ma': 1.0}
+        assert len(calls) == 1
+
+        # 内存淘汰后仍可从磁盘命中
+        cache.set('000002.SZ', '20250902', {'ma': 2.0})
+        cache.set('000003.SZ', '20250902', {'ma': 3.0})
+        assert len(cache._memory) == 2
+        assert cache.get('000001.SZ', '20250902') == {'ma': 1.0}
+
+        # 其他命名空间不共享
+        assert BundleCache('other', cache_dir).get('000001.SZ', '20250902') is None
+
+        # 数据版本更新后失效
+        bump_data_version(cache_dir)
+        assert cache.get('000001.SZ', '20250902') is None
+
+        # 磁盘超过容量上限时淘汰
+        small = BundleCache('small', cache_dir, max_items=1, max_disk_bytes=2048)
+        for i in range(20):
+            small.set(f"{i:06d}.SZ", '20250902', {'payload': 'x' * 200})
+        assert small._get_disk_bytes() <= 2048
+
+def test_bundle_cache_fingerprint():
+    """
+    测试指标缓存键包含计算函数指纹，计算函数或参数变化时缓存不命中
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = BundleCache('test', cache_dir)
+        fingerprint = cache.get_fingerprint(_pattern, {'count': 30})
+        cache.set('000001.SZ', '20250902', {'ma': 1.0}, fingerprint)
+        assert BundleCache('test', cache_dir).get('000001.SZ', '20250902', cache.get_fingerprint(_pattern, {'count': 30})) == {'ma': 1.0}
+        assert cache.get('000001.SZ', '20250902', cache.get_fingerprint(_pattern, {'count': 60})) is None
+        assert cache.get('000001.SZ', '20250902', cache.get_fingerprint(test_screening_cache, {'count': 30})) is None
+
+def test_data_version_read_once(monkeypatch):
+    """
+    测试缓存实例只读取一次数据版本文件，本进程更新数据版本后重新读取
+    """
+    reads = []
+    get_data_version = cache_module.get_data_version
+    monkeypatch.setattr(cache_module, 'get_data_version', lambda *args: reads.append(args) or get_data_version(*args))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = BundleCache('test', cache_dir, max_disk_bytes=0)
+        for i in range(10):
+            cache.set(f"{i:06d}.SZ", '20250902', {'ma': 1.0})
+            cache.get(f"{i:06d}.SZ", '20250902')
+        assert len(reads) == 1
+        bump_data_version(cache_dir)
+        assert cache.get('000000.SZ', '20250902') is None
+        assert len(reads) == 2
+
+def test_function_fingerprint_dependencies():
+    """
+    测试函数指纹包含选股函数引用的辅助模块
+    """
+    modules = [module.__name__ for module in _get_dependency_modules(custom)]
+    assert modules == ['laboratory.custom', 'laboratory.multipleK', 'laboratory.singleK']
+
+if __name__ == "__main__":
+    test_screening_cache()
+    test_bundle_cache()
+    test_bundle_cache_fingerprint()
+    test_function_fingerprint_dependencies()
@@ -0,0 +1,108 @@
+"""
+回测检查点测试模块
+验证检查点文件读写，以及从检查点续跑与完整运行的结果一致、可使用不同参数分叉运行
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.checkpoint import save_checkpoint, load_checkpoint, find_latest_checkpoint
+from utils.engine import Strategy, BacktestEngine
+from fake_broker import FakeBroker
+
+class _Strategy(Strategy):
+    """
+    每日资产按rate增长的测试策略
+    """
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.broker = FakeBroker()
+        self.prepared = False
+        self.days = []
+
+    def prepare(self) -> bool:
+        self.prepared = True
+        self.trade_calendar = [f"202509{day:02d}" for day in range(1, 8)]
+        return True
+
+    def before_open(self, trade_date: str) -> bool:
+        self.days.append(trade_date)
+        self.broker.available_amount *= 1 + self.rate
+        return False
+
+def test_checkpoint_file():
+    """
+    测试检查点文件读写与无效文件检查
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'sub', 'checkpoint.ckpt')
+        state = {'day': 3, 'positions': {'000001.SZ': {'volume': 100, 'cost_price': 10.5}}}
+        assert save_checkpoint(path, state)
+        assert load_checkpoint(path) == state
+
+        bad_path = os.path.join(tmp_dir, 'bad.ckpt')
+        with open(bad_path, 'wb') as f:
+            f.write(b'not a checkpoint')
+        try:
+            load_checkpoint(bad_path)
+            assert False
+        except ValueError:
+            pass
+
+def test_resume_and_fork():
+    """
+    测试从检查点续跑与完整运行结果一致，以及使用不同参数分叉运行
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        full = _Strategy(0.1)
+        engine = BacktestEngine(full)
+        engine.enable_checkpoint(os.path.join(tmp_dir, 'checkpoint_{trade_date}.ckpt'), 3)
+        engine.run()
+        assert len(full.broker.position_and_account_changes) == 6
+        assert sorted(os.listdir(tmp_dir)) == ['checkpoint_20250903.ckpt', 'checkpoint_20250906.ckpt']
+        assert load_checkpoint(os.path.join(tmp_dir, 'checkpoint_20250906.ckpt'))['day'] == 6
+
+        # 从第3个交易日结束后的检查点续跑
+        path = os.path.join(tmp_dir, 'checkpoint_20250903.ckpt')
+        resumed = _Strategy(0.1)
+        assert BacktestEngine(resumed).run(resume_from=path)
+        assert not resumed.prepared
+        assert resumed.days == ['20250904', '20250905', '20250906']
+        assert resumed.broker.position_and_account_changes == full.broker.position_and_account_changes
+
+        # 使用不同参数从同一检查点分叉运行
+        forked = _Strategy(0.0)
+        assert BacktestEngine(forked).run(resume_from=path)
+        assert forked.broker.position_and_account_changes[:3] == full.broker.position_and_account_changes[:3]
+        assert [change['total_assets'] for change in forked.broker.position_and_account_changes[3:]] == [133.1] * 3
+
+def test_find_latest_checkpoint():
+    """
+    测试按交易日保存的检查点路径解析为最新的检查点文件
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'checkpoint_{trade_date}.ckpt')
+        try:
+            find_latest_checkpoint(path)
+            assert False, "没有匹配的检查点文件时应报错"
+        except ValueError:
+            pass
+
+        for trade_date in ['20250903', '20250910', '20250906']:
+            save_checkpoint(path.replace('{trade_date}', trade_date), {'day': trade_date})
+        save_checkpoint(os.path.join(tmp_dir, 'checkpoint_latest.ckpt'), {})
+        save_checkpoint(os.path.join(tmp_dir, 'checkpoint_20250920.ckpt.bak'), {})
+        assert find_latest_checkpoint(path) == os.path.join(tmp_dir, 'checkpoint_20250910.ckpt')
+
+        # 不包含{trade_date}时原样返回
+        fixed_path = os.path.join(tmp_dir, 'checkpoint.ckpt')
+        assert find_latest_checkpoint(fixed_path) == fixed_path
+
+if __name__ == "__main__":
+    test_checkpoint_file()
+    test_find_latest_checkpoint()
+    test_resume_and_fork()
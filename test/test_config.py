@@ -0,0 +1,53 @@
+"""
+配置管理测试模块
+验证配置文件读取、覆盖项解析与应用
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import parse_override, load_config
+
+def test_parse_override():
+    """
+    测试覆盖项解析
+    """
+    assert parse_override('BACKTEST.initial_amount=500000') == ('BACKTEST', 'initial_amount', '500000')
+    assert parse_override('DATA.minute_archive=') == ('DATA', 'minute_archive', '')
+    assert parse_override('DATA.universe=000001.SZ,600000.SH') == ('DATA', 'universe', '000001.SZ,600000.SH')
+    for override in ['BACKTEST.initial_amount', 'initial_amount=1', '.initial_amount=1', 'BACKTEST.=1']:
+        try:
+            parse_override(override)
+            assert False
+        except ValueError:
+            pass
+
+def test_load_config():
+    """
+    测试读取配置文件并应用覆盖项（后指定的覆盖项优先，配置节不存在时自动创建）
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'config.ini')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("[BACKTEST]\ninitial_amount = 1000000\ntax_rate = 0.0005\n")
+
+        config = load_config(path, ['BACKTEST.initial_amount=500000', 'BACKTEST.initial_amount=200000', 'DATA.screening_workers=4'])
+        assert config.getfloat('BACKTEST', 'initial_amount') == 200000
+        assert config.getfloat('BACKTEST', 'tax_rate') == 0.0005
+        assert config.getint('DATA', 'screening_workers') == 4
+        # 未覆盖时保持配置文件中的值，各次读取相互独立
+        assert load_config(path).getfloat('BACKTEST', 'initial_amount') == 1000000
+
+        try:
+            load_config(os.path.join(tmp_dir, 'missing.ini'))
+            assert False
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    test_parse_override()
+    test_load_config()
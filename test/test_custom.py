@@ -0,0 +1,102 @@
+"""
+自定义组合图形识别测试模块
+验证涨停后缩量盘整图形的增量筛选器与参考实现is_limit_board_after_volume_consolidation的判断结果一致
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from laboratory.custom import is_limit_board_after_volume_consolidation, VolumeConsolidationScreener
+
+def make_daily_bars(seed: int, days: int = 300) -> pd.DataFrame:
+    """
+    构造随机日K线（随机插入涨停板、一字板，以及涨停后的缩量盘整走势）
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    close = 10.0
+    volume = 1e6
+    phase = 0
+    for _ in range(days):
+        pre_close = close
+        if phase == 0 and rng.random() < 0.06:
+            # 涨停（部分为一字板），之后大概率进入盘整
+            close = round(pre_close * 1.1, 2)
+            low = close if rng.random() < 0.15 else round(pre_close * 1.02, 2)
+            high = close
+            volume = volume * (1.5 + rng.random())
+            phase = 1 if rng.random() < 0.8 else 0
+        elif phase > 0:
+            # 盘整：小幅震荡，成交量大概率递减
+            close = round(pre_close * (1 + rng.uniform(-0.012, 0.018)), 2)
+            low = round(min(close, pre_close) * (1 - rng.uniform(0, 0.01)), 2)
+            high = round(max(close, pre_close) * (1 + rng.uniform(0, 0.01)), 2)
+            volume = volume * (rng.uniform(0.82, 1.0) if rng.random() < 0.9 else 1.1)
+            phase = phase + 1 if phase < 6 else 0
+        else:
+            close = round(pre_close * (1 + rng.uniform(-0.02, 0.025)), 2)
+            low = round(min(close, pre_close) * 0.99, 2)
+            high = round(max(close, pre_close) * 1.01, 2)
+            volume = 1e6 * rng.uniform(0.5, 1.5)
+        rows.append({'open': pre_close, 'high': high, 'low': low, 'close': close, 'volume': int(volume), 'preClose': pre_close})
+    index = pd.bdate_range('2024-01-01', periods=days).strftime('%Y%m%d')
+    return pd.DataFrame(rows, index=index)
+
+def test_screener_equivalence():
+    """
+    测试逐日增量更新的判断结果与参考实现对最近window根日K线的判断一致
+    """
+    for n, m, k, window in [(5, 10, 2, 90), (7, 12, 2, 40)]:
+        matches = 0
+        for seed in range(6):
+            daily_bars = make_daily_bars(seed)
+            screener = VolumeConsolidationScreener(n, m, k, window)
+            for position in range(len(daily_bars)):
+                screener.update('600000.SH', daily_bars.iloc[position])
+                expected = is_limit_board_after_volume_consolidation('600000.SH', daily_bars.iloc[max(0, position - window + 1):position + 1], n, m, k)
+                assert screener.is_match('600000.SH') == expected, (n, m, k, window, seed, position)
+                matches += expected
+        # 随机数据中需包含足够多符合图形的交易日，比较才有意义
+        assert matches > 20
+
+def test_screen_bars():
+    """
+    测试按交易日批量筛选（交易日没有K线的股票使用此前最近一根K线时的状态）
+    """
+    bars_a = make_daily_bars(1, 200)
+    bars_b = make_daily_bars(2, 200)
+    bars_b = bars_b.drop(bars_b.index[100:110])
+    daily_bars = {'600000.SH': bars_a, '000001.SZ': bars_b}
+    trade_dates = bars_a.index[95:].tolist()
+    result = VolumeConsolidationScreener().screen_bars(daily_bars, trade_dates)
+    matches = 0
+    for trade_date in trade_dates:
+        expected = []
+        for stock_code, daily_bar in daily_bars.items():
+            window = daily_bar.loc[:trade_date].iloc[-90:]
+            if is_limit_board_after_volume_consolidation(stock_code, window):
+                expected.append((stock_code, window.iloc[-1]['close']))
+        assert result[trade_date] == expected
+        matches += len(expected)
+    assert matches > 0
+
+def test_invalid_params():
+    """
+    测试无效的筛选参数
+    """
+    for params in [{'k': 0}, {'m': 10, 'window': 11}]:
+        try:
+            VolumeConsolidationScreener(**params)
+            assert False
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    test_screener_equivalence()
+    test_screen_bars()
+    test_invalid_params()
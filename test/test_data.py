@@ -4,7 +4,13 @@ import sys
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import tempfile
+import numpy as np
+import pandas as pd
+import utils.data as data_module
 from utils.data import *
+from utils.cache import get_data_version
+from laboratory.singleK import is_limit
 def test_get_trade_calendar():
     """
     测试获取交易日历
@@ -51,6 +57,82 @@ def test_get_daily_bars():
     daily_bars = daily_bars['003007.SZ']
     print(daily_bars)
 
+def test_compact_bars_round_trip():
+    """
+    测试紧凑模式压缩与还原（包括缺失价格与涨停价），还原后与原始数据一致
+    """
+    bars = pd.DataFrame({
+        'open': [10.0, 10.5, np.nan],
+        'high': [11.0, 11.55, np.nan],
+        'low': [9.98, 10.4, np.nan],
+        'close': [11.0, 11.55, np.nan],
+        'volume': [1000.0, 2000.0, np.nan],
+        'preClose': [10.0, 10.5, 11.55],
+    })
+    for price_dtype in PRICE_DTYPES:
+        restored = restore_bars(compact_bars(bars, price_dtype))
+        for field in PRICE_FIELDS:
+            pd.testing.assert_series_equal(restored[field], bars[field], check_names=False)
+        # 缺失价格不能还原为0，涨停判断与原始数据一致
+        assert restored['close'].isna().iloc[-1]
+        assert is_limit('000001.SZ', restored['close'].iloc[0], restored['preClose'].iloc[0])
+        assert is_limit('000001.SZ', restored['close'].iloc[1], restored['preClose'].iloc[1])
+    assert compact_bars(bars, 'fen')['close'].iloc[-1] == FEN_NAN
+
+def test_download_bumps_changed_period(monkeypatch):
+    """
+    测试下载后仅在本地数据有变化时更新对应周期的数据版本
+    """
+    class _FakeXtdata:
+        def __init__(self):
+            self.bars = {'000001.SZ': [(20250901, 10.0, 1000)]}
+            self.new_bars = []
+        def download_history_data(self, stock_code, period, start_time, end_time, incrementally):
+            self.bars[stock_code] += self.new_bars
+        def get_local_data(self, field_list, stock_list, period, count, fill_data):
+            return {stock_code: pd.DataFrame(self.bars[stock_code][-count:], columns=field_list) for stock_code in stock_list}
+
+    fake = _FakeXtdata()
+    monkeypatch.setattr(data_module, 'xtdata', fake)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # 数据无变化时不更新
+        download_stock_history_data(['000001.SZ'], '20250901', period='1d', process_bar=False, cache_dir=cache_dir)
+        assert get_data_version(cache_dir, '1d') == '0'
+
+        # 分时K线变化只更新分时数据版本
+        fake.new_bars = [(20250902, 10.5, 2000)]
+        download_stock_history_data(['000001.SZ'], '20250901', period='1m', process_bar=False, cache_dir=cache_dir)
+        assert get_data_version(cache_dir, '1d') == '0'
+        assert get_data_version(cache_dir, '1m') != '0'
+
+def test_run_concurrently():
+    """
+    测试并发执行异步请求：返回值顺序、并发等待、异常传递，以及在运行中的事件循环内调用
+    """
+    import time
+    import asyncio
+
+    async def _delayed(value, delay=0.2):
+        await asyncio.sleep(delay)
+        return value
+
+    async def _failed():
+        raise ValueError('failed')
+
+    start = time.time()
+    assert run_concurrently(_delayed(1), _delayed(2), _delayed(3)) == [1, 2, 3]
+    assert time.time() - start < 0.5
+
+    try:
+        run_concurrently(_delayed(1), _failed())
+        assert False, "请求失败时应抛出异常"
+    except ValueError:
+        pass
+
+    async def _in_loop():
+        return run_concurrently(_delayed('a', 0.01), _delayed('b', 0.01))
+    assert asyncio.run(_in_loop()) == ['a', 'b']
+
 if __name__ == "__main__":
     # test_get_trade_calendar()
     # test_get_stock_list_in_main_board()
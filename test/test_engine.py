@@ -0,0 +1,224 @@
+"""
+事件驱动回测引擎测试模块
+使用内存行情与记录型账户，验证事件顺序、日K线窗口切片与分时快照生成
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from utils.util import generate_minute_snapshot, iter_minute_snapshot
+from utils.engine import Strategy, DataFeed, BacktestEngine, ExecutionHandler, PortfolioEngine
+from fake_broker import FakeBroker
+
+def _make_bars(trade_date: str, base_price: float, minutes: list) -> pd.DataFrame:
+    """
+    构造单日分时K线数据
+    """
+    index = [f"{trade_date}{minute}" for minute in minutes]
+    return pd.DataFrame({
+        'open': [base_price] * len(index),
+        'high': [base_price + 0.1] * len(index),
+        'low': [base_price - 0.1] * len(index),
+        'close': [base_price + 0.01 * i for i in range(len(index))],
+        'volume': [1000] * len(index),
+    }, index=index)
+
+class _MemoryFeed(DataFeed):
+    """
+    内存行情数据源
+    """
+    def __init__(self, minute_bars: dict):
+        super().__init__()
+        self.minute_bars = minute_bars
+        self.requests = []
+
+    def get_minute_bars(self, stock_list: list, trade_date: str) -> dict:
+        self.requests.append((tuple(stock_list), trade_date))
+        return {stock_code: self.minute_bars[trade_date][stock_code] for stock_code in stock_list if stock_code in self.minute_bars.get(trade_date, {})}
+
+class _Strategy(Strategy):
+    """
+    每个交易日首分钟买入的测试策略
+    """
+    def __init__(self):
+        self.broker = FakeBroker()
+        self.calls = []
+
+    def prepare(self) -> bool:
+        self.trade_calendar = ['20250901', '20250902', '20250903', '20250904']
+        return True
+
+    def before_open(self, trade_date: str) -> bool:
+        self.calls.append(('before_open', trade_date, self.engine.clock.next_trade_date))
+        # 第二个交易日不回放分时行情
+        return trade_date != '20250902'
+
+    def get_bar_universe(self) -> list:
+        return ['000001.SZ', '600000.SH']
+
+    def on_bar(self, snapshot: dict) -> bool:
+        self.calls.append(('on_bar', snapshot['minute'], len(snapshot['snapshot'])))
+        if snapshot['minute'].endswith('093000'):
+            self.submit({'action': 'buy', 'stock_code': '000001.SZ', 'time': snapshot['minute']})
+        return True
+
+    def after_close(self, trade_date: str) -> bool:
+        self.calls.append(('after_close', trade_date))
+        return True
+
+    def end_of_backtest(self) -> bool:
+        self.calls.append(('end',))
+        return True
+
+def test_iter_minute_snapshot():
+    """
+    测试逐分钟生成的快照与generate_minute_snapshot一致
+    """
+    daily_bars = {
+        '000001.SZ': _make_bars('20250902', 10.0, ['093000', '093100', '093200']),
+        '600000.SH': _make_bars('20250902', 8.0, ['093100', '093300']),
+        '000002.SZ': _make_bars('20250902', 5.0, [])
+    }
+    expected = generate_minute_snapshot(daily_bars)
+    actual = list(iter_minute_snapshot(daily_bars))
+    assert [item['minute'] for item in actual] == [item['minute'] for item in expected]
+    for actual_item, expected_item in zip(actual, expected):
+        assert [x['stock_code'] for x in actual_item['snapshot']] == [x['stock_code'] for x in expected_item['snapshot']]
+        for actual_stock, expected_stock in zip(actual_item['snapshot'], expected_item['snapshot']):
+            pd.testing.assert_frame_equal(actual_stock['bars'], expected_stock['bars'])
+
+def test_backtest_engine_event_order():
+    """
+    测试引擎按 盘前 -> 分时 -> 盘后 的顺序逐日运行，成交与结算由执行器完成
+    """
+    minute_bars = {
+        '20250902': {'000001.SZ': _make_bars('20250902', 10.0, ['093000', '093100'])},
+        '20250904': {'000001.SZ': _make_bars('20250904', 10.0, ['093000']), '600000.SH': _make_bars('20250904', 8.0, ['093000'])},
+    }
+    strategy = _Strategy()
+    feed = _MemoryFeed(minute_bars)
+    engine = BacktestEngine(strategy, feed, ExecutionHandler(strategy.broker))
+    assert engine.run()
+
+    assert strategy.calls == [
+        ('before_open', '20250901', '20250902'),
+        ('on_bar', '20250902093000', 1),
+        ('on_bar', '20250902093100', 1),
+        ('after_close', '20250901'),
+        ('before_open', '20250902', '20250903'),
+        ('after_close', '20250902'),
+        ('before_open', '20250903', '20250904'),
+        ('on_bar', '20250904093000', 2),
+        ('after_close', '20250903'),
+        ('end',),
+    ]
+    assert strategy.broker.events == [
+        ('buy', '000001.SZ', '20250902093000'),
+        ('update', '20250902093100'),
+        ('record', '20250901'),
+        ('record', '20250902'),
+        ('buy', '000001.SZ', '20250904093000'),
+        ('update', '20250904093000'),
+        ('record', '20250903'),
+    ]
+    assert [trade_date for _, trade_date in feed.requests] == ['20250902', '20250904']
+    assert strategy.broker.opened == 3
+
+class _PairStrategy(Strategy):
+    """
+    首分钟买入指定股票、次分钟卖出全部持仓的测试策略
+    """
+    def __init__(self, name: str, stock_list: list, sell: bool):
+        self.name = name
+        self.stock_list = stock_list
+        self.sell = sell
+        self.broker = FakeBroker()
+        self.bars = []
+        self.prepared = False
+
+    def prepare(self) -> bool:
+        self.prepared = True
+        self.trade_calendar = ['20250901', '20250902']
+        return True
+
+    def before_open(self, trade_date: str) -> bool:
+        return True
+
+    def get_bar_universe(self) -> list:
+        return self.stock_list
+
+    def on_bar(self, snapshot: dict) -> bool:
+        self.bars.append((snapshot['minute'], [item['stock_code'] for item in snapshot['snapshot']]))
+        for item in snapshot['snapshot']:
+            signal = {'stock_code': item['stock_code'], 'time': snapshot['minute']}
+            if snapshot['minute'].endswith('093000'):
+                self.submit(dict(signal, action='buy'))
+            elif self.sell:
+                self.submit(dict(signal, action='sell'))
+        return True
+
+def test_portfolio_engine():
+    """
+    测试多策略共用行情数据源（分时K线只读取一次），独立账户与共享账户归属
+    """
+    minute_bars = {'20250902': {
+        '000001.SZ': _make_bars('20250902', 10.0, ['093000', '093100']),
+        '600000.SH': _make_bars('20250902', 8.0, ['093000', '093100']),
+    }}
+
+    # 独立账户：各策略只收到自己股票池的快照
+    first = _PairStrategy('first', ['000001.SZ'], False)
+    second = _PairStrategy('second', ['000001.SZ', '600000.SH'], True)
+    feed = _MemoryFeed(minute_bars)
+    assert PortfolioEngine([first, second], feed).run()
+    assert first.prepared and not second.prepared
+    assert second.trade_calendar == first.trade_calendar
+    assert feed.requests == [(('000001.SZ', '600000.SH'), '20250902')]
+    assert first.bars == [('20250902093000', ['000001.SZ']), ('20250902093100', ['000001.SZ'])]
+    assert second.bars[0] == ('20250902093000', ['000001.SZ', '600000.SH'])
+    assert [event[0] for event in first.broker.events] == ['buy', 'update', 'record']
+    assert [event[0] for event in second.broker.events] == ['buy', 'buy', 'sell', 'sell', 'update', 'record']
+    assert first.broker.opened == 1 and second.broker.opened == 1
+
+    # 共享账户：持仓归属于先建仓的策略，其他策略不能卖出
+    first = _PairStrategy('first', ['000001.SZ'], False)
+    second = _PairStrategy('second', ['000001.SZ', '600000.SH'], True)
+    broker = FakeBroker()
+    engine = PortfolioEngine([first, second], _MemoryFeed(minute_bars), shared_broker=broker)
+    assert engine.run()
+    assert first.broker is broker and second.broker is broker
+    assert [event[0] for event in broker.events] == ['buy', 'buy', 'sell', 'update', 'record']
+    # 共享账户的盘前处理每日只执行一次
+    assert broker.opened == 1
+    assert [transaction['strategy'] for transaction in broker.transactions] == ['first', 'second', 'second']
+    assert engine.owners == {'000001.SZ': 'first'}
+    attribution = engine.get_attribution()
+    assert attribution['first']['trades'] == 1
+    assert attribution['first']['profit'] == 1000.0 - 1005.0
+    assert attribution['second']['trades'] == 2
+    assert attribution['second']['profit'] == (1100.0 - 5.5) - 1005.0
+
+def test_data_feed_window_slice():
+    """
+    测试同一交易日内较短的日K线请求从较长的数据窗口中切片
+    """
+    feed = DataFeed()
+    bars = pd.DataFrame({'close': [float(i) for i in range(90)]})
+    feed._windows[('20250902', 90)] = {'000001.SZ': bars}
+    result = feed.get_daily_bars(['000001.SZ'], '20250902', 30)
+    assert result['000001.SZ']['close'].tolist() == [float(i) for i in range(60, 90)]
+
+    computed = []
+    bundles = feed.get_indicator_bundles(['000001.SZ'], '20250902', lambda stock_code, daily_bar: computed.append(stock_code) or {'ma': daily_bar['close'].mean()}, count=30)
+    assert bundles['000001.SZ']['ma'] == 74.5
+    assert computed == ['000001.SZ']
+
+if __name__ == "__main__":
+    test_iter_minute_snapshot()
+    test_backtest_engine_event_order()
+    test_portfolio_engine()
+    test_data_feed_window_slice()
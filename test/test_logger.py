@@ -6,13 +6,16 @@
 import os
 import sys
 import time
+import logging
+import tempfile
+import configparser
 import traceback
 from datetime import datetime
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.logger import get_logger, info, debug, warning, error, exception, critical
+from utils.logger import Logger, get_logger, info, debug, warning, error, exception, critical
 
 
 def test_basic_logging():
@@ -217,6 +220,30 @@ def test_different_log_levels():
     print("日志级别测试完成\n")
 
 
+def test_configure():
+    """
+    测试按已读取的配置设置日志级别与日志目录
+    """
+    with tempfile.TemporaryDirectory() as log_dir:
+        config = configparser.ConfigParser()
+        config.read_dict({'LOGGING': {'level': 'WARNING', 'log_dir': log_dir}})
+        logger = Logger("ConfigureTest", config_file=os.path.join(log_dir, 'missing.ini'))
+        logger.configure(config)
+        file_handlers = [handler for handler in logger.logger.handlers if isinstance(handler, logging.FileHandler)]
+        assert len(file_handlers) == 1
+        assert os.path.dirname(file_handlers[0].baseFilename) == os.path.abspath(log_dir)
+        assert all(handler.level == logging.WARNING for handler in logger.logger.handlers)
+
+        logger.info("不输出的信息日志")
+        logger.warning("输出的警告日志")
+        with open(file_handlers[0].baseFilename, 'r', encoding='utf-8') as f:
+            content = f.read()
+        assert "输出的警告日志" in content and "不输出的信息日志" not in content
+        for handler in file_handlers:
+            logger.logger.removeHandler(handler)
+            handler.close()
+
+
 def main():
     """
     主测试函数
@@ -235,6 +262,7 @@ def main():
         test_log_file_creation()
         test_log_formatting()
         test_different_log_levels()
+        test_configure()
         
         # 测试完成
         info("=" * 50)
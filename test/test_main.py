@@ -0,0 +1,109 @@
+"""
+命令行入口测试模块
+验证子命令解析、命令行参数转换为配置覆盖项、参数网格解析与分阶段计时
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import parse_args, get_overrides, parse_param_grid
+from utils.profiler import PhaseTimer
+
+def test_parse_args():
+    """
+    测试子命令解析（未指定子命令时默认为backtest）
+    """
+    args = parse_args([])
+    assert args.command == 'backtest' and args.resume is None
+    args = parse_args(['--resume'])
+    assert args.command == 'backtest' and args.resume == ''
+    args = parse_args(['backtest', '--resume', 'results/checkpoint.ckpt', '--price-min', '8'])
+    assert args.resume == 'results/checkpoint.ckpt' and args.price_min == 8.0
+    args = parse_args(['sweep', '--grid', 'price_min=5,8', '--workers', '2'])
+    assert args.command == 'sweep' and args.grid == ['price_min=5,8']
+
+    # 子命令之前的公共参数
+    args = parse_args(['-c', 'other.ini', 'backtest'])
+    assert args.command == 'backtest' and args.config == 'other.ini'
+    args = parse_args(['-c', 'other.ini', '-s', 'BACKTEST.initial_amount=500000', '--profile', 'sweep', '--workers', '2'])
+    assert args.command == 'sweep' and args.config == 'other.ini' and args.set == ['BACKTEST.initial_amount=500000']
+    assert args.profile and args.workers == 2
+    args = parse_args(['--config=other.ini', 'download', '--download-start', '20250101'])
+    assert args.command == 'download' and args.config == 'other.ini' and args.download_start == '20250101'
+    # 选项的参数值与子命令同名时不作为子命令
+    args = parse_args(['--name', 'sweep', '-c', 'other.ini'])
+    assert args.command == 'backtest' and args.name == 'sweep' and args.config == 'other.ini'
+    args = parse_args(['--resume', 'backtest'])
+    assert args.command == 'backtest' and args.resume == ''
+
+def test_get_overrides():
+    """
+    测试命令行参数转换为配置覆盖项（专用参数在--set之后，优先级更高）
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        universe_file = os.path.join(tmp_dir, 'universe.txt')
+        with open(universe_file, 'w', encoding='utf-8') as f:
+            f.write("000001.SZ\n600000.SH\n")
+        args = parse_args(['backtest', '-s', 'DATA.screening_workers=1', '--workers', '4', '--universe', universe_file, '--backend', 'xtdata', '--start', '20250801'])
+    assert get_overrides(args) == [
+        'DATA.screening_workers=1',
+        'BACKTEST.backtest_start_time=20250801',
+        'DATA.universe=000001.SZ,600000.SH',
+        'DATA.minute_archive=',
+        'DATA.screening_workers=4',
+    ]
+
+    args = parse_args(['sweep', '--universe', '000001.SZ, 600000.SH', '--universe-limit', '100', '--train-days', '40', '--metric', 'sharpe'])
+    assert get_overrides(args) == [
+        'DATA.universe=000001.SZ,600000.SH',
+        'DATA.universe_limit=100',
+        'WALKFORWARD.train_days=40',
+        'WALKFORWARD.metric=sharpe',
+        'DOWNLOAD.download_required=false',
+        'BACKTEST.checkpoint_interval=0',
+    ]
+
+    args = parse_args(['download', '--download-start', '20240101', '--archive-dir', 'archive'])
+    assert get_overrides(args) == [
+        'DATA.minute_archive=archive',
+        'DOWNLOAD.download_required=true',
+        'DOWNLOAD.download_start_time=20240101',
+        'DATA.screening_workers=0',
+    ]
+
+def test_parse_param_grid():
+    """
+    测试参数网格解析
+    """
+    assert parse_param_grid(['price_min=5,8.5', 'price_max=60', 'mode=fast']) == {'price_min': [5, 8.5], 'price_max': [60], 'mode': ['fast']}
+    try:
+        parse_param_grid(['price_min'])
+        assert False
+    except ValueError:
+        pass
+
+def test_phase_timer():
+    """
+    测试分阶段计时（只影响被包装的实例）
+    """
+    class _Worker:
+        def work(self, value: int) -> int:
+            return value * 2
+
+    timer = PhaseTimer()
+    worker = _Worker()
+    timer.wrap(worker, 'work', 'double')
+    assert [worker.work(value) for value in range(3)] == [0, 2, 4]
+    assert _Worker().work(1) == 2
+    assert timer.stats['double']['calls'] == 3
+    assert 'double' in timer.report(1.0)
+
+if __name__ == "__main__":
+    test_parse_args()
+    test_get_overrides()
+    test_parse_param_grid()
+    test_phase_timer()
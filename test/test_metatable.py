@@ -0,0 +1,133 @@
+"""
+metatable数据读取测试模块
+构造临时feather文件，验证数据集缓存与条件下推读取
+"""
+
+import os
+import sys
+import time
+import tempfile
+import pyarrow as pa
+from pyarrow import feather as fe
+from pyarrow import dataset as ds
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xtquant.metatable import get_arrow, meta_config
+
+def _write_feather(file_path: str, n_rows: int):
+    """
+    写入feather文件
+    """
+    table = pa.table({
+        '_time': [1704038400000 + i * 86400000 for i in range(n_rows)],
+        '_stock': ['000001.SZ' if i % 2 == 0 else '600000.SH' for i in range(n_rows)],
+        'value': [float(i) for i in range(n_rows)],
+        'other': [i for i in range(n_rows)],
+    })
+    fe.write_feather(table, file_path)
+
+def test_open_feather_dataset():
+    """
+    测试feather数据集缓存（按修改时间失效）与条件、字段下推
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'data.fe')
+        _write_feather(file_path, 10)
+
+        dataset, fields = get_arrow._open_feather_dataset(file_path)
+        assert fields == ['_time', '_stock', 'value', 'other']
+        assert get_arrow._open_feather_dataset(file_path)[0] is dataset
+
+        expr = (ds.field('_time') >= 1704038400000 + 2 * 86400000) & ds.field('_stock').isin(['000001.SZ'])
+        table = dataset.to_table(columns=['_time', 'value'], filter=expr)
+        assert table.column_names == ['_time', 'value']
+        assert table.column('value').to_pylist() == [2.0, 4.0, 6.0, 8.0]
+
+        # 文件更新后重新打开
+        time.sleep(0.01)
+        _write_feather(file_path, 4)
+        os.utime(file_path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        dataset_new, _ = get_arrow._open_feather_dataset(file_path)
+        assert dataset_new is not dataset
+        assert dataset_new.count_rows() == 4
+        assert sum(1 for key in get_arrow.__FEATHER_CACHE__ if key[0] == file_path) == 1
+        del dataset, dataset_new, table
+
+def test_metainfos_cache(monkeypatch):
+    """
+    测试元数据缓存的写入、读取、清除、过期与客户端版本校验
+    """
+    from xtquant import xtdata
+    client_version = {'version': None}
+    monkeypatch.setattr(xtdata, '_get_connected_client_version', lambda: client_version['version'], raising=False)
+    monkeypatch.setattr(xtdata, 'data_dir', None, raising=False)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 未设置数据路径时缓存位于用户目录，不连接客户端
+        monkeypatch.setenv('HOME', tmp_dir)
+        monkeypatch.setenv('USERPROFILE', tmp_dir)
+        assert meta_config._get_metainfos_cache_path() == os.path.join(tmp_dir, '.xtquant', meta_config.__META_CACHE_FILE__)
+        monkeypatch.setattr(xtdata, 'data_dir', tmp_dir)
+        cache_path = os.path.join(tmp_dir, 'EP', meta_config.__META_CACHE_FILE__)
+        assert meta_config._get_metainfos_cache_path() == cache_path
+
+        def _fill():
+            meta_config.__META_INFO__.update({'1001': {'I': '1001', 'modelName': 'table', 'fields': {'A': {'modelName': 'a'}}}})
+            meta_config.__META_TABLES__.update({'table': '1001'})
+            meta_config.__META_FIELDS__.update({'table.a': ('1001', 'A')})
+
+        try:
+            client_version['version'] = {'data_dir': 'd1', 'api_version': {'downloadversion': 1}}
+            _fill()
+            meta_config._save_metainfos_cache()
+            assert os.path.exists(cache_path)
+
+            info, fields, tables = meta_config._load_metainfos_cache()
+            assert info['1001']['modelName'] == 'table'
+            assert fields == {'table.a': ('1001', 'A')}
+            assert tables == {'table': '1001'}
+
+            # 清除缓存后原字典对象保持不变（其他模块通过import引用）
+            meta_info = meta_config.__META_INFO__
+            meta_config._clear_metainfos_cache()
+            assert meta_config.__META_INFO__ is meta_info and not meta_info
+            assert meta_config._load_metainfos_cache() is None
+
+            # 已连接客户端版本不一致时不使用缓存
+            _fill()
+            meta_config._save_metainfos_cache()
+            client_version['version'] = {'data_dir': 'd1', 'api_version': {'downloadversion': 2}}
+            assert meta_config._load_metainfos_cache() is None
+
+            # 未连接时先使用缓存，连接后版本不一致则清除
+            client_version['version'] = None
+            meta_config._clear_metainfos_cache()
+            client_version['version'] = {'data_dir': 'd1', 'api_version': {'downloadversion': 1}}
+            _fill()
+            meta_config._save_metainfos_cache()
+            meta_config.__META_INFO__.clear()
+            client_version['version'] = None
+            meta_config.__META_INFO__.update(meta_config._load_metainfos_cache()[0])
+            client_version['version'] = {'data_dir': 'd1', 'api_version': {'downloadversion': 1}}
+            meta_config._check_metainfos_cache()
+            assert meta_config.__META_INFO__ and os.path.exists(cache_path)
+            client_version['version'] = {'data_dir': 'd2', 'api_version': {'downloadversion': 1}}
+            meta_config._check_metainfos_cache()
+            assert not meta_config.__META_INFO__ and not os.path.exists(cache_path)
+
+            # 过期缓存
+            _fill()
+            meta_config._save_metainfos_cache()
+            expired = time.time() - meta_config.__META_CACHE_TTL__ - 1
+            os.utime(cache_path, (expired, expired))
+            assert meta_config._load_metainfos_cache() is None
+        finally:
+            meta_config.__META_INFO__.clear()
+            meta_config.__META_FIELDS__.clear()
+            meta_config.__META_TABLES__.clear()
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
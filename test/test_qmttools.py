@@ -0,0 +1,151 @@
+"""
+qmttools行情接口测试模块
+使用桩数据验证get_market_data按列构建的结果与原逐单元格实现一致（包括整数与浮点混合字段的类型），
+以及K线分批回放的调用次序
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xtquant.qmttools import functions
+from xtquant.qmttools.stgframe import StrategyLoader
+
+STOCKS = ['000001.SZ', '600000.SH']
+TIMES = ['20250901', '20250902', '20250903']
+
+def _get_market_data_ori(field_list=[], stock_list=[], period='', start_time='', end_time='', count=-1, dividend_type='', fill_data=True):
+    """
+    桩行情数据：close为浮点字段，volume为整数字段，count大于0时返回最近count根K线
+    """
+    stocks = [stock for stock in STOCKS if stock in stock_list]
+    positions = [STOCKS.index(stock) for stock in stocks]
+    times = slice(-count, None) if count > 0 else slice(None)
+    data = {
+        'close': np.array([[10.5, 10.6, 10.7], [8.1, 8.2, 8.3]], dtype=np.float64)[positions][:, times],
+        'volume': np.array([[100, 200, 300], [400, 500, 600]], dtype=np.int64)[positions][:, times],
+    }
+    return (stocks, TIMES[times]), {field: data[field] for field in (field_list or data)}
+
+def _reference_get_market_data(fields, stock_code, start_time='', end_time='', count=-1):
+    """
+    原逐单元格实现（K线部分），用于对比
+    """
+    index, data = _get_market_data_ori(field_list=fields, stock_list=stock_code, start_time=start_time, end_time=end_time, count=1 if count == -2 else count)
+    if count == -2:
+        end_time, count = '', -1
+    oriData = {}
+    for i, stock in enumerate(index[0]):
+        oriData[stock] = {timetag: {key: data[key][i][j] for key in data} for j, timetag in enumerate(index[1])}
+    resultDict = {}
+    for code in oriData:
+        for timenode in oriData[code]:
+            resultDict[code + timenode] = [oriData[code][timenode][field] for field in fields]
+
+    if len(fields) == 1 and len(stock_code) <= 1 and ((start_time == '' and end_time == '') or start_time == end_time) and count == -1:
+        for key in resultDict:
+            return resultDict[key][0]
+        return -1
+    if len(stock_code) <= 1 and start_time == '' and end_time == '' and count == -1:
+        for key in resultDict:
+            return pd.Series(resultDict[key], index=fields)
+    if len(stock_code) > 1 and start_time == '' and end_time == '' and count == -1:
+        values = []
+        for code in stock_code:
+            if code in oriData:
+                values.extend(resultDict[code + timenode] for timenode in oriData[code])
+            else:
+                values.append([np.nan])
+        return pd.DataFrame(values, index=stock_code, columns=fields)
+    if len(stock_code) <= 1:
+        values, times = [], []
+        for code in oriData:
+            for timenode in oriData[code]:
+                times.append(timenode)
+                values.append(resultDict[code + timenode])
+        return pd.DataFrame(values, index=times, columns=fields)
+    return oriData
+
+def test_get_market_data_dtypes(monkeypatch):
+    """
+    测试各返回形式与原实现一致，整数字段保持整数类型
+    """
+    monkeypatch.setattr(functions.xtdata, 'get_market_data_ori', _get_market_data_ori, raising=False)
+    fields = ['close', 'volume']
+
+    for stock_code, field_list in [(['000001.SZ'], ['volume']), (['000001.SZ'], ['close'])]:
+        expected = _reference_get_market_data(field_list, stock_code)
+        actual = functions.get_market_data(field_list, stock_code, period='1d')
+        assert actual == expected and type(actual) == type(expected)
+
+    expected = _reference_get_market_data(fields, ['000001.SZ'])
+    pd.testing.assert_series_equal(functions.get_market_data(fields, ['000001.SZ'], period='1d'), expected)
+
+    expected = _reference_get_market_data(fields, ['000001.SZ', '000002.SZ', '600000.SH'], count=-2)
+    actual = functions.get_market_data(fields, ['000001.SZ', '000002.SZ', '600000.SH'], period='1d', count=-2)
+    pd.testing.assert_frame_equal(actual, expected)
+
+    expected = _reference_get_market_data(fields, ['600000.SH'], start_time='20250901')
+    actual = functions.get_market_data(fields, ['600000.SH'], start_time='20250901', period='1d')
+    pd.testing.assert_frame_equal(actual, expected)
+    assert actual['volume'].dtype == np.int64 and actual['volume'].iloc[0] == 400
+
+    expected = _reference_get_market_data(fields, STOCKS, start_time='20250901')
+    actual = functions.get_market_data(fields, STOCKS, start_time='20250901', period='1d')
+    assert actual == expected
+
+def _make_loader(timelist, runbar_batch, start_time_num=0, end_time_num=0):
+    """
+    构造使用桩call_formula/handlebar的StrategyLoader
+    Returns:
+        tuple: (loader, 调用记录列表)
+    """
+    calls = []
+    loader = StrategyLoader()
+    C = SimpleNamespace(
+        timelist=list(timelist), lastrunbarpos=0, barpos=0, push_result={},
+        runbar_batch=runbar_batch, start_time_num=start_time_num, end_time_num=end_time_num,
+    )
+    C.handlebar = lambda: calls.append(('handlebar', C.barpos))
+    loader.C = C
+    loader.call_formula = lambda func, data: calls.append((func, list(data['timelist'])))
+    return loader, calls
+
+def test_run_bar_batch():
+    """
+    测试分批回放：区间内每根K线设置barpos并调用一次handlebar，每批调用一次runbar，
+    最后一根K线单独处理，index只推送一次
+    """
+    timelist = list(range(100, 110))
+    loader, calls = _make_loader(timelist, runbar_batch=4, start_time_num=102)
+    loader.run_bar()
+
+    assert [data for func, data in calls if func == 'runbar'] == [
+        [100, 101, 102, 103], [104, 105, 106, 107], [108], [109],
+    ]
+    assert [pos for func, pos in calls if func == 'handlebar'] == list(range(2, 10))
+    assert [data for func, data in calls if func == 'index'] == [timelist]
+    assert calls[-1][0] == 'index'
+    assert loader.C.lastrunbarpos == 9
+
+    # 与逐根回放的handlebar调用一致
+    loader_single, calls_single = _make_loader(timelist, runbar_batch=0, start_time_num=102)
+    loader_single.run_bar()
+    assert [call for call in calls if call[0] == 'handlebar'] == [call for call in calls_single if call[0] == 'handlebar']
+
+    # 新K线到达后从上次位置继续，最后一根K线单独处理
+    calls.clear()
+    loader.C.timelist.append(110)
+    loader.run_bar()
+    assert [data for func, data in calls if func == 'runbar'] == [[109], [110]]
+    assert [pos for func, pos in calls if func == 'handlebar'] == [9, 10]
+    assert [data for func, data in calls if func == 'index'] == [[109, 110]]
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
@@ -0,0 +1,78 @@
+"""
+股票池预过滤测试模块
+验证每日汇总表构建，以及按价格区间、停牌、ST、上市天数、流动性过滤股票池
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import utils.universe as universe
+from utils.universe import UniverseFilter
+
+TRADE_CALENDAR = ['20250901', '20250902', '20250903', '20250904']
+
+def _make_daily_bars(stock_list: list, period: str, start_time: str, end_time: str, count: int) -> dict:
+    """
+    构造日K线数据（停牌日沿用前收盘价、成交量为0，与fill_data一致）
+    """
+    bars = {
+        '000001.SZ': pd.DataFrame({'close': [10.0, 11.0, 12.0, 13.0], 'volume': [1000, 1000, 1000, 1000], 'amount': [1e6, 1e6, 1e6, 1e6]}, index=TRADE_CALENDAR),
+        '000002.SZ': pd.DataFrame({'close': [70.0, 70.0, 70.0, 70.0], 'volume': [1000, 1000, 1000, 1000], 'amount': [7e6, 7e6, 7e6, 7e6]}, index=TRADE_CALENDAR),
+        '600000.SH': pd.DataFrame({'close': [8.0, 8.0, 8.0, 8.0], 'volume': [500, 500, 0, 500], 'amount': [4e5, 4e5, 0, 4e5]}, index=TRADE_CALENDAR),
+        '600001.SH': pd.DataFrame({'close': [20.0, 21.0], 'volume': [3000, 3000], 'amount': [6e6, 6e6]}, index=TRADE_CALENDAR[2:]),
+        '600002.SH': pd.DataFrame({'close': [9.0, 9.0, 9.0, 9.0], 'volume': [100, 100, 100, 100], 'amount': [9e4, 9e4, 9e4, 9e4]}, index=TRADE_CALENDAR),
+    }
+    return {stock_code: bars[stock_code] for stock_code in stock_list if stock_code in bars}
+
+def _make_instrument_detail_table(stock_list: list) -> pd.DataFrame:
+    """
+    构造合约信息表
+    """
+    return pd.DataFrame({
+        'open_date': ['19910403', '19910129', '19991110', '20250903', '20000101'],
+        'is_st': [False, False, False, False, True],
+    }, index=['000001.SZ', '000002.SZ', '600000.SH', '600001.SH', '600002.SH'])
+
+STOCK_LIST = ['000001.SZ', '000002.SZ', '600000.SH', '600001.SH', '600002.SH', '600003.SH']
+
+def test_filter_price_band(monkeypatch):
+    """
+    测试按价格区间过滤（无行情的股票剔除，汇总表不包含的交易日不过滤）
+    """
+    monkeypatch.setattr(universe, 'get_daily_bars', _make_daily_bars)
+    universe_filter = UniverseFilter(batch_size=2)
+    assert universe_filter.build(STOCK_LIST, TRADE_CALENDAR)
+    assert universe_filter.filter(STOCK_LIST, '20250901') == ['000001.SZ', '000002.SZ', '600000.SH', '600002.SH']
+    assert universe_filter.filter(STOCK_LIST, '20250902', 5.0, 60.0) == ['000001.SZ', '600000.SH', '600002.SH']
+    assert universe_filter.filter(STOCK_LIST, '20250904', 10.0, 20.0) == ['000001.SZ']
+    assert universe_filter.filter(STOCK_LIST, '20250905', 10.0, 20.0) == STOCK_LIST
+
+def test_filter_conditions(monkeypatch):
+    """
+    测试按停牌、ST、上市天数、流动性过滤
+    """
+    monkeypatch.setattr(universe, 'get_daily_bars', _make_daily_bars)
+    monkeypatch.setattr(universe, 'get_instrument_detail_table', _make_instrument_detail_table)
+
+    universe_filter = UniverseFilter(exclude_suspended=True)
+    universe_filter.build(STOCK_LIST, TRADE_CALENDAR)
+    assert '600000.SH' not in universe_filter.filter(STOCK_LIST, '20250903')
+    assert '600000.SH' in universe_filter.filter(STOCK_LIST, '20250904')
+
+    universe_filter = UniverseFilter(exclude_st=True, min_listing_days=30)
+    universe_filter.build(STOCK_LIST, TRADE_CALENDAR)
+    assert universe_filter.filter(STOCK_LIST, '20250904') == ['000001.SZ', '000002.SZ', '600000.SH']
+
+    # 日均成交额按最近2个交易日计算，停牌日成交额为0
+    universe_filter = UniverseFilter(min_amount=3e5, amount_window=2)
+    universe_filter.build(STOCK_LIST, TRADE_CALENDAR)
+    assert universe_filter.filter(STOCK_LIST, '20250902') == ['000001.SZ', '000002.SZ', '600000.SH']
+    assert universe_filter.filter(STOCK_LIST, '20250903') == ['000001.SZ', '000002.SZ', '600001.SH']
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
@@ -6,7 +6,8 @@ import sys
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.util import generate_minute_snapshot
+import pandas as pd
+from utils.util import generate_minute_snapshot, date_str_to_num_str, get_num_date_before_n_days, get_date_interval, time_str_to_datetime
 from utils.data import get_daily_bars
 
 def test_generate_minute_snapshot():
@@ -24,4 +25,25 @@ def test_generate_minute_snapshot():
         print(snapshot)
         print('-'*100)
 
-test_generate_minute_snapshot()
\ No newline at end of file
+def test_date_helpers():
+    """
+    测试日期工具函数与pandas实现结果一致
+    """
+    for date_str in ['2024-02-29', '20240301', '2024/03/05']:
+        assert date_str_to_num_str(date_str) == pd.to_datetime(date_str).strftime('%Y%m%d')
+        for days in [0, 1, 30, 400]:
+            date = pd.to_datetime(date_str) - pd.Timedelta(days=days)
+            assert get_num_date_before_n_days(date_str, days, 'number') == date.strftime('%Y%m%d')
+            assert get_num_date_before_n_days(date_str, days, 'str') == date.strftime('%Y-%m-%d')
+    assert get_date_interval('20250301', '20240228') == 367
+    assert time_str_to_datetime('20250909093900') == '2025-09-09 09:39:00'
+    for time_str in ['2025090909390', '2025090909390a', '20251309093900']:
+        try:
+            time_str_to_datetime(time_str)
+            assert False
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    test_generate_minute_snapshot()
+    test_date_helpers()
@@ -0,0 +1,96 @@
+"""
+滚动窗口评估测试模块
+验证窗口切分、参数网格、绩效指标、样本外资产曲线衔接与单窗口寻优
+"""
+
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.engine import Strategy
+from utils.walkforward import split_windows, expand_param_grid, evaluate_equity, chain_equity_curves, run_window
+from fake_broker import FakeBroker
+
+class _GrowthStrategy(Strategy):
+    """
+    每日资产按固定比例增长的测试策略
+    """
+    def __init__(self, name: str = None, backtest_start_time: str = None, backtest_end_time: str = None, download_required: str = None, rate: float = 0.0):
+        self.name = name
+        self.rate = rate
+        self.window = (backtest_start_time, backtest_end_time)
+        self.broker = FakeBroker()
+
+    def prepare(self) -> bool:
+        calendar = [f"202509{day:02d}" for day in range(1, 31)]
+        self.trade_calendar = [date for date in calendar if self.window[0] <= date <= self.window[1]]
+        return True
+
+    def before_open(self, trade_date: str) -> bool:
+        self.broker.available_amount *= 1 + self.rate
+        return False
+
+def test_split_windows():
+    """
+    测试滚动窗口切分（测试窗口从训练窗口最后一天开始，相邻测试窗口首尾相接）
+    """
+    calendar = [f"202509{day:02d}" for day in range(1, 11)]
+    windows = split_windows(calendar, 4, 2)
+    assert windows == [
+        {'train': ('20250901', '20250905'), 'test': ('20250905', '20250907')},
+        {'train': ('20250903', '20250907'), 'test': ('20250907', '20250909')},
+    ]
+    assert len(split_windows(calendar, 4, 2, step_days=1)) == 4
+    assert split_windows(calendar, 8, 2) == []
+
+def test_expand_param_grid():
+    """
+    测试参数网格展开
+    """
+    assert expand_param_grid({}) == [{}]
+    assert expand_param_grid({'price_min': [5.0, 8.0], 'price_max': [60.0]}) == [
+        {'price_min': 5.0, 'price_max': 60.0},
+        {'price_min': 8.0, 'price_max': 60.0},
+    ]
+
+def test_evaluate_and_chain():
+    """
+    测试绩效指标与样本外资产曲线衔接
+    """
+    changes = [{'trade_date': '20250901', 'total_assets': 110.0}, {'trade_date': '20250902', 'total_assets': 99.0}]
+    metrics = evaluate_equity(changes, 100.0)
+    assert abs(metrics['total_return'] - (-0.01)) < 1e-12
+    assert abs(metrics['max_drawdown'] - 0.1) < 1e-12
+
+    results = [
+        {'index': 1, 'initial_amount': 100.0, 'test_changes': [{'trade_date': '20250903', 'total_assets': 90.0}]},
+        {'index': 0, 'initial_amount': 100.0, 'test_changes': changes},
+    ]
+    curve = chain_equity_curves(results, 1000.0)
+    assert curve['trade_date'].tolist() == ['20250901', '20250902', '20250903']
+    assert [round(x, 6) for x in curve['total_assets']] == [1100.0, 990.0, 891.0]
+
+def test_run_window():
+    """
+    测试单窗口寻优：训练窗口选出收益最高的参数，并在测试窗口回测
+    """
+    task = {
+        'index': 0,
+        'window': {'train': ('20250901', '20250905'), 'test': ('20250905', '20250907')},
+        'strategy_class': _GrowthStrategy,
+        'param_sets': expand_param_grid({'rate': [0.01, 0.02, -0.01]}),
+        'metric': 'total_return',
+    }
+    result = run_window(task)
+    assert result['params'] == {'rate': 0.02}
+    assert set(result['train_metrics']) == {'rate=0.01', 'rate=0.02', 'rate=-0.01'}
+    assert [change['trade_date'] for change in result['test_changes']] == ['20250905', '20250906']
+    assert abs(result['test_metrics']['total_return'] - (1.02 ** 2 - 1)) < 1e-12
+
+if __name__ == "__main__":
+    test_split_windows()
+    test_expand_param_grid()
+    test_evaluate_and_chain()
+    test_run_window()
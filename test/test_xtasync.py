@@ -0,0 +1,89 @@
+"""
+xtasync异步接口测试模块
+使用桩阻塞函数离线验证线程池并发调用与下载进度的异步迭代
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xtquant import xtasync
+
+def _download(stock_list, period, callback=None, delay=0.01):
+    """
+    桩下载函数：逐只回调进度（复用同一个进度字典），返回下载结果
+    """
+    progress = {'finished': 0, 'total': len(stock_list)}
+    for stock in stock_list:
+        time.sleep(delay)
+        progress['finished'] += 1
+        progress['stockcode'] = stock
+        callback(progress)
+    return {'period': period, 'count': len(stock_list)}
+
+def test_call_concurrently():
+    """
+    测试阻塞调用在线程池中并发等待
+    """
+    def _blocking(value):
+        time.sleep(0.2)
+        return value
+
+    async def _main():
+        return await asyncio.gather(*[xtasync.call(_blocking, i) for i in range(4)])
+
+    start = time.time()
+    assert asyncio.run(_main()) == [0, 1, 2, 3]
+    assert time.time() - start < 0.6
+
+def test_progress_task():
+    """
+    测试进度迭代：按顺序收到全部进度（各为独立副本），await获取返回值；任务失败时await抛出异常
+    """
+    stock_list = ['000001.SZ', '000002.SZ', '600000.SH']
+
+    async def _main():
+        task = xtasync.ProgressTask(_download, stock_list, '1d')
+        progresses = [progress async for progress in task]
+        return progresses, await task
+
+    progresses, result = asyncio.run(_main())
+    assert [p['finished'] for p in progresses] == [1, 2, 3]
+    assert [p['stockcode'] for p in progresses] == stock_list
+    assert all(p['total'] == 3 for p in progresses)
+    assert result == {'period': '1d', 'count': 3}
+
+    # 不迭代进度直接await
+    async def _await_only():
+        return await xtasync.ProgressTask(_download, stock_list, '1m', delay=0)
+    assert asyncio.run(_await_only()) == {'period': '1m', 'count': 3}
+
+    # 无进度回调的任务迭代立即结束
+    async def _no_progress():
+        task = xtasync.ProgressTask(_download, [], '1d')
+        return [progress async for progress in task], await task
+    assert asyncio.run(_no_progress()) == ([], {'period': '1d', 'count': 0})
+
+    def _failed(callback=None):
+        callback({'finished': 0, 'total': 1})
+        raise RuntimeError('下载失败')
+
+    async def _main_failed():
+        task = xtasync.ProgressTask(_failed)
+        progresses = [progress async for progress in task]
+        assert progresses == [{'finished': 0, 'total': 1}]
+        await task
+
+    try:
+        asyncio.run(_main_failed())
+        assert False, "任务失败时await应抛出异常"
+    except RuntimeError:
+        pass
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
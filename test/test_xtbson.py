@@ -0,0 +1,128 @@
+"""
+BSON快速解码一致性测试模块
+以通用解码器xtbson.decode的结果为基准，验证decode_fast与decode_python的一致性
+"""
+
+import os
+import sys
+import datetime
+import random
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xtquant import xtbson
+from xtquant.xtbson.fastdecode import decode_python
+
+def _assert_same(left, right, strict: bool = True):
+    """
+    递归比较解码结果（值一致，浮点NaN视为相等）
+    Args:
+        strict: 是否要求类型完全一致（编译版bson的Int64等类型与内置实现不同，仅要求基础类型一致）
+    """
+    if strict:
+        assert type(left) == type(right), (left, right)
+    else:
+        for base in (bool, int, float, str, dict, list, type(None)):
+            if isinstance(right, base):
+                assert isinstance(left, base), (left, right)
+                break
+    if isinstance(left, dict):
+        assert list(left.keys()) == list(right.keys())
+        for key in left:
+            _assert_same(left[key], right[key], strict)
+    elif isinstance(left, list):
+        assert len(left) == len(right)
+        for l, r in zip(left, right):
+            _assert_same(l, r, strict)
+    elif isinstance(left, float) and left != left:
+        assert right != right
+    else:
+        assert left == right
+
+def _quote_push(stock_count: int = 50) -> dict:
+    """
+    构造行情推送格式的文档
+    """
+    rnd = random.Random(0)
+    return {
+        f"{i:06d}.SZ": [{
+            'time': xtbson.Int64(1757381940000 + i),
+            'lastPrice': round(rnd.uniform(1, 100), 2),
+            'open': 10.0, 'high': 10.5, 'low': 9.5, 'lastClose': 10.1,
+            'amount': 123456789.0, 'volume': rnd.randint(0, 2 ** 31 - 1),
+            'pvolume': xtbson.Int64(2 ** 40 + i),
+            'stockStatus': 0, 'openInt': 13,
+            'askPrice': [10.01, 10.02, 10.03, 10.04, 10.05],
+            'askVol': [1, 2, 3, 4, 5],
+            'transactionNum': float('nan'),
+            'suspended': False,
+        }]
+        for i in range(stock_count)
+    }
+
+def test_decode_python_conformance():
+    """
+    测试纯Python特化解码与通用解码器一致
+    """
+    docs = [
+        {},
+        {'a': 1, 'b': -2 ** 31, 'c': 2 ** 31 - 1},
+        {'i64': xtbson.Int64(-2 ** 63), 'f': -0.0, 'inf': float('inf'), 'nan': float('nan')},
+        {'s': '', 'cn': '平安银行', 'emoji': '\U0001F600', 'none': None, 't': True, 'f': False},
+        {'nested': {'a': [1, [2, {'b': 'c'}], []], 'd': {}}},
+        # 以下包含特化解码不支持的类型，应回退至通用解码器
+        {'dt': datetime.datetime(2025, 9, 9, 9, 30), 'v': 1},
+        _quote_push(),
+    ]
+    # 二进制、ObjectId等类型在编译版bson中由其自身的类表示，仅校验纯Python路径
+    python_only_docs = [
+        {'bin': xtbson.Binary(b'\x00\x01'), 'oid': xtbson.ObjectId(b'0123456789ab')},
+    ]
+    for doc in python_only_docs:
+        data = xtbson.BSON.encode(doc)
+        _assert_same(decode_python(data), xtbson.decode(data))
+    for doc in docs:
+        data = xtbson.BSON.encode(doc)
+        expected = xtbson.decode(data)
+        _assert_same(decode_python(data), expected)
+        _assert_same(decode_python(memoryview(data)), expected)
+        _assert_same(xtbson.decode_fast(data), expected, strict=not xtbson.USE_COMPILED)
+
+def test_decode_invalid_data():
+    """
+    测试非法数据与通用解码器抛出相同异常
+    """
+    data = xtbson.BSON.encode({'a': 'text', 'b': 1.5})
+    for bad in [data[:-1], data[:5], b'\x05\x00\x00\x00\x01', data[:4] + b'\x7f' + data[5:]]:
+        try:
+            xtbson.decode(bad)
+            expected = None
+        except Exception as e:
+            expected = type(e)
+        try:
+            decode_python(bad)
+            actual = None
+        except Exception as e:
+            actual = type(e)
+        assert actual == expected, (bad, actual, expected)
+
+def test_decode_fast_large_document():
+    """
+    测试大批量行情推送文档（500只股票）经decode_fast与BSON.decode解码结果一致，并输出解码耗时
+    """
+    import timeit
+    data = xtbson.BSON.encode(_quote_push(500))
+    expected = xtbson.BSON.decode(data)
+    _assert_same(xtbson.decode_fast(data), expected, strict=not xtbson.USE_COMPILED)
+    _assert_same(decode_python(data), xtbson.decode(data))
+
+    t_ori = timeit.timeit(lambda: xtbson.decode(data), number=5) / 5
+    t_fast = timeit.timeit(lambda: decode_python(data), number=5) / 5
+    t_compiled = timeit.timeit(lambda: xtbson.decode_fast(data), number=5) / 5
+    print(f"通用解码: {t_ori * 1000:.2f}ms, 特化解码: {t_fast * 1000:.2f}ms, decode_fast: {t_compiled * 1000:.2f}ms, 编译版可用: {xtbson.USE_COMPILED}")
+
+if __name__ == "__main__":
+    test_decode_python_conformance()
+    test_decode_invalid_data()
+    test_decode_fast_large_document()
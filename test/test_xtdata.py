@@ -0,0 +1,183 @@
+"""
+xtdata接口测试模块
+使用桩客户端离线验证时间戳批量转换等数据处理逻辑
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xtquant import xtdata
+from xtquant import xtbson
+
+INSTRUMENTS = {
+    '600000.SH': {'ExchangeID': 'SH', 'InstrumentID': '600000', 'InstrumentName': '浦发银行', 'OpenDate': 19991110,
+                  'FloatVolume': 2.9e10, 'TotalVolume': 2.9e10, 'PreClose': 10.0, 'UpStopPrice': 11.0,
+                  'DownStopPrice': 9.0, 'InstrumentStatus': 0, 'TradingDay': 20240102},
+    '300001.SZ': {'ExchangeID': 'SZ', 'InstrumentID': '300001', 'InstrumentName': '*ST特锐', 'OpenDate': 20091030,
+                  'FloatVolumn': 1.0e9, 'TotalVolumn': 1.1e9, 'PreClose': 20.0, 'UpStopPrice': 21.0,
+                  'DownStopPrice': 19.0, 'InstrumentStatus': 1, 'TradingDay': 20240102},
+    '688001.SH': {'ExchangeID': 'SH', 'InstrumentID': '688001', 'InstrumentName': '华兴源创', 'OpenDate': 20190722,
+                  'FloatVolume': 4.0e8, 'TotalVolume': 4.4e8, 'PreClose': 30.0, 'UpStopPrice': 36.0,
+                  'DownStopPrice': 24.0, 'InstrumentStatus': 0, 'TradingDay': 20240102},
+}
+
+class _FakeClient:
+    """
+    桩客户端：记录每次请求，返回预置的合约信息
+    """
+    def __init__(self):
+        self.instrument_requests = []
+        self.financial_requests = []
+
+    def is_connected(self):
+        return True
+
+    def get_instrument_detail(self, stock_code):
+        self.instrument_requests.append(stock_code)
+        inst = INSTRUMENTS.get(stock_code)
+        return xtbson.BSON.encode(inst) if inst else b''
+
+    def get_financial_data(self, stock_list, table_list, start_time, end_time, report_type):
+        self.financial_requests.append(list(stock_list))
+        return {stock: {table: _financial_rows(stock, table) for table in table_list} for stock in stock_list}
+
+def _financial_rows(stock: str, table: str) -> list:
+    """
+    桩财务数据：资产负债表每只股票两期，股本结构表无数据；
+    第二期m_anntime缺失，末只股票的第二期时间全部无效
+    """
+    if table != 'ASHAREBALANCESHEET':
+        return []
+    invalid = stock == '000045.SZ'
+    return [
+        {'m_timetag': 1703952000000, 'm_anntime': 1711900800000, 'total_assets': 1.0},
+        {'m_timetag': None if invalid else 1711814400000, 'm_anntime': None, 'total_assets': 2.0},
+    ]
+
+def _use_fake_client(monkeypatch) -> _FakeClient:
+    """
+    使用桩客户端替换xtdata.get_client
+    """
+    client = _FakeClient()
+    monkeypatch.setattr(xtdata, 'get_client', lambda: client)
+    return client
+
+def test_timetag_array_to_datetime():
+    """
+    测试毫秒时间戳批量转换（东八区），无效时间戳（NaN、None、非数值）转换为None
+    """
+    # 2023-12-31 16:00:00 UTC 即北京时间 2024-01-01 00:00:00
+    timetags = [1704038400000, 1704038400000 + 9 * 3600000 + 30 * 60000 + 15000]
+
+    res = xtdata._timetag_array_to_datetime(np.array(timetags, dtype='int64'), '%Y%m%d%H%M%S')
+    assert list(res) == ['20240101000000', '20240101093015']
+    assert list(xtdata._timetag_array_to_datetime(timetags, '%Y%m%d')) == ['20240101', '20240101']
+    assert list(xtdata._timetag_array_to_datetime(timetags, '%Y-%m-%d %H:%M')) == ['2024-01-01 00:00', '2024-01-01 09:30']
+
+    res = xtdata._timetag_array_to_datetime(np.array([timetags[0], np.nan]), '%Y%m%d')
+    assert list(res) == ['20240101', None]
+
+    # object列中的None与非数值
+    column = pd.Series([timetags[0], None, 'x'], dtype=object)
+    assert list(xtdata._timetag_array_to_datetime(column, '%Y%m%d')) == ['20240101', None, None]
+    assert list(xtdata._timetag_array_to_datetime(pd.Series([None, None]), '%Y%m%d')) == [None, None]
+    assert len(xtdata._timetag_array_to_datetime([], '%Y%m%d')) == 0
+
+def test_get_instrument_detail_table(monkeypatch):
+    """
+    测试合约信息列式表格：字段转换、板块与ST识别、不存在的合约、重复代码与当日缓存
+    """
+    client = _use_fake_client(monkeypatch)
+    xtdata.__dict__['__instrument_detail_cache'].clear()
+
+    stock_list = ['600000.SH', '300001.SZ', '000000.SZ', '688001.SH', '600000.SH']
+    df = xtdata.get_instrument_detail_table(stock_list)
+    assert list(df.index) == ['600000.SH', '300001.SZ', '688001.SH']
+    assert df.index.name == 'code'
+    assert list(df['name']) == ['浦发银行', '*ST特锐', '华兴源创']
+    assert list(df['board']) == ['主板', '创业板', '科创板']
+    assert list(df['is_st']) == [False, True, False]
+    assert list(df['open_date']) == ['19991110', '20091030', '20190722']
+    assert list(df['trading_day']) == ['20240102'] * 3
+    # 旧字段名FloatVolumn/TotalVolumn
+    assert df.loc['300001.SZ', 'float_volume'] == 1.0e9 and df.loc['300001.SZ', 'total_volume'] == 1.1e9
+    for column in ('float_volume', 'total_volume', 'pre_close', 'up_stop_price', 'down_stop_price'):
+        assert df[column].dtype == np.float64
+    # 重复代码只请求一次
+    assert sorted(client.instrument_requests) == ['000000.SZ', '300001.SZ', '600000.SH', '688001.SH']
+
+    # 当日缓存：再次请求不访问客户端，不使用缓存时重新请求
+    client.instrument_requests.clear()
+    pd.testing.assert_frame_equal(xtdata.get_instrument_detail_table(stock_list), df)
+    assert client.instrument_requests == []
+    xtdata.get_instrument_detail_table(['600000.SH'], use_cache=False)
+    assert client.instrument_requests == ['600000.SH']
+
+    # 与逐个获取的合约信息一致
+    detail = xtdata.get_instrument_detail_list(['600000.SH', '000000.SZ'])
+    assert detail['000000.SZ'] is None
+    assert detail['600000.SH'] == xtdata.get_instrument_detail('600000.SH')
+
+def test_conv_financial_dates(monkeypatch):
+    """
+    测试财务数据日期转换：固定按东八区转换（不受本地时区影响），m_anntime缺失时取m_timetag，无效时间为空字符串
+    """
+    import time
+    monkeypatch.setenv('TZ', 'UTC')
+    if hasattr(time, 'tzset'):
+        time.tzset()
+    try:
+        df = pd.DataFrame([
+            # 北京时间 2024-01-01 00:00 / 2024-04-01 00:00，UTC下为前一日16:00
+            {'m_timetag': 1704038400000, 'm_anntime': 1711900800000, 'declareDate': 1711900800000, 'endDate': 1704038400000},
+            {'m_timetag': 1704038400000, 'm_anntime': None, 'declareDate': None, 'endDate': float('nan')},
+            {'m_timetag': None, 'm_anntime': None, 'declareDate': 'x', 'endDate': 1704038400000},
+        ])
+        xtdata._conv_financial_dates(df)
+        assert list(df['m_timetag']) == ['20240101', '20240101', '']
+        assert list(df['m_anntime']) == ['20240401', '20240101', '']
+        assert list(df['declareDate']) == ['20240401', '', '']
+        assert list(df['endDate']) == ['20240101', '', '20240101']
+    finally:
+        monkeypatch.delenv('TZ')
+        if hasattr(time, 'tzset'):
+            time.tzset()
+
+def test_get_financial_data_table(monkeypatch):
+    """
+    测试财务数据长表：分批请求、并发请求结果一致、报表名称还原、与按股票返回的结果一致
+    """
+    client = _use_fake_client(monkeypatch)
+    stock_list = [f'{i:06d}.SZ' for i in range(1, 46)]
+
+    result = xtdata.get_financial_data_table(stock_list, ['Balance', 'Capital'])
+    assert [len(sl) for sl in client.financial_requests] == [20, 20, 5]
+    assert list(result) == ['Balance', 'Capital']
+
+    balance = result['Balance']
+    assert list(balance.columns) == ['stock', 'm_timetag', 'm_anntime', 'total_assets']
+    assert list(balance['stock']) == [stock for stock in stock_list for _ in range(2)]
+    assert list(balance['m_anntime'][:2]) == ['20240401', '20240331']
+    assert list(balance['m_timetag'][-2:]) == ['20231231', '']
+    assert list(balance['m_anntime'][-2:]) == ['20240401', '']
+    assert len(result['Capital']) == 0 and 'stock' in result['Capital'].columns
+
+    # 与按股票返回的结果一致
+    per_stock = xtdata.get_financial_data(stock_list, ['Balance', 'Capital'])
+    expected = pd.concat([per_stock[stock]['Balance'].assign(stock=stock) for stock in stock_list], ignore_index=True)
+    pd.testing.assert_frame_equal(balance, expected[balance.columns])
+
+    # 并发请求结果一致
+    client.financial_requests.clear()
+    parallel = xtdata.get_financial_data_table(stock_list, ['Balance', 'Capital'], workers=3)
+    assert sorted(len(sl) for sl in client.financial_requests) == [5, 20, 20]
+    pd.testing.assert_frame_equal(parallel['Balance'], balance)
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
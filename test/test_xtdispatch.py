@@ -0,0 +1,113 @@
+"""
+行情推送分发测试模块
+验证推送入队不阻塞、按代码合并（K线追加）、按订阅解码、慢消费者的批次合并与统计
+"""
+
+import os
+import sys
+import time
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xtquant import xtbson
+from xtquant.xtdispatch import QuoteDispatcher
+
+def test_dispatch_coalesce():
+    """
+    测试推送解码与按代码合并为最新快照
+    """
+    received = []
+    done = threading.Event()
+
+    def on_data(datas):
+        received.append(datas)
+        done.set()
+
+    dispatcher = QuoteDispatcher(interval=0.05)
+    dispatcher.add_consumer(on_data, name='fast')
+    dispatcher.start()
+    for i in range(10):
+        dispatcher.on_push(xtbson.BSON.encode({'000001.SZ': {'lastPrice': 10.0 + i}, '600000.SH': {'lastPrice': 8.0}}))
+    dispatcher.on_push({'000001.SZ': {'lastPrice': 20.0}})
+    assert done.wait(2)
+    dispatcher.stop(2)
+
+    latest = {}
+    for batch in received:
+        latest.update(batch)
+    assert latest['000001.SZ']['lastPrice'] == 20.0
+    assert latest['600000.SH']['lastPrice'] == 8.0
+    assert len(received) < 11
+
+    stats = dispatcher.get_stats()
+    assert stats['received'] == 11
+    assert stats['dropped'] == 0
+    assert stats['consumers']['fast']['lag'] == 0
+
+def test_dispatch_backpressure():
+    """
+    测试慢消费者不阻塞推送与其他消费者，队列满时合并批次
+    """
+    fast_batches = []
+    slow_latest = {}
+    release = threading.Event()
+
+    def on_slow(datas):
+        release.wait(2)
+        slow_latest.update(datas)
+
+    dispatcher = QuoteDispatcher(interval=0.01, consumer_queue_size=2)
+    dispatcher.add_consumer(fast_batches.append, name='fast')
+    dispatcher.add_consumer(on_slow, name='slow')
+    dispatcher.start()
+
+    start = time.time()
+    for i in range(20):
+        dispatcher.on_push({f'{i:06d}.SZ': {'lastPrice': float(i)}})
+        time.sleep(0.01)
+    assert time.time() - start < 1
+
+    stats = dispatcher.get_stats()
+    assert stats['consumers']['slow']['coalesced'] > 0
+    assert stats['consumers']['slow']['queued'] <= 2
+    release.set()
+    dispatcher.stop(2)
+
+    # 合并批次后每个代码的最新快照都未丢失
+    assert len(slow_latest) == 20
+    assert sum(len(batch) for batch in fast_batches) == 20
+
+def test_dispatch_subscribers():
+    """
+    测试同一分发器的多个订阅各自解码，K线周期的推送按代码追加，分笔推送保留最新数据
+    """
+    received = []
+    dispatcher = QuoteDispatcher(interval=0.05, consumer_queue_size=1)
+    release = threading.Event()
+
+    def on_data(datas):
+        release.wait(2)
+        received.append(datas)
+
+    dispatcher.add_consumer(on_data)
+    on_kline = dispatcher.subscriber(lambda datas: {code: [dict(bar, decoded='kline') for bar in bars] for code, bars in datas.items()}, '1m')
+    on_tick = dispatcher.subscriber(lambda datas: {code: [dict(tick, decoded='tick') for tick in ticks] for code, ticks in datas.items()}, 'tick')
+    dispatcher.start()
+    for i in range(5):
+        on_kline({'000001.SZ': [{'time': i}]})
+        on_tick({'600000.SH': [{'time': i}]})
+        time.sleep(0.03)
+    release.set()
+    dispatcher.stop(2)
+
+    klines = [bar for batch in received for bar in batch.get('000001.SZ', [])]
+    assert [bar['time'] for bar in klines] == list(range(5))
+    assert all(bar['decoded'] == 'kline' for bar in klines)
+    assert received[-1]['600000.SH'] == [{'time': 4, 'decoded': 'tick'}]
+
+if __name__ == "__main__":
+    test_dispatch_coalesce()
+    test_dispatch_backpressure()
+    test_dispatch_subscribers()
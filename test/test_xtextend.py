@@ -0,0 +1,153 @@
+"""
+扩展数据读取测试模块
+构造临时因子数据文件，验证内存映射读取与原有逐日读取结果一致
+"""
+
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xtquant.xtextend import Extender, FileLock
+
+def _make_extend_data(base_dir: str, file: str, n_dates: int = 5, stocklist: list = None):
+    """
+    构造因子数据文件
+    Returns:
+        tuple: (交易日列表, 因子值, 排名)
+    """
+    path = os.path.join(base_dir, 'EP', file + '_Xdat')
+    os.makedirs(path)
+    stocklist = stocklist or ['SZ', ['000001', '000002'], 'SH', ['600000']]
+    n_stocks = sum(len(stocks) for stocks in stocklist[1::2])
+    tradedatelist = [1704038400000 + i * 86400000 for i in range(n_dates)]
+    with open(os.path.join(path, 'config'), 'w', encoding='utf-8') as f:
+        json.dump({'stocklist': stocklist, 'tradedatelist': tradedatelist}, f)
+
+    values = np.arange(n_dates * n_stocks, dtype='<f4').reshape(n_dates, n_stocks) / 7
+    ranks = np.arange(n_dates * n_stocks, dtype='<i2').reshape(n_dates, n_stocks)
+    with open(os.path.join(path, 'data'), 'wb') as f:
+        for i in range(n_dates):
+            f.write(values[i].tobytes())
+            f.write(ranks[i].tobytes())
+    return tradedatelist, values, ranks
+
+def test_read_data_array():
+    """
+    测试内存映射读取与日期区间切片
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tradedatelist, values, ranks = _make_extend_data(tmp_dir, 'factor')
+        exd = Extender(tmp_dir)
+
+        stocklist, dates, value_view, rank_view = exd.read_data_array('factor')
+        assert stocklist == ['000001.SZ', '000002.SZ', '600000.SH']
+        assert dates == tradedatelist
+        assert np.array_equal(value_view, values)
+        assert np.array_equal(rank_view, ranks)
+
+        # 日期区间切片
+        _, dates, value_view, rank_view = exd.read_data_array('factor', tradedatelist[1], tradedatelist[3])
+        assert dates == tradedatelist[1:4]
+        assert np.array_equal(value_view, values[1:4])
+        assert np.array_equal(rank_view, ranks[1:4])
+
+        # 与原有读取结果一致
+        _, res = exd.show_extend_data('factor', [])
+        for i, date in enumerate(tradedatelist):
+            assert res[date] == [(round(float(values[i][j]), 3), int(ranks[i][j])) for j in range(3)]
+
+        assert exd.read_data_array('missing') is None
+        del value_view, rank_view
+
+def test_show_extend_data_lock():
+    """
+    测试快照读取、异步读取与文件锁等待超时
+    """
+    import time
+    import asyncio
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _make_extend_data(tmp_dir, 'factor')
+        exd = Extender(tmp_dir)
+
+        expected = exd.show_extend_data('factor', [], shared=False)
+        assert exd.show_extend_data('factor', [], timeout=1) == expected
+        assert asyncio.run(exd.show_extend_data_async('factor', [], timeout=1)) == expected
+
+        # 模拟写入方持有文件锁
+        is_lock = FileLock.is_lock
+        FileLock.is_lock = lambda this: True
+        try:
+            for read in (lambda: exd.show_extend_data('factor', [], timeout=0.2),
+                         lambda: asyncio.run(exd.show_extend_data_async('factor', [], timeout=0.2))):
+                start = time.time()
+                try:
+                    read()
+                    assert False, "文件被占用时应超时"
+                except TimeoutError:
+                    pass
+                assert time.time() - start < 1
+        finally:
+            FileLock.is_lock = is_lock
+
+def test_show_extend_data_async_concurrent():
+    """
+    测试同一实例并发异步读取不同因子时结果互不干扰
+    """
+    import asyncio
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _make_extend_data(tmp_dir, 'factor_a', n_dates=5)
+        _make_extend_data(tmp_dir, 'factor_b', n_dates=3, stocklist=['SH', ['600000', '600001', '600002', '600003']])
+        exd = Extender(tmp_dir)
+        expected_a = Extender(tmp_dir).show_extend_data('factor_a', [])
+        expected_b = Extender(tmp_dir).show_extend_data('factor_b', [])
+
+        async def _read_all():
+            return await asyncio.gather(*[
+                exd.show_extend_data_async('factor_a' if i % 2 == 0 else 'factor_b', [], timeout=5)
+                for i in range(20)
+            ])
+
+        for i, result in enumerate(asyncio.run(_read_all())):
+            assert result == (expected_a if i % 2 == 0 else expected_b)
+
+def test_show_extend_data_snapshot_timeout():
+    """
+    测试快照读取持续失败（文件不断被改写）时同步与异步读取均按超时时间退出
+    """
+    import time
+    import asyncio
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _make_extend_data(tmp_dir, 'factor')
+        exd = Extender(tmp_dir)
+        exd.read_snapshot = lambda fs, path: None
+
+        for read in (lambda: exd.show_extend_data('factor', [], timeout=0.2),
+                     lambda: asyncio.run(exd.show_extend_data_async('factor', [], timeout=0.2))):
+            start = time.time()
+            try:
+                read()
+                assert False, "快照读取持续失败时应超时"
+            except TimeoutError:
+                pass
+            assert time.time() - start < 1
+
+def test_module_show_extend_data_shared(monkeypatch):
+    """
+    测试模块级show_extend_data传递shared参数
+    """
+    from xtquant import xtdata, xtextend
+    calls = []
+    monkeypatch.setattr(xtdata, 'init_data_dir', lambda: 'userdata', raising=False)
+    monkeypatch.setattr(Extender, 'show_extend_data', lambda self, file, times, timeout = None, shared = True: calls.append(shared))
+    xtextend.show_extend_data('factor', [])
+    xtextend.show_extend_data('factor', [], shared=False)
+    assert calls == [True, False]
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__])
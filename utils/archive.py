@@ -0,0 +1,254 @@
+"""
+分时K线归档模块
+将分时K线按"股票-交易日"为单位存储为定长数据块，回测时通过内存映射按需读取，
+无需将多年全市场分时数据加载到内存，多个回测进程可共享操作系统页缓存
+
+归档目录结构:
+    bars.bin: 定长数据块序列，每个数据块为BLOCK_ROWS条BAR_DTYPE记录（不足部分补零）
+    index.npy: 偏移索引，每条记录为(stock_code, trade_date, block, rows)，当日无分时K线的股票记录为(block=-1, rows=0)
+    archive.lock: 写入锁，多个进程同时构建同一归档时互斥写入
+"""
+
+import os
+import contextlib
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from utils.logger import info, debug, error
+from utils.data import get_daily_bars, restore_bars, PRICE_FIELDS
+
+# 每个数据块的记录数（A股交易日分时K线最多241根：集合竞价1根 + 连续竞价240根）
+BLOCK_ROWS = 241
+# 分时K线记录格式（价格为float32，时间为YYYYMMDDHHMMSS整数）
+BAR_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f4'),
+    ('high', '<f4'),
+    ('low', '<f4'),
+    ('close', '<f4'),
+    ('volume', '<i8'),
+    ('preClose', '<f4'),
+])
+# 偏移索引记录格式
+INDEX_DTYPE = np.dtype([
+    ('stock_code', 'U12'),
+    ('trade_date', '<i4'),
+    ('block', '<i8'),
+    ('rows', '<i2'),
+])
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    """
+    跨进程文件排他锁（阻塞等待）
+    Args:
+        path: 锁文件路径
+    """
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class MinuteArchive:
+    """
+    分时K线归档（定长数据块 + 偏移索引，内存映射读取）
+    """
+
+    def __init__(self, root: str):
+        """
+        初始化归档
+        Args:
+            root: 归档目录
+        """
+        self.root = root
+        self.data_file = os.path.join(root, 'bars.bin')
+        self.index_file = os.path.join(root, 'index.npy')
+        self.lock_file = os.path.join(root, 'archive.lock')
+        self._index = None
+        self._date_index = {}
+        self._memmap = None
+
+    def _load_index(self) -> np.ndarray:
+        """
+        加载偏移索引（仅加载一次）
+        Returns:
+            np.ndarray: 偏移索引
+        """
+        if self._index is None:
+            if os.path.exists(self.index_file):
+                self._index = np.load(self.index_file)
+            else:
+                self._index = np.empty(0, dtype=INDEX_DTYPE)
+        return self._index
+
+    def _get_date_index(self, trade_date: str) -> dict:
+        """
+        获取某个交易日的索引字典（按交易日惰性构建）
+        Args:
+            trade_date: 交易日期，格式为'YYYYMMDD'
+        Returns:
+            dict: {stock_code: (block, rows)}
+        """
+        if trade_date not in self._date_index:
+            index = self._load_index()
+            records = index[index['trade_date'] == int(trade_date)]
+            self._date_index[trade_date] = {str(r['stock_code']): (int(r['block']), int(r['rows'])) for r in records}
+        return self._date_index[trade_date]
+
+    def _get_blocks(self, block: int) -> np.ndarray:
+        """
+        获取数据块的内存映射视图（文件增长后重新映射）
+        Args:
+            block: 需要访问的数据块编号
+        Returns:
+            np.ndarray: 形如(n_blocks, BLOCK_ROWS)的只读内存映射
+        """
+        if self._memmap is None or block >= len(self._memmap):
+            self._memmap = np.memmap(self.data_file, dtype=BAR_DTYPE, mode='r').reshape(-1, BLOCK_ROWS)
+        return self._memmap
+
+    def contains(self, stock_code: str, trade_date: str) -> bool:
+        """
+        判断归档中是否存在某只股票某个交易日的分时K线
+        Args:
+            stock_code: 股票代码
+            trade_date: 交易日期，格式为'YYYYMMDD'
+        Returns:
+            bool: 是否存在
+        """
+        return stock_code in self._get_date_index(trade_date)
+
+    def read(self, stock_list: list, trade_date: str) -> dict:
+        """
+        读取某个交易日的分时K线（归档中不存在的股票不返回，当日无分时K线的股票返回空数据框）
+        Args:
+            stock_list: 股票代码列表
+            trade_date: 交易日期，格式为'YYYYMMDD'
+        Returns:
+            dict: 分时K线数据，形式如{"000001.SZ": DataFrame, ...}，index为'YYYYMMDDHHMMSS'字符串，与get_daily_bars一致
+        """
+        date_index = self._get_date_index(trade_date)
+        result = {}
+        for stock_code in stock_list:
+            if stock_code not in date_index:
+                continue
+            block, rows = date_index[stock_code]
+            records = self._get_blocks(block)[block, :rows] if rows > 0 else np.empty(0, dtype=BAR_DTYPE)
+            bars = pd.DataFrame({field: records[field] for field in BAR_DTYPE.names if field != 'time'},
+                                index=records['time'].astype(str))
+            result[stock_code] = restore_bars(bars)
+        return result
+
+    def write(self, daily_bars: dict, trade_date: str) -> int:
+        """
+        追加写入某个交易日的分时K线（已存在的股票跳过，空数据框记录为当日无分时K线，之后不再重复获取）
+        持有写入锁期间重新加载索引、追加数据块并保存索引，多个进程同时构建同一归档时不会分配相同的数据块
+        Args:
+            daily_bars: 分时K线数据，形式如{"000001.SZ": DataFrame, ...}，index为'YYYYMMDDHHMMSS'
+            trade_date: 交易日期，格式为'YYYYMMDD'
+        Returns:
+            int: 新写入的数据块数量
+        """
+        os.makedirs(self.root, exist_ok=True)
+        with _file_lock(self.lock_file):
+            return self._write(daily_bars, trade_date)
+
+    def _write(self, daily_bars: dict, trade_date: str) -> int:
+        """
+        追加写入某个交易日的分时K线（需持有写入锁）
+        Args:
+            daily_bars: 分时K线数据
+            trade_date: 交易日期，格式为'YYYYMMDD'
+        Returns:
+            int: 新写入的数据块数量
+        """
+        # 重新加载索引（其他进程可能已写入）
+        self._index = None
+        self._date_index = {}
+        index = self._load_index()
+        date_index = self._get_date_index(trade_date)
+        # 数据块编号以索引为准，截断中断写入残留的不完整数据块或未写入索引的数据块
+        next_block = int(index['block'].max()) + 1 if len(index) > 0 else 0
+        block_bytes = BAR_DTYPE.itemsize * BLOCK_ROWS
+        if os.path.exists(self.data_file) and os.path.getsize(self.data_file) != next_block * block_bytes:
+            self._memmap = None
+            with open(self.data_file, 'r+b') as f:
+                f.truncate(next_block * block_bytes)
+
+        new_records = []
+        blocks = 0
+        with open(self.data_file, 'ab') as f:
+            for stock_code, bars in daily_bars.items():
+                if stock_code in date_index:
+                    continue
+                if len(bars) == 0:
+                    new_records.append((stock_code, int(trade_date), -1, 0))
+                    date_index[stock_code] = (-1, 0)
+                    continue
+                if len(bars) > BLOCK_ROWS:
+                    error(f"分时K线数量超过数据块容量: {stock_code} {trade_date} {len(bars)}")
+                    raise ValueError(f"分时K线数量超过数据块容量: {stock_code} {trade_date} {len(bars)}")
+                block = np.zeros(BLOCK_ROWS, dtype=BAR_DTYPE)
+                rows = len(bars)
+                block['time'][:rows] = bars.index.astype(str).astype(np.int64)
+                for field in BAR_DTYPE.names:
+                    if field == 'time':
+                        continue
+                    if field in PRICE_FIELDS:
+                        # 缺失价格保留为NaN
+                        block[field][:rows] = bars[field].astype(float).to_numpy().round(2)
+                    else:
+                        block[field][:rows] = bars[field].fillna(0).to_numpy()
+                f.write(block.tobytes())
+                new_records.append((stock_code, int(trade_date), next_block, rows))
+                date_index[stock_code] = (next_block, rows)
+                next_block += 1
+                blocks += 1
+
+        if new_records:
+            self._index = np.concatenate([index, np.array(new_records, dtype=INDEX_DTYPE)])
+            # 先写临时文件再替换，避免其他进程读到不完整的索引
+            tmp_file = self.index_file + '.tmp.npy'
+            np.save(tmp_file, self._index)
+            os.replace(tmp_file, self.index_file)
+        debug(f"写入分时K线归档: {trade_date} {len(new_records)} 只股票")
+        return blocks
+
+    def build(self, stock_list: list, trade_calendar: list, process_bar: bool = True) -> int:
+        """
+        从本地行情数据增量构建归档（已归档的股票与交易日跳过）
+        Args:
+            stock_list: 股票代码列表
+            trade_calendar: 交易日历列表，元素为'YYYYMMDD'
+            process_bar: 进度条显示，默认显示
+        Returns:
+            int: 新写入的数据块数量
+        """
+        total = 0
+        iterator = tqdm(trade_calendar, desc=f"构建分时K线归档", ncols=100, colour="green") if process_bar else trade_calendar
+        for trade_date in iterator:
+            missing = [stock_code for stock_code in stock_list if not self.contains(stock_code, trade_date)]
+            if not missing:
+                continue
+            daily_bars = get_daily_bars(missing, "1m", trade_date, trade_date, count=-1)
+            # 当日无分时K线的股票记录为空，之后不再重复获取
+            for stock_code in missing:
+                daily_bars.setdefault(stock_code, pd.DataFrame())
+            total += self.write(daily_bars, trade_date)
+        info(f"构建分时K线归档完成: 新增 {total} 个数据块")
+        return total
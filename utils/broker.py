@@ -1,28 +1,63 @@
 """
 模拟交易实现
 """
+import copy
 import configparser
 from utils.logger import info, debug, error
 import pandas as pd
 from datetime import datetime
 from utils.util import time_str_to_datetime
+from utils.config import get_config
 import matplotlib.pyplot as plt
 import os
 
-config = configparser.ConfigParser()
-config.read('config.ini', encoding='utf-8')
-
 class Broker:
-    def __init__(self):
-        self.initial_amount = config.getfloat('BACKTEST', 'initial_amount')
+    def __init__(self, config: configparser.ConfigParser = None):
+        """
+        初始化模拟账户
+        Args:
+            config: 配置，默认读取配置文件config.ini
+        """
+        self.config = config if config is not None else get_config()
+        self.initial_amount = self.config.getfloat('BACKTEST', 'initial_amount')
         self.available_amount = self.initial_amount
-        self.commission_rate = config.getfloat('BACKTEST', 'commission_rate')
-        self.min_commission = config.getfloat('BACKTEST', 'min_commission')
-        self.tax_rate = config.getfloat('BACKTEST', 'tax_rate')
+        self.commission_rate = self.config.getfloat('BACKTEST', 'commission_rate')
+        self.min_commission = self.config.getfloat('BACKTEST', 'min_commission')
+        self.tax_rate = self.config.getfloat('BACKTEST', 'tax_rate')
         self.positions = {} # 持仓 {'stock_code': {'cost_price': cost_price, 'volume': volume, 'disabled_volume': disabled_volume}}
         self.transactions = [] # 交易记录 [{'stock_code': stock_code, 'price': price, 'volume': volume, 'action': action, 'cost_price': cost_price, 'time': time}]
         self.position_and_account_changes = [] # 持仓与账户信息变动记录 [{'trade_date': trade_date, 'stock_count': stock_count, 'stock_cost': stock_cost, 'stock_value': stock_value, 'available_amount': available_amount, 'total_assets': total_assets}]
 
+    def get_state(self) -> dict:
+        """
+        获取账户状态（用于保存检查点）
+        Returns:
+            dict: 账户状态（初始资金、可用资金、持仓、交易记录、持仓与账户信息变动记录）
+        """
+        return {
+            'initial_amount': self.initial_amount,
+            'available_amount': self.available_amount,
+            'positions': self.positions,
+            'transactions': self.transactions,
+            'position_and_account_changes': self.position_and_account_changes,
+        }
+
+    def set_state(self, state: dict) -> bool:
+        """
+        从检查点恢复账户状态（复制后使用，同一检查点可恢复至多个账户）
+        Args:
+            state: 账户状态
+        Returns:
+            bool: 是否成功
+        """
+        state = copy.deepcopy(state)
+        self.initial_amount = state['initial_amount']
+        self.available_amount = state['available_amount']
+        self.positions = state['positions']
+        self.transactions = state['transactions']
+        self.position_and_account_changes = state['position_and_account_changes']
+        return True
+
     def buy(self, signal: dict) -> bool:
         """
         买入
@@ -103,9 +138,9 @@ class Broker:
             int: 单股买入数量（100的整数倍，且不超过可用资金所能买入的数量）
         """
         # 获取仓位管理配置
-        limit_vol_type = config.get('BACKTEST', 'limit_vol_type')
-        max_vol_rate = config.getfloat('BACKTEST', 'max_vol_rate')
-        max_vol_amount = config.getfloat('BACKTEST', 'max_vol_amount')
+        limit_vol_type = self.config.get('BACKTEST', 'limit_vol_type')
+        max_vol_rate = self.config.getfloat('BACKTEST', 'max_vol_rate')
+        max_vol_amount = self.config.getfloat('BACKTEST', 'max_vol_amount')
 
         # 可能的最大买入资金（不能超过可用资金）
         max_affordable_volume = int(self.available_amount / price // 100 * 100)
@@ -357,10 +392,12 @@ class Broker:
 
 
     # 下载交易记录至csv文件
-    def download_transactions(self) -> bool:
+    def download_transactions(self, name: str = '') -> bool:
         """
         下载交易记录与持仓变动记录至csv文件 results/results_YYYYMMDD_HHMMSS.csv 
         分别保存为两个sheet，sheet1为交易记录，sheet2为持仓变动记录
+        Args:
+            name: 策略名称，不为空时文件名为 results/results_{name}_YYYYMMDD_HHMMSS.xlsx（多策略同时运行时避免重名）
         Returns:
             bool: 是否成功
         """
@@ -369,7 +406,8 @@ class Broker:
         if not os.path.exists(results_dir):
             os.makedirs(results_dir)
 
-        filename = f'{results_dir}/results_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+        prefix = f'results_{name}_' if name else 'results_'
+        filename = f'{results_dir}/{prefix}{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
         df_transactions = pd.DataFrame(self.transactions)
         df_position_and_account_changes = pd.DataFrame(self.position_and_account_changes)
         with pd.ExcelWriter(filename) as writer:
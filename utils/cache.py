@@ -0,0 +1,431 @@
+"""
+缓存工具模块
+提供基于数据版本的磁盘缓存，行情数据重新下载后数据版本变更，旧缓存自动失效
+数据版本按K线周期分别记录，下载分时K线不会使只依赖日K线的缓存失效
+"""
+
+import os
+import json
+import time
+import pickle
+import hashlib
+import inspect
+from collections import OrderedDict
+from utils.logger import debug, warning
+
+# 缓存根目录
+CACHE_DIR = 'cache'
+# 数据版本文件（按K线周期区分，行情数据下载后有变化时更新）
+DATA_VERSION_FILE = 'data_version_{period}'
+# 计算函数指纹时需要纳入源码的项目包（选股图形与指标计算的辅助函数所在的包）
+FINGERPRINT_PACKAGES = ('laboratory', 'strategys')
+# 本进程内数据版本的更新次数（缓存实例据此判断是否需要重新读取数据版本文件）
+_version_generation = 0
+
+
+def get_data_version(cache_dir: str = CACHE_DIR, period: str = '1d') -> str:
+    """
+    获取当前行情数据版本
+    Args:
+        cache_dir: 缓存根目录
+        period: K线周期，如'1d'、'1m'
+    Returns:
+        str: 数据版本，从未下载过时返回'0'
+    """
+    version_file = os.path.join(cache_dir, DATA_VERSION_FILE.format(period=period))
+    if not os.path.exists(version_file):
+        return '0'
+    with open(version_file, 'r', encoding='utf-8') as f:
+        return f.read().strip() or '0'
+
+
+def bump_data_version(cache_dir: str = CACHE_DIR, period: str = '1d') -> str:
+    """
+    更新行情数据版本（行情数据下载后有变化时调用，使依赖旧数据的缓存失效）
+    Args:
+        cache_dir: 缓存根目录
+        period: K线周期，如'1d'、'1m'
+    Returns:
+        str: 新的数据版本
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    version = str(time.time_ns())
+    version_file = os.path.join(cache_dir, DATA_VERSION_FILE.format(period=period))
+    tmp_file = version_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_file, version_file)
+    global _version_generation
+    _version_generation += 1
+    debug(f"更新行情数据版本: {period} {version}")
+    return version
+
+
+class DataVersion:
+    """
+    缓存实例使用的数据版本
+    首次使用时读取一次数据版本文件，之后只在本进程调用bump_data_version后重新读取，避免每次读写缓存都打开文件
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, period: str = '1d'):
+        """
+        初始化数据版本
+        Args:
+            cache_dir: 缓存根目录
+            period: K线周期
+        """
+        self.cache_dir = cache_dir
+        self.period = period
+        self._version = None
+        self._generation = None
+
+    def get(self) -> str:
+        """
+        获取数据版本
+        Returns:
+            str: 数据版本
+        """
+        if self._generation != _version_generation:
+            self._generation = _version_generation
+            self._version = get_data_version(self.cache_dir, self.period)
+        return self._version
+
+
+def hash_key(*parts) -> str:
+    """
+    计算缓存键的哈希值
+    Args:
+        *parts: 组成缓存键的各部分（需可JSON序列化，否则转为字符串）
+    Returns:
+        str: sha1十六进制哈希值
+    """
+    content = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def _get_dependency_modules(module) -> list:
+    """
+    获取模块及其（递归）引用的同一顶层包或FINGERPRINT_PACKAGES内的模块，
+    如laboratory.custom引用的laboratory.multipleK、laboratory.singleK
+    Args:
+        module: 模块
+    Returns:
+        list: 模块列表（按模块名排序）
+    """
+    packages = {module.__name__.split('.')[0], *FINGERPRINT_PACKAGES}
+    modules = {}
+    pending = [module]
+    while pending:
+        current = pending.pop()
+        if current.__name__ in modules:
+            continue
+        modules[current.__name__] = current
+        for value in vars(current).values():
+            if not (inspect.ismodule(value) or inspect.isfunction(value) or inspect.isclass(value)):
+                continue
+            dependency = value if inspect.ismodule(value) else inspect.getmodule(value)
+            if dependency is not None and dependency.__name__.split('.')[0] in packages and dependency.__name__ not in modules:
+                pending.append(dependency)
+    return [modules[name] for name in sorted(modules)]
+
+
+def get_function_fingerprint(func, params: dict = None) -> str:
+    """
+    计算函数指纹（函数所在模块及其引用的同包模块源码 + 函数名 + 参数默认值与传入参数），函数实现、依赖的辅助函数或参数变更时指纹随之变更
+    Args:
+        func: 函数
+        params: 调用参数，覆盖函数的默认参数
+    Returns:
+        str: 函数指纹
+    """
+    try:
+        source = [inspect.getsource(module) for module in _get_dependency_modules(inspect.getmodule(func))]
+    except (OSError, TypeError, AttributeError):
+        source = func.__code__.co_code.hex()
+    bound_params = {
+        name: param.default
+        for name, param in inspect.signature(func).parameters.items()
+        if param.default is not inspect.Parameter.empty
+    }
+    bound_params.update(params or {})
+    return hash_key(func.__module__, func.__qualname__, source, bound_params)
+
+
+class ScreeningCache:
+    """
+    每日选股结果缓存
+    缓存键为(交易日期, 股票池哈希, 选股函数指纹, 数据版本)，任一部分变化时缓存不命中
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        """
+        初始化选股结果缓存
+        Args:
+            cache_dir: 缓存根目录
+        """
+        self.cache_dir = cache_dir
+        self.screening_dir = os.path.join(cache_dir, 'screening')
+        self.data_version = DataVersion(cache_dir)
+
+    def make_key(self, trade_date: str, universe: list, pattern_func, pattern_params: dict = None) -> str:
+        """
+        生成缓存键
+        Args:
+            trade_date: 交易日期，格式为'YYYYMMDD'
+            universe: 股票池
+            pattern_func: 选股图形函数
+            pattern_params: 选股参数
+        Returns:
+            str: 缓存键
+        """
+        universe_hash = hash_key(sorted(universe))
+        fingerprint = get_function_fingerprint(pattern_func, pattern_params)
+        return hash_key(trade_date, universe_hash, fingerprint, self.data_version.get())
+
+    def _get_path(self, trade_date: str, key: str) -> str:
+        """
+        获取缓存文件路径
+        """
+        return os.path.join(self.screening_dir, trade_date, f"{key}.json")
+
+    def get(self, trade_date: str, key: str):
+        """
+        读取缓存的选股结果
+        Args:
+            trade_date: 交易日期，格式为'YYYYMMDD'
+            key: 缓存键
+        Returns:
+            list: 选股结果，未命中时返回None
+        """
+        path = self._get_path(trade_date, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)['stock_list']
+        except (OSError, ValueError, KeyError) as e:
+            warning(f"读取选股结果缓存失败: {path} {e}")
+            return None
+
+    def set(self, trade_date: str, key: str, stock_list: list) -> bool:
+        """
+        写入选股结果缓存
+        Args:
+            trade_date: 交易日期，格式为'YYYYMMDD'
+            key: 缓存键
+            stock_list: 选股结果
+        Returns:
+            bool: 是否成功
+        """
+        path = self._get_path(trade_date, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'trade_date': trade_date, 'stock_list': list(stock_list)}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return True
+
+
+class BundleCache:
+    """
+    个股盘前指标缓存（内存LRU + 磁盘内容寻址存储）
+    缓存键为(命名空间, 股票代码, 交易日期, 指标计算函数指纹, 数据版本)，磁盘文件名为缓存键的哈希值，
+    内存按最近最少使用淘汰，磁盘超过容量上限时按最近访问时间淘汰
+    """
+
+    def __init__(self, namespace: str, cache_dir: str = CACHE_DIR, max_items: int = 2048, max_disk_bytes: int = 512 * 1024 * 1024):
+        """
+        初始化指标缓存
+        Args:
+            namespace: 命名空间（如策略名称），不同策略的指标互不影响
+            cache_dir: 缓存根目录
+            max_items: 内存缓存条目上限
+            max_disk_bytes: 磁盘缓存容量上限（字节，作用于整个指标缓存目录），为0时不使用磁盘缓存
+        """
+        self.namespace = namespace
+        self.cache_dir = cache_dir
+        self.bundle_dir = os.path.join(cache_dir, 'bundles')
+        self.data_version = DataVersion(cache_dir)
+        self.max_items = max_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._disk_bytes = None
+        self._fingerprints = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_fingerprint(self, compute_func, params: dict = None) -> str:
+        """
+        获取指标计算函数指纹（同一函数与参数只计算一次），指标计算代码或参数变更后旧缓存不再命中
+        Args:
+            compute_func: 指标计算函数
+            params: 计算参数（如日K线数量）
+        Returns:
+            str: 函数指纹
+        """
+        key = (getattr(compute_func, '__module__', None), getattr(compute_func, '__qualname__', None), hash_key(params))
+        if key not in self._fingerprints:
+            self._fingerprints[key] = get_function_fingerprint(compute_func, params)
+        return self._fingerprints[key]
+
+    def make_key(self, stock_code: str, trade_date: str, fingerprint: str = '') -> str:
+        """
+        生成缓存键
+        Args:
+            stock_code: 股票代码
+            trade_date: 交易日期，格式为'YYYYMMDD'
+            fingerprint: 指标计算函数指纹（见get_fingerprint）
+        Returns:
+            str: 缓存键
+        """
+        return hash_key(self.namespace, stock_code, trade_date, fingerprint, self.data_version.get())
+
+    def _get_path(self, key: str) -> str:
+        """
+        获取缓存文件路径（按哈希前两位分目录）
+        """
+        return os.path.join(self.bundle_dir, key[:2], f"{key}.pkl")
+
+    def get(self, stock_code: str, trade_date: str, fingerprint: str = ''):
+        """
+        读取缓存的指标数据
+        Args:
+            stock_code: 股票代码
+            trade_date: 交易日期，格式为'YYYYMMDD'
+            fingerprint: 指标计算函数指纹
+        Returns:
+            dict: 指标数据，未命中时返回None
+        """
+        key = self.make_key(stock_code, trade_date, fingerprint)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        if self.max_disk_bytes > 0:
+            path = self._get_path(key)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'rb') as f:
+                        bundle = pickle.load(f)
+                    # 更新访问时间，用于磁盘淘汰
+                    os.utime(path)
+                    self._put_memory(key, bundle)
+                    self.hits += 1
+                    return bundle
+                except (OSError, pickle.UnpicklingError, EOFError) as e:
+                    warning(f"读取指标缓存失败: {path} {e}")
+
+        self.misses += 1
+        return None
+
+    def set(self, stock_code: str, trade_date: str, bundle: dict, fingerprint: str = '') -> bool:
+        """
+        写入指标数据缓存
+        Args:
+            stock_code: 股票代码
+            trade_date: 交易日期，格式为'YYYYMMDD'
+            bundle: 指标数据
+            fingerprint: 指标计算函数指纹
+        Returns:
+            bool: 是否成功
+        """
+        key = self.make_key(stock_code, trade_date, fingerprint)
+        self._put_memory(key, bundle)
+        if self.max_disk_bytes <= 0:
+            return True
+
+        path = self._get_path(key)
+        disk_bytes = self._get_disk_bytes()
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._disk_bytes = disk_bytes - old_size + os.path.getsize(path)
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+        return True
+
+    def get_or_compute(self, stock_code: str, trade_date: str, compute_func, fingerprint: str = '') -> dict:
+        """
+        读取缓存的指标数据，未命中时计算并写入缓存
+        Args:
+            stock_code: 股票代码
+            trade_date: 交易日期，格式为'YYYYMMDD'
+            compute_func: 无参数的指标计算函数
+            fingerprint: 指标计算函数指纹
+        Returns:
+            dict: 指标数据
+        """
+        bundle = self.get(stock_code, trade_date, fingerprint)
+        if bundle is None:
+            bundle = compute_func()
+            self.set(stock_code, trade_date, bundle, fingerprint)
+        return bundle
+
+    def _put_memory(self, key: str, bundle: dict):
+        """
+        写入内存缓存，超过条目上限时淘汰最近最少使用的条目
+        """
+        self._memory[key] = bundle
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _list_disk_files(self) -> list:
+        """
+        列出磁盘缓存文件 [(path, size, mtime)]
+        """
+        files = []
+        if not os.path.exists(self.bundle_dir):
+            return files
+        for root, _, names in os.walk(self.bundle_dir):
+            for name in names:
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _get_disk_bytes(self) -> int:
+        """
+        获取磁盘缓存占用字节数（首次调用时扫描目录，之后增量维护）
+        """
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._list_disk_files())
+        return self._disk_bytes
+
+    def _evict_disk(self):
+        """
+        按最近访问时间淘汰磁盘缓存，直到占用低于容量上限的90%
+        """
+        files = sorted(self._list_disk_files(), key=lambda x: x[2])
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * 0.9
+        evicted = 0
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                continue
+        self._disk_bytes = total
+        debug(f"淘汰指标缓存: {evicted} 个文件，当前占用: {total} 字节")
+
+    def clear_memory(self) -> bool:
+        """
+        清空内存缓存
+        Returns:
+            bool: 是否成功
+        """
+        self._memory.clear()
+        return True
@@ -0,0 +1,92 @@
+"""
+回测检查点模块
+将回测运行状态（账户、策略状态与交易日游标）保存为压缩的二进制文件，用于中断后续跑，
+或从中途状态以不同参数分叉运行，无需重放之前的交易日
+
+文件格式: 文件头(CHECKPOINT_MAGIC + 1字节版本号) + zlib压缩的pickle数据
+"""
+
+import os
+import re
+import zlib
+import pickle
+from utils.logger import info, error
+
+# 文件头标识
+CHECKPOINT_MAGIC = b'MDCK'
+# 文件格式版本（状态结构不兼容变更时递增）
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(path: str, state: dict) -> bool:
+    """
+    保存检查点（先写临时文件再替换，写入过程中中断不会损坏已有检查点）
+    Args:
+        path: 检查点文件路径
+        state: 运行状态
+    Returns:
+        bool: 是否成功
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    data = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(CHECKPOINT_MAGIC + bytes([CHECKPOINT_VERSION]))
+        f.write(data)
+    os.replace(tmp_path, path)
+    info(f"保存检查点: {path}，大小: {len(data) / 1024:,.1f} KB")
+    return True
+
+
+def load_checkpoint(path: str) -> dict:
+    """
+    读取检查点
+    Args:
+        path: 检查点文件路径
+    Returns:
+        dict: 运行状态
+    """
+    if not os.path.exists(path):
+        error(f"检查点文件不存在: {path}")
+        raise ValueError(f"检查点文件不存在: {path}")
+    with open(path, 'rb') as f:
+        header = f.read(len(CHECKPOINT_MAGIC) + 1)
+        if header[:len(CHECKPOINT_MAGIC)] != CHECKPOINT_MAGIC:
+            error(f"无效的检查点文件: {path}")
+            raise ValueError(f"无效的检查点文件: {path}")
+        if header[-1] != CHECKPOINT_VERSION:
+            error(f"检查点文件版本不兼容: {header[-1]}，当前版本: {CHECKPOINT_VERSION}")
+            raise ValueError(f"检查点文件版本不兼容: {header[-1]}，当前版本: {CHECKPOINT_VERSION}")
+        state = pickle.loads(zlib.decompress(f.read()))
+    info(f"读取检查点: {path}")
+    return state
+
+
+def find_latest_checkpoint(path: str) -> str:
+    """
+    解析检查点文件路径：文件名包含{trade_date}（按交易日分别保存）时返回交易日最新的检查点文件
+    Args:
+        path: 检查点文件路径，文件名可包含{trade_date}
+    Returns:
+        str: 检查点文件路径
+    """
+    if '{trade_date}' not in path:
+        return path
+    directory, file_name = os.path.split(path)
+    if '{trade_date}' in directory:
+        error(f"检查点目录不支持{{trade_date}}，请指定检查点文件: {path}")
+        raise ValueError(f"检查点目录不支持{{trade_date}}，请指定检查点文件: {path}")
+    parts = [re.escape(part) for part in file_name.split('{trade_date}')]
+    pattern = re.compile(parts[0] + r'(\d{8})' + r'\1'.join(parts[1:]) + '$')
+    trade_dates = []
+    if os.path.isdir(directory or '.'):
+        for name in os.listdir(directory or '.'):
+            match = pattern.match(name)
+            if match:
+                trade_dates.append(match.group(1))
+    if not trade_dates:
+        error(f"未找到与路径匹配的检查点文件: {path}")
+        raise ValueError(f"未找到与路径匹配的检查点文件: {path}")
+    return path.replace('{trade_date}', max(trade_dates))
@@ -0,0 +1,77 @@
+"""
+配置管理模块
+读取配置文件并应用覆盖项（如命令行 --set BACKTEST.initial_amount=500000）；
+入口只读取一次配置并显式传递给策略与账户，同一台机器上可并行运行多个使用不同配置的任务而无需修改配置文件
+"""
+
+import os
+import configparser
+from utils.logger import error
+
+# 默认配置文件路径
+CONFIG_FILE = 'config.ini'
+
+# 未显式传递配置时使用的默认配置（首次使用时读取）
+_default_config = None
+
+
+def parse_override(override: str) -> tuple:
+    """
+    解析配置覆盖项
+    Args:
+        override: 覆盖项，格式为 SECTION.key=value
+    Returns:
+        tuple: (section, key, value)
+    """
+    name, sep, value = override.partition('=')
+    section, dot, key = name.strip().partition('.')
+    if not sep or not dot or not section or not key.strip():
+        error(f"无效的配置覆盖项: {override}，格式应为 SECTION.key=value")
+        raise ValueError(f"无效的配置覆盖项: {override}，格式应为 SECTION.key=value")
+    return section, key.strip(), value.strip()
+
+
+def apply_overrides(config: configparser.ConfigParser, overrides: list) -> configparser.ConfigParser:
+    """
+    应用配置覆盖项（配置节不存在时自动创建）
+    Args:
+        config: 配置
+        overrides: 覆盖项列表，格式为 SECTION.key=value
+    Returns:
+        configparser.ConfigParser: 应用覆盖项后的配置（即传入的config）
+    """
+    for override in overrides or []:
+        section, key, value = parse_override(override)
+        if not config.has_section(section):
+            config.add_section(section)
+        config.set(section, key, value)
+    return config
+
+
+def load_config(path: str = CONFIG_FILE, overrides: list = None) -> configparser.ConfigParser:
+    """
+    读取配置文件并应用覆盖项
+    Args:
+        path: 配置文件路径
+        overrides: 覆盖项列表，格式为 SECTION.key=value
+    Returns:
+        configparser.ConfigParser: 配置
+    """
+    if not os.path.exists(path):
+        error(f"配置文件不存在: {path}")
+        raise ValueError(f"配置文件不存在: {path}")
+    config = configparser.ConfigParser()
+    config.read(path, encoding='utf-8')
+    return apply_overrides(config, overrides)
+
+
+def get_config() -> configparser.ConfigParser:
+    """
+    获取默认配置（未显式传递配置时使用，首次调用时读取默认配置文件）
+    Returns:
+        configparser.ConfigParser: 配置
+    """
+    global _default_config
+    if _default_config is None:
+        _default_config = load_config(CONFIG_FILE)
+    return _default_config
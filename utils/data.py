@@ -3,13 +3,28 @@
 提供数据处理和获取功能
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import akshare as ak
-from xtquant import xtdata
+from xtquant import xtdata, xtasync
 from utils.logger import debug, error
 from utils.util import get_stock_market_type, add_stock_suffix_list
+from utils.cache import bump_data_version, CACHE_DIR
 from tqdm import tqdm
 
+# 价格字段
+PRICE_FIELDS = ['open', 'high', 'low', 'close', 'preClose']
+# 紧凑模式下请求的行情字段（策略实际使用的字段）
+COMPACT_FIELDS = ['open', 'high', 'low', 'close', 'volume', 'preClose']
+# 紧凑模式支持的价格存储类型
+#   'float32': 单精度浮点（保留两位小数后存储，绝对误差约1e-5元）
+#   'fen': int32整数价格，单位为分（无精度损失）
+PRICE_DTYPES = ('float32', 'fen')
+# 'fen'存储类型下表示缺失价格的哨兵值（restore_bars还原为NaN）
+FEN_NAN = np.iinfo(np.int32).min
+
 # 获取交易日历
 def get_trade_calendar(start_time: str, end_time: str, format: str = 'number') -> list:
     """
@@ -74,10 +89,25 @@ def get_stock_list_in_main_board() -> list:
         error(f"获取{sector_name}主板成分股失败: {e}")
         raise RuntimeError(f"获取{sector_name}主板成分股失败: {e}")
 
+# 获取合约信息表
+def get_instrument_detail_table(stock_list: list) -> pd.DataFrame:
+    """
+    批量获取合约信息（当日缓存）
+    Args:
+        stock_list: 股票代码列表
+    Returns:
+        pd.DataFrame: 合约信息表，index为股票代码，列包括name、open_date、is_st等（见xtdata.get_instrument_detail_table）
+    """
+    try:
+        return xtdata.get_instrument_detail_table(add_stock_suffix_list(stock_list))
+    except Exception as e:
+        error(f"获取合约信息失败: {e}")
+        raise RuntimeError(f"获取合约信息失败: {e}")
+
 # 下载股票历史数据
-def download_stock_history_data(stock_list: list, start_time: str, end_time: str = '', period: str = '1d', process_bar: bool = True) -> bool:
+def download_stock_history_data(stock_list: list, start_time: str, end_time: str = '', period: str = '1d', process_bar: bool = True, cache_dir: str = CACHE_DIR) -> bool:
     """
-    下载股票历史K线数据
+    下载股票历史K线数据（本地数据有变化时更新该周期的数据版本，使依赖旧数据的缓存失效）
     Args:
         stock_list: 股票代码列表
         start_time: 开始时间
@@ -85,6 +115,7 @@ def download_stock_history_data(stock_list: list, start_time: str, end_time: str
             '1d': 日线(默认)
             '1m': 1分钟线
         process_bar: 进度条显示，默认显示
+        cache_dir: 缓存根目录
     Returns:
         bool: 是否成功
     """
@@ -100,13 +131,39 @@ def download_stock_history_data(stock_list: list, start_time: str, end_time: str
         error(f"周期不能为空")
         raise ValueError(f"周期不能为空")
     
+    before = get_last_bar_signature(stock_list, period)
     iterator = tqdm(stock_list, desc=f"下载历史数据", ncols=100, colour="green") if process_bar else stock_list
     for code in iterator:
         xtdata.download_history_data(code, period=period, start_time=start_time, end_time=end_time, incrementally=True)
+    # 本地行情数据有变化（或无法判断）时，使依赖该周期旧数据的缓存失效
+    after = get_last_bar_signature(stock_list, period)
+    if before is None or after is None or before != after:
+        bump_data_version(cache_dir, period)
+    else:
+        debug(f"行情数据无变化: {period}")
     return True
 
+def get_last_bar_signature(stock_list: list, period: str = '1d'):
+    """
+    获取本地行情数据中每只股票最后一根K线的摘要（增量下载只追加或更新最后的K线，摘要不变即本地数据未变化）
+    Args:
+        stock_list: 股票代码列表
+        period: 周期
+    Returns:
+        dict: {stock_code: (time, close, volume)}，无本地数据的股票为None；读取失败时返回None
+    """
+    try:
+        dict_data = xtdata.get_local_data(field_list=['time', 'close', 'volume'], stock_list=add_stock_suffix_list(stock_list), period=period, count=1, fill_data=False)
+    except Exception as e:
+        debug(f"读取本地行情数据失败: {e}")
+        return None
+    return {
+        stock_code: tuple(bars.iloc[-1].tolist()) if len(bars) > 0 else None
+        for stock_code, bars in dict_data.items()
+    }
+
 # 获取行情数据
-def get_daily_bars(stock_list: list, period: str = '1d', start_time: str = '', end_time: str = '', count: int = -1) -> dict:
+def get_daily_bars(stock_list: list, period: str = '1d', start_time: str = '', end_time: str = '', count: int = -1, compact: bool = False, price_dtype: str = 'float32') -> dict:
     """
     获取行情数据
     Args:
@@ -115,12 +172,20 @@ def get_daily_bars(stock_list: list, period: str = '1d', start_time: str = '', e
         start_time: 开始时间
         end_time: 结束时间
         count: 数量
+        compact: 是否使用紧凑模式，默认否
+            False: 请求全部字段，价格为float64
+            True: 仅请求COMPACT_FIELDS字段，价格按price_dtype存储，成交量为int64
+        price_dtype: 紧凑模式下的价格存储类型，'float32'或'fen'，仅compact为True时生效
     Returns:
         dict: 行情数据
     """
+    if compact and price_dtype not in PRICE_DTYPES:
+        error(f"无效的价格存储类型: {price_dtype}")
+        raise ValueError(f"无效的价格存储类型: {price_dtype}")
+
     try:
         dict_data = xtdata.get_market_data_ex(
-            field_list=[],
+            field_list=COMPACT_FIELDS if compact else [],
             stock_list=add_stock_suffix_list(stock_list),
             period=period,
             start_time=start_time,
@@ -135,7 +200,102 @@ def get_daily_bars(stock_list: list, period: str = '1d', start_time: str = '', e
             for field in dict_data[stock]:
                 if field in ['open', 'high', 'low', 'close', 'preClose']:
                     dict_data[stock][field] = dict_data[stock][field].astype(float).round(2)
+            if compact:
+                dict_data[stock] = compact_bars(dict_data[stock], price_dtype)
         return dict_data
     except Exception as e:
         error(f"获取行情数据失败: {e}")
         raise RuntimeError(f"获取行情数据失败: {e}")
+
+def compact_bars(bars: pd.DataFrame, price_dtype: str = 'float32') -> pd.DataFrame:
+    """
+    压缩K线数据的存储类型（价格字段转为float32或int32分，成交量转为int64）
+    注意：float32价格与涨跌停价直接比较时存在约1e-5元的误差，需要精确比较时请先调用restore_bars还原，
+    或使用'fen'存储类型；'fen'存储类型下缺失价格存储为FEN_NAN，需调用restore_bars还原后使用
+    Args:
+        bars: K线数据框（价格字段需已保留两位小数）
+        price_dtype: 价格存储类型，'float32'或'fen'
+    Returns:
+        pd.DataFrame: 压缩后的K线数据框
+    """
+    if price_dtype not in PRICE_DTYPES:
+        error(f"无效的价格存储类型: {price_dtype}")
+        raise ValueError(f"无效的价格存储类型: {price_dtype}")
+
+    bars = bars.copy()
+    for field in bars.columns:
+        if field in PRICE_FIELDS:
+            if price_dtype == 'fen':
+                bars[field] = (bars[field].astype(float) * 100).round().fillna(FEN_NAN).astype(np.int32)
+            else:
+                bars[field] = bars[field].astype(float).round(2).astype(np.float32)
+        elif field == 'volume':
+            bars[field] = bars[field].fillna(0).astype(np.int64)
+    return bars
+
+def restore_bars(bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    将紧凑模式的K线数据还原为float64价格（精确到分，可直接与涨跌停价比较，缺失价格还原为NaN）
+    Args:
+        bars: 紧凑模式的K线数据框
+    Returns:
+        pd.DataFrame: 价格字段为float64的K线数据框
+    """
+    bars = bars.copy()
+    for field in bars.columns:
+        if field not in PRICE_FIELDS:
+            continue
+        if np.issubdtype(bars[field].dtype, np.integer):
+            bars[field] = (bars[field].where(bars[field] != FEN_NAN).astype(float) / 100).round(2)
+        else:
+            bars[field] = bars[field].astype(float).round(2)
+    return bars
+
+async def get_trade_calendar_async(start_time: str, end_time: str, format: str = 'number') -> list:
+    """
+    异步获取交易日历（在线程池中执行get_trade_calendar）
+    Args:
+        参数同get_trade_calendar
+    Returns:
+        list: 交易日历
+    """
+    return await xtasync.call(get_trade_calendar, start_time, end_time, format)
+
+async def get_stock_list_in_main_board_async() -> list:
+    """
+    异步获取沪深A股主板成分股（在线程池中执行get_stock_list_in_main_board）
+    Returns:
+        list: 沪深A股主板成分股代码列表
+    """
+    return await xtasync.call(get_stock_list_in_main_board)
+
+async def get_daily_bars_async(stock_list: list, period: str = '1d', start_time: str = '', end_time: str = '', count: int = -1, compact: bool = False, price_dtype: str = 'float32') -> dict:
+    """
+    异步获取行情数据（在线程池中执行get_daily_bars）
+    Args:
+        参数同get_daily_bars
+    Returns:
+        dict: 行情数据
+    """
+    return await xtasync.call(get_daily_bars, stock_list, period, start_time, end_time, count, compact, price_dtype)
+
+def run_concurrently(*coroutines) -> list:
+    """
+    并发执行多个相互独立的异步请求，等待全部完成（任一请求失败时抛出其异常）
+    当前线程已有运行中的事件循环时（如在Jupyter或异步代码中调用），在单独的线程中执行
+    Args:
+        *coroutines: 异步请求，如get_trade_calendar_async(...)
+    Returns:
+        list: 各请求的返回值，顺序与参数一致
+    """
+    async def _gather():
+        return await asyncio.gather(*coroutines)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_gather())
+
+    # asyncio.run不能在运行中的事件循环内调用
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, _gather()).result()
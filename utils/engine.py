@@ -0,0 +1,727 @@
+"""
+事件驱动回测引擎
+将交易日循环、行情切片、指标缓存与成交执行从具体策略中剥离，策略只需实现信号逻辑
+
+组成:
+    Clock: 回测时钟（交易日历游标与当前分钟）
+    DataFeed: 行情数据源（同日日K线窗口复用、盘前指标缓存、分时K线批量读取与快照生成）
+    Strategy: 策略接口（before_open / on_bar / after_close）
+    ExecutionHandler: 成交执行与盘后结算（封装Broker），SharedExecutionHandler为多策略共享账户版本
+    BacktestEngine: 优先队列事件循环，同一时间点按 盘前 -> 分时 -> 盘后 顺序处理
+    PortfolioEngine: 多策略共用一个行情数据源运行，独立账户或共享账户（按策略归属交易）
+"""
+
+import heapq
+import itertools
+from utils.logger import info, debug, error
+from utils.data import get_daily_bars
+from utils.util import iter_minute_snapshot
+from utils.checkpoint import save_checkpoint, load_checkpoint
+
+# 事件类型
+EVENT_BEFORE_OPEN = 'before_open'
+EVENT_BAR = 'bar'
+EVENT_AFTER_CLOSE = 'after_close'
+# 事件优先级（同一交易日内数值越小越先处理）
+EVENT_PRIORITY = {
+    EVENT_BEFORE_OPEN: 0,
+    EVENT_BAR: 1,
+    EVENT_AFTER_CLOSE: 2,
+}
+
+
+class Clock:
+    """
+    回测时钟
+    交易日trade_date为盘前选股所依据的日期（T日），当日分时回放使用下一交易日（T+1日）的行情
+    """
+
+    def __init__(self, trade_calendar: list):
+        """
+        初始化时钟
+        Args:
+            trade_calendar: 交易日历列表，元素为'YYYYMMDD'字符串（需升序排列）
+        """
+        self.trade_calendar = list(trade_calendar)
+        self.index = -1
+        self.minute = ''
+
+    def __len__(self) -> int:
+        # 最后一个交易日没有下一交易日，不运行
+        return max(len(self.trade_calendar) - 1, 0)
+
+    def set(self, index: int, minute: str = '') -> bool:
+        """
+        设置当前时间
+        Args:
+            index: 交易日在交易日历中的位置
+            minute: 当前分钟，盘前与盘后为空字符串
+        Returns:
+            bool: 是否成功
+        """
+        self.index = index
+        self.minute = minute
+        return True
+
+    @property
+    def trade_date(self) -> str:
+        return self.trade_calendar[self.index]
+
+    @property
+    def next_trade_date(self) -> str:
+        return self.trade_calendar[self.index + 1]
+
+
+class DataFeed:
+    """
+    行情数据源
+    同一交易日内的日K线按(截止日期, 数量)缓存为数据窗口，不同数量的请求从更长的窗口中切片，避免重复读取
+    """
+
+    def __init__(self, minute_archive=None, bundle_cache=None):
+        """
+        初始化数据源
+        Args:
+            minute_archive: 分时K线归档（MinuteArchive），为None时直接读取行情数据
+            bundle_cache: 个股盘前指标缓存（BundleCache），为None时不缓存
+        """
+        self.minute_archive = minute_archive
+        self.bundle_cache = bundle_cache
+        self._windows = {} # 日K线数据窗口 {(end_time, count): {stock_code: DataFrame}}
+
+    def release(self) -> bool:
+        """
+        释放日K线数据窗口（每个交易日开始前调用）
+        Returns:
+            bool: 是否成功
+        """
+        self._windows = {}
+        return True
+
+    def get_daily_bars(self, stock_list: list, end_time: str, count: int) -> dict:
+        """
+        获取截至end_time的最近count根日K线
+        Args:
+            stock_list: 股票列表
+            end_time: 截止日期
+            count: 数量（大于0）
+        Returns:
+            dict: {stock_code: DataFrame}，无数据的股票不包含在内
+        """
+        window = self._windows.setdefault((end_time, count), {})
+        missing = [stock_code for stock_code in stock_list if stock_code not in window]
+        if missing:
+            # 优先从同一截止日期、更长的数据窗口中切片
+            for (window_end, window_count), bars in self._windows.items():
+                if window_end != end_time or window_count <= count:
+                    continue
+                for stock_code in missing:
+                    if stock_code in bars and stock_code not in window:
+                        window[stock_code] = bars[stock_code].iloc[-count:]
+            missing = [stock_code for stock_code in missing if stock_code not in window]
+        if missing:
+            window.update(get_daily_bars(missing, "1d", start_time="", end_time=end_time, count=count))
+        return {stock_code: window[stock_code] for stock_code in stock_list if stock_code in window}
+
+    def get_indicator_bundles(self, stock_list: list, trade_date: str, compute, count: int = 30) -> dict:
+        """
+        获取个股盘前指标（优先读取指标缓存，仅对未命中的股票读取日K线并计算）
+        Args:
+            stock_list: 股票列表
+            trade_date: 交易日期
+            compute: 指标计算函数 compute(stock_code, daily_bar) -> dict
+            count: 计算指标所需的日K线数量
+        Returns:
+            dict: {stock_code: 指标字典}
+        """
+        bundles = {}
+        # 缓存键包含指标计算函数及其依赖源码与参数的指纹，指标实现变更后旧缓存不再命中
+        fingerprint = self.bundle_cache.get_fingerprint(compute, {'count': count}) if self.bundle_cache is not None else ''
+        if self.bundle_cache is not None:
+            for stock_code in stock_list:
+                bundle = self.bundle_cache.get(stock_code, trade_date, fingerprint)
+                if bundle is not None:
+                    bundles[stock_code] = bundle
+        missing = [stock_code for stock_code in stock_list if stock_code not in bundles]
+        if missing:
+            for stock_code, daily_bar in self.get_daily_bars(missing, trade_date, count).items():
+                bundles[stock_code] = compute(stock_code, daily_bar)
+                if self.bundle_cache is not None:
+                    self.bundle_cache.set(stock_code, trade_date, bundles[stock_code], fingerprint)
+        return bundles
+
+    def get_minute_bars(self, stock_list: list, trade_date: str) -> dict:
+        """
+        批量读取当日分时K线（优先从归档读取，归档中缺失的股票回退为读取行情数据）
+        Args:
+            stock_list: 股票列表
+            trade_date: 交易日期
+        Returns:
+            dict: {stock_code: DataFrame}
+        """
+        if not stock_list:
+            return {}
+        if self.minute_archive is None:
+            return get_daily_bars(stock_list, "1m", trade_date, trade_date, count=-1)
+        minute_bars = self.minute_archive.read(stock_list, trade_date)
+        missing = [stock_code for stock_code in stock_list if stock_code not in minute_bars]
+        if missing:
+            minute_bars.update(get_daily_bars(missing, "1m", trade_date, trade_date, count=-1))
+        return minute_bars
+
+    def iter_minute_snapshots(self, stock_list: list, trade_date: str):
+        """
+        逐分钟生成当日分时快照
+        Args:
+            stock_list: 股票列表
+            trade_date: 交易日期
+        Returns:
+            generator: 分时快照 {'minute': minute, 'snapshot': [{'stock_code': stock_code, 'bars': bars}]}
+        """
+        return iter_minute_snapshot(self.get_minute_bars(stock_list, trade_date))
+
+
+class Strategy:
+    """
+    策略接口
+    策略在prepare中设置trade_calendar，盘前通过get_bar_universe声明需要回放分时行情的股票，
+    盘中在on_bar中通过submit提交交易信号，成交与盘后结算由引擎完成
+    """
+    name = None # 策略名称（多策略运行时用于区分结果与归属交易），默认使用类名
+    engine = None
+    feed = None
+    execution = None
+
+    def get_name(self) -> str:
+        """
+        获取策略名称
+        Returns:
+            str: 策略名称
+        """
+        return self.name or self.__class__.__name__
+
+    def bind(self, engine, execution=None) -> bool:
+        """
+        绑定回测引擎（共享引擎的行情数据源）
+        Args:
+            engine: 回测引擎
+            execution: 成交执行，默认使用引擎的成交执行
+        Returns:
+            bool: 是否成功
+        """
+        self.engine = engine
+        self.feed = engine.feed
+        self.execution = execution if execution is not None else engine.execution
+        return True
+
+    def prepare(self) -> bool:
+        """
+        准备策略运行环境（需设置self.trade_calendar）
+        Returns:
+            bool: 是否成功
+        """
+        raise NotImplementedError
+
+    def prepare_from(self, strategy) -> bool:
+        """
+        复用其他策略已准备好的运行环境（多策略运行时，只有第一个策略执行prepare）
+        Args:
+            strategy: 已执行prepare的策略
+        Returns:
+            bool: 是否成功
+        """
+        self.trade_calendar = strategy.trade_calendar
+        return True
+
+    def before_open(self, trade_date: str) -> bool:
+        """
+        开盘前运行
+        Args:
+            trade_date: 交易日期
+        Returns:
+            bool: 当日是否需要回放分时行情
+        """
+        return False
+
+    def get_bar_universe(self) -> list:
+        """
+        获取当日需要回放分时行情的股票列表（before_open返回True后调用）
+        Returns:
+            list: 股票列表
+        """
+        return []
+
+    def on_bar(self, snapshot: dict) -> bool:
+        """
+        盘中分时线运行
+        Args:
+            snapshot: 行情快照 {'minute': minute, 'snapshot': [{'stock_code': stock_code, 'bars': bars}]}
+        Returns:
+            bool: 是否成功
+        """
+        return True
+
+    def after_close(self, trade_date: str) -> bool:
+        """
+        收盘后运行（引擎已完成持仓更新与账户记录）
+        Args:
+            trade_date: 交易日期
+        Returns:
+            bool: 是否成功
+        """
+        return True
+
+    def end_of_backtest(self) -> bool:
+        """
+        回测结束
+        Returns:
+            bool: 是否成功
+        """
+        return True
+
+    def get_state(self) -> dict:
+        """
+        获取随检查点保存的策略状态（不包含策略参数，恢复时可使用不同参数从中途分叉运行）
+        Returns:
+            dict: 策略状态
+        """
+        return {'trade_calendar': self.trade_calendar}
+
+    def set_state(self, state: dict) -> bool:
+        """
+        从检查点恢复策略状态（恢复后不再执行prepare）
+        Args:
+            state: 策略状态
+        Returns:
+            bool: 是否成功
+        """
+        for key, value in state.items():
+            setattr(self, key, value)
+        return True
+
+    def submit(self, signal: dict) -> bool:
+        """
+        提交交易信号（立即按信号价格成交，后续信号可以看到本次成交后的资金与持仓）
+        Args:
+            signal: 交易信号 {'action': 'buy'/'sell', 'stock_code': stock_code, 'price': price, 'volume': volume, 'time': time, 'desc': desc}
+        Returns:
+            bool: 是否成交
+        """
+        return self.execution.execute(signal)
+
+
+class ExecutionHandler:
+    """
+    成交执行与盘后结算
+    """
+
+    def __init__(self, broker):
+        """
+        初始化
+        Args:
+            broker: 模拟交易账户（Broker）
+        """
+        self.broker = broker
+
+    def is_owner(self, stock_code: str) -> bool:
+        """
+        持仓是否归属于本执行器的策略（独立账户时全部持仓均归属）
+        Args:
+            stock_code: 股票代码
+        Returns:
+            bool: 是否归属
+        """
+        return True
+
+    def execute(self, signal: dict) -> bool:
+        """
+        执行交易信号
+        Args:
+            signal: 交易信号
+        Returns:
+            bool: 是否成交
+        """
+        if signal['action'] == 'sell':
+            return self.broker.sell(signal)
+        elif signal['action'] == 'buy':
+            return self.broker.buy(signal)
+        return False
+
+    def before_open(self, trade_date: str) -> bool:
+        """
+        盘前处理：输出资产概览，清除volume为0的持仓股票信息、解锁昨日所有被锁定的持仓
+        Args:
+            trade_date: 交易日期
+        Returns:
+            bool: 是否成功
+        """
+        info(f"可用资金: {self.broker.available_amount:,.2f} 元，持仓价值: {self.broker.get_position_value():,.2f} 元，总资产: {self.broker.get_total_assets():,.2f} 元, 总盈利率: {self.broker.get_total_profit_rate():,.2f}%")
+        self.broker.clean_position()
+        self.broker.unlock_position()
+        return True
+
+    def settle(self, trade_date: str, last_snapshot: dict) -> bool:
+        """
+        盘后结算：使用最后一个分时快照更新持仓最新价格，并记录持仓与账户信息
+        Args:
+            trade_date: 交易日期
+            last_snapshot: 当日最后一个分时快照，无分时回放时为None
+        Returns:
+            bool: 是否成功
+        """
+        if last_snapshot is not None:
+            self.broker.update_position(last_snapshot)
+        else:
+            info(f"没有分时快照数据，跳过盘后更新持仓信息")
+        self.broker.record_position_and_account_change(trade_date)
+        return True
+
+
+class SharedExecutionHandler(ExecutionHandler):
+    """
+    共享账户的成交执行（多个策略共用一个Broker）
+    成交记录标注策略名称，持仓归属于建仓的策略，其他策略不能卖出
+    """
+
+    def __init__(self, broker, name: str, owners: dict):
+        """
+        初始化
+        Args:
+            broker: 共享的模拟交易账户（Broker）
+            name: 策略名称
+            owners: 持仓归属 {stock_code: 策略名称}，同一账户的各执行器共用
+        """
+        super().__init__(broker)
+        self.name = name
+        self.owners = owners
+
+    def is_owner(self, stock_code: str) -> bool:
+        return self.owners.get(stock_code, self.name) == self.name
+
+    def execute(self, signal: dict) -> bool:
+        stock_code = signal['stock_code']
+        if not self.is_owner(stock_code):
+            info(f"持仓归属于策略 {self.owners[stock_code]}，{self.name} 不能交易: {stock_code}")
+            return False
+        count = len(self.broker.transactions)
+        result = super().execute(signal)
+        if result:
+            for transaction in self.broker.transactions[count:]:
+                transaction['strategy'] = self.name
+            if self.broker.get_position(stock_code).get('volume', 0) > 0:
+                self.owners[stock_code] = self.name
+            else:
+                self.owners.pop(stock_code, None)
+        return result
+
+
+class BacktestEngine:
+    """
+    事件驱动回测引擎
+    事件按(交易日位置, 优先级, 分钟序号, 入队序号)排序，交易日事件与分时事件均按需入队，
+    分时快照逐分钟生成，不预先生成全天快照
+    """
+
+    def __init__(self, strategy: Strategy, feed: DataFeed = None, execution: ExecutionHandler = None, report: bool = True):
+        """
+        初始化引擎
+        Args:
+            strategy: 策略
+            feed: 行情数据源，默认不使用归档与指标缓存
+            execution: 成交执行，默认使用strategy.broker
+            report: 回测结束时是否调用策略的end_of_backtest输出结果（参数寻优等批量运行时可关闭）
+        """
+        self.strategy = strategy
+        self.report = report
+        self.checkpoint_path = ''
+        self.checkpoint_interval = 0
+        self.feed = feed if feed is not None else DataFeed()
+        self.execution = execution if execution is not None else ExecutionHandler(strategy.broker)
+        self.strategies = [strategy]
+        self.executions = [self.execution]
+        self.clock = None
+        self._queue = []
+        self._counter = itertools.count()
+        self._snapshots = None
+        self._last_snapshot = None
+        self._active = []
+
+    def push(self, day: int, event_type: str, sub_index: int = 0, data=None) -> bool:
+        """
+        事件入队
+        Args:
+            day: 交易日在交易日历中的位置
+            event_type: 事件类型
+            sub_index: 同一交易日、同一优先级内的序号（分时事件为分钟序号）
+            data: 事件数据
+        Returns:
+            bool: 是否成功
+        """
+        heapq.heappush(self._queue, (day, EVENT_PRIORITY[event_type], sub_index, next(self._counter), event_type, data))
+        return True
+
+    def enable_checkpoint(self, path: str, interval: int) -> bool:
+        """
+        启用定期检查点
+        Args:
+            path: 检查点文件路径（每次覆盖保存最新状态；包含{trade_date}时按交易日分别保存，可用于从任意保存点分叉）
+            interval: 保存间隔（交易日数），为0时不保存
+        Returns:
+            bool: 是否成功
+        """
+        self.checkpoint_path = path
+        self.checkpoint_interval = interval
+        return True
+
+    def get_state(self, day: int) -> dict:
+        """
+        获取运行状态（共用同一账户的策略只保存一份账户状态）
+        Args:
+            day: 下一个待运行交易日在交易日历中的位置
+        Returns:
+            dict: 运行状态 {'day', 'trade_calendar', 'brokers': [账户状态], 'strategies': [{'name', 'broker': 账户序号, 'state': 策略状态}]}
+        """
+        brokers = []
+        broker_index = {}
+        for execution in self.executions:
+            if id(execution.broker) not in broker_index:
+                broker_index[id(execution.broker)] = len(brokers)
+                brokers.append(execution.broker.get_state())
+        return {
+            'day': day,
+            'trade_calendar': self.clock.trade_calendar,
+            'brokers': brokers,
+            'strategies': [
+                {'name': strategy.get_name(), 'broker': broker_index[id(execution.broker)], 'state': strategy.get_state()}
+                for strategy, execution in zip(self.strategies, self.executions)
+            ],
+        }
+
+    def set_state(self, state: dict) -> bool:
+        """
+        恢复运行状态（策略按顺序对应，策略参数可与保存时不同）
+        Args:
+            state: 运行状态
+        Returns:
+            bool: 是否成功
+        """
+        if len(state['strategies']) != len(self.strategies):
+            error(f"检查点策略数量不一致: {len(state['strategies'])}，当前: {len(self.strategies)}")
+            raise ValueError(f"检查点策略数量不一致: {len(state['strategies'])}，当前: {len(self.strategies)}")
+        for strategy, execution, item in zip(self.strategies, self.executions, state['strategies']):
+            execution.broker.set_state(state['brokers'][item['broker']])
+            strategy.set_state(item['state'])
+        self.clock = Clock(state['trade_calendar'])
+        return True
+
+    def run(self, resume_from: str = None) -> bool:
+        """
+        运行回测
+        Args:
+            resume_from: 检查点文件路径，不为空时从检查点恢复状态后继续运行（不执行prepare）
+        Returns:
+            bool: 是否成功
+        """
+        # 只有第一个策略执行prepare，其他策略复用其交易日历等运行环境
+        primary = self.strategies[0]
+        for strategy, execution in zip(self.strategies, self.executions):
+            strategy.bind(self, execution)
+            if resume_from:
+                continue
+            if strategy is primary:
+                strategy.prepare()
+            else:
+                strategy.prepare_from(primary)
+        if resume_from:
+            state = load_checkpoint(resume_from)
+            self.set_state(state)
+            start_day = state['day']
+            info(f"从检查点恢复运行: 第 {start_day + 1} 个交易日（{self.clock.trade_calendar[start_day] if start_day < len(self.clock) else '已结束'}）")
+        else:
+            self.clock = Clock(primary.trade_calendar)
+            start_day = 0
+        if start_day < len(self.clock):
+            self.push(start_day, EVENT_BEFORE_OPEN)
+
+        handlers = {
+            EVENT_BEFORE_OPEN: self._on_before_open,
+            EVENT_BAR: self._on_bar,
+            EVENT_AFTER_CLOSE: self._on_after_close,
+        }
+        while self._queue:
+            day, _, sub_index, _, event_type, data = heapq.heappop(self._queue)
+            self.clock.set(day, data['minute'] if event_type == EVENT_BAR else '')
+            handlers[event_type](day, sub_index, data)
+
+        self._end_of_backtest()
+        return True
+
+    def _get_settle_executions(self) -> list:
+        """
+        获取需要盘前处理与盘后结算的成交执行（共用同一账户的只处理一次）
+        """
+        result = []
+        brokers = set()
+        for execution in self.executions:
+            if id(execution.broker) not in brokers:
+                brokers.add(id(execution.broker))
+                result.append(execution)
+        return result
+
+    def _end_of_backtest(self) -> bool:
+        """
+        回测结束（共用同一账户的策略只输出一次结果）
+        """
+        if not self.report:
+            return True
+        brokers = set()
+        for strategy, execution in zip(self.strategies, self.executions):
+            if id(execution.broker) not in brokers:
+                brokers.add(id(execution.broker))
+                strategy.end_of_backtest()
+        return True
+
+    def _push_next_bar(self, day: int, sub_index: int) -> bool:
+        """
+        生成下一个分时快照并入队，当日快照已全部回放时不入队
+        """
+        snapshot = next(self._snapshots, None)
+        if snapshot is not None:
+            self.push(day, EVENT_BAR, sub_index, snapshot)
+        return True
+
+    def _on_before_open(self, day: int, sub_index: int, data) -> bool:
+        trade_date = self.clock.trade_date
+        self.feed.release()
+        self._snapshots = None
+        self._last_snapshot = None
+        for execution in self._get_settle_executions():
+            execution.before_open(trade_date)
+        # 各策略的分时回放股票合并后一次读取，单策略时快照不做过滤
+        self._active = []
+        stock_list = []
+        for strategy in self.strategies:
+            if strategy.before_open(trade_date):
+                universe = strategy.get_bar_universe()
+                self._active.append((strategy, set(universe)))
+                stock_list.extend(stock_code for stock_code in universe if stock_code not in stock_list)
+        if len(self.strategies) == 1:
+            self._active = [(strategy, None) for strategy, _ in self._active]
+        if self._active:
+            debug(f"分时回放股票数: {len(stock_list)}")
+            self._snapshots = self.feed.iter_minute_snapshots(stock_list, self.clock.next_trade_date)
+            self._push_next_bar(day, 0)
+        self.push(day, EVENT_AFTER_CLOSE)
+        return True
+
+    def _on_bar(self, day: int, sub_index: int, snapshot: dict) -> bool:
+        self._last_snapshot = snapshot
+        for strategy, universe in self._active:
+            if universe is None:
+                strategy.on_bar(snapshot)
+            else:
+                strategy.on_bar({'minute': snapshot['minute'], 'snapshot': [item for item in snapshot['snapshot'] if item['stock_code'] in universe]})
+        self._push_next_bar(day, sub_index + 1)
+        return True
+
+    def _on_after_close(self, day: int, sub_index: int, data) -> bool:
+        trade_date = self.clock.trade_date
+        for execution in self._get_settle_executions():
+            execution.settle(trade_date, self._last_snapshot)
+        for strategy in self.strategies:
+            strategy.after_close(trade_date)
+        self._snapshots = None
+        self._active = []
+        info("=" * 100)
+        if self.checkpoint_interval > 0 and (day + 1) % self.checkpoint_interval == 0:
+            save_checkpoint(self.checkpoint_path.replace('{trade_date}', trade_date), self.get_state(day + 1))
+        if day + 1 < len(self.clock):
+            self.push(day + 1, EVENT_BEFORE_OPEN)
+        return True
+
+
+class PortfolioEngine(BacktestEngine):
+    """
+    多策略回测引擎
+    多个策略共用同一行情数据源（交易日历、日K线窗口、分时K线只读取一次），每根分时K线依次驱动各策略；
+    账户模式:
+        独立账户（shared_broker为None）: 各策略使用自己的Broker，分别输出结果
+        共享账户: 各策略共用shared_broker，成交记录标注策略名称，结束时输出各策略的归属统计
+    """
+
+    def __init__(self, strategies: list, feed: DataFeed = None, shared_broker=None, report: bool = True):
+        """
+        初始化引擎
+        Args:
+            strategies: 策略列表（名称不能重复）
+            feed: 行情数据源，默认不使用归档与指标缓存
+            shared_broker: 共享的模拟交易账户，为None时各策略使用自己的Broker
+            report: 回测结束时是否输出各策略结果
+        """
+        if not strategies:
+            error(f"策略列表为空")
+            raise ValueError(f"策略列表为空")
+        names = [strategy.get_name() for strategy in strategies]
+        if len(set(names)) != len(names):
+            error(f"策略名称重复: {names}")
+            raise ValueError(f"策略名称重复: {names}")
+
+        self.shared_broker = shared_broker
+        self.owners = {}
+        if shared_broker is not None:
+            executions = []
+            for strategy, name in zip(strategies, names):
+                strategy.broker = shared_broker
+                executions.append(SharedExecutionHandler(shared_broker, name, self.owners))
+        else:
+            executions = [ExecutionHandler(strategy.broker) for strategy in strategies]
+
+        super().__init__(strategies[0], feed, executions[0], report)
+        self.strategies = list(strategies)
+        self.executions = executions
+
+    def get_attribution(self) -> dict:
+        """
+        获取共享账户下各策略的归属统计（盈亏 = 卖出收入 - 买入支出 + 归属持仓市值）
+        Returns:
+            dict: {策略名称: {'trades': 交易次数, 'buy_amount': 买入支出(含佣金), 'sell_amount': 卖出收入(扣除佣金印花税), 'position_value': 持仓市值, 'profit': 盈亏}}
+        """
+        if self.shared_broker is None:
+            return {}
+        result = {strategy.get_name(): {'trades': 0, 'buy_amount': 0.0, 'sell_amount': 0.0, 'position_value': 0.0, 'profit': 0.0} for strategy in self.strategies}
+        for transaction in self.shared_broker.transactions:
+            item = result.get(transaction.get('strategy'))
+            if item is None:
+                continue
+            amount = transaction['price'] * transaction['volume']
+            item['trades'] += 1
+            if transaction['action'] == 'buy':
+                item['buy_amount'] += amount + transaction.get('commission', 0)
+            else:
+                item['sell_amount'] += amount - transaction.get('commission', 0) - transaction.get('tax', 0)
+        for stock_code, name in self.owners.items():
+            position = self.shared_broker.get_position(stock_code)
+            if name in result:
+                result[name]['position_value'] += position.get('last_price', 0) * position.get('volume', 0)
+        for item in result.values():
+            item['profit'] = item['sell_amount'] - item['buy_amount'] + item['position_value']
+        return result
+
+    def get_state(self, day: int) -> dict:
+        state = super().get_state(day)
+        state['owners'] = dict(self.owners)
+        return state
+
+    def set_state(self, state: dict) -> bool:
+        super().set_state(state)
+        self.owners.clear()
+        self.owners.update(state.get('owners', {}))
+        return True
+
+    def _end_of_backtest(self) -> bool:
+        super()._end_of_backtest()
+        if self.report and self.shared_broker is not None:
+            info("各策略归属统计:")
+            for name, item in self.get_attribution().items():
+                info(f"  {name}: 交易次数: {item['trades']}，持仓市值: {item['position_value']:,.2f} 元，盈亏: {item['profit']:,.2f} 元")
+        return True
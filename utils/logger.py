@@ -1,6 +1,7 @@
 """
 日志工具模块
 提供统一的日志记录功能，支持文件输出、控制台输出和配置化管理
+导入时按默认配置文件初始化日志级别，命令行入口读取配置后调用configure_logger，使日志级别与日志目录跟随-c/--config指定的配置
 """
 
 import logging
@@ -27,7 +28,9 @@ class Logger:
         """
         self.name = name
         self.config_file = config_file
+        self.log_dir = "logs"
         self.logger = None
+        self.formatter = None
         self._setup_logger()
     
     def _setup_logger(self):
@@ -47,7 +50,7 @@ class Logger:
         log_level = self._get_log_level()
         
         # 创建日志格式
-        formatter = logging.Formatter(
+        self.formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
@@ -55,11 +58,11 @@ class Logger:
         # 控制台处理器
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(log_level)
-        console_handler.setFormatter(formatter)
+        console_handler.setFormatter(self.formatter)
         self.logger.addHandler(console_handler)
         
         # 文件处理器
-        self._setup_file_handler(formatter, log_level)
+        self._setup_file_handler(self.formatter, log_level)
     
     def _get_log_level(self) -> int:
         """
@@ -79,6 +82,36 @@ class Logger:
         
         return logging.INFO
     
+    def configure(self, config: configparser.ConfigParser):
+        """
+        按已读取的配置设置日志级别与日志目录（替换导入时按默认配置文件创建的文件处理器）
+        
+        Args:
+            config: 配置，读取[LOGGING]level与log_dir
+        """
+        level_str = config.get('LOGGING', 'level', fallback='INFO').upper()
+        log_level = getattr(logging, level_str, logging.INFO)
+        log_dir = config.get('LOGGING', 'log_dir', fallback='logs') or 'logs'
+        if log_dir != self.log_dir:
+            for handler in list(self.logger.handlers):
+                if isinstance(handler, logging.FileHandler):
+                    self.logger.removeHandler(handler)
+                    handler.close()
+            self.log_dir = log_dir
+            self._setup_file_handler(self.formatter, log_level)
+        self.set_level(level_str)
+    
+    def set_level(self, level: str):
+        """
+        设置日志级别（控制台与文件输出）
+        
+        Args:
+            level: 日志级别名称，如 DEBUG、INFO
+        """
+        log_level = getattr(logging, level.upper(), logging.INFO)
+        for handler in self.logger.handlers:
+            handler.setLevel(log_level)
+    
     def _setup_file_handler(self, formatter: logging.Formatter, log_level: int):
         """
         设置文件处理器
@@ -88,17 +121,16 @@ class Logger:
             log_level: 日志级别
         """
         try:
-            # 确保logs目录存在
-            logs_dir = "logs"
-            if not os.path.exists(logs_dir):
-                os.makedirs(logs_dir)
+            # 确保日志目录存在
+            if not os.path.exists(self.log_dir):
+                os.makedirs(self.log_dir)
             
             # 按日期创建日志文件
             today = datetime.now().strftime("%Y-%m-%d")
-            log_file = os.path.join(logs_dir, f"{self.name}_{today}.log")
+            log_file = os.path.join(self.log_dir, f"{self.name}_{today}.log")
             
-            # 文件处理器
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            # 文件处理器（首次写入时才打开文件，配置变更前不会创建空日志文件）
+            file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
             file_handler.setLevel(log_level)
             file_handler.setFormatter(formatter)
             self.logger.addHandler(file_handler)
@@ -193,6 +225,11 @@ def get_logger(name: Optional[str] = None) -> Logger:
 
 
 # 便捷函数
+def configure_logger(config: configparser.ConfigParser):
+    """按已读取的配置设置日志级别与日志目录"""
+    logger.configure(config)
+
+
 def debug(message: str, *args, **kwargs):
     """调试日志"""
     logger.debug(message, *args, **kwargs)
@@ -0,0 +1,98 @@
+"""
+性能分析模块
+提供分阶段计时（按方法统计调用次数与耗时）与cProfile函数级分析，用于定位回测各阶段的耗时
+"""
+
+import os
+import io
+import time
+import pstats
+import cProfile
+from utils.logger import info
+
+
+class PhaseTimer:
+    """
+    分阶段计时器
+    将对象的方法替换为计时包装（只影响该实例），统计各阶段的调用次数与累计耗时
+    """
+
+    def __init__(self):
+        """
+        初始化计时器
+        """
+        self.stats = {} # 各阶段统计 {phase: {'calls': calls, 'seconds': seconds}}
+
+    def add(self, phase: str, seconds: float) -> bool:
+        """
+        记录一次阶段耗时
+        Args:
+            phase: 阶段名称
+            seconds: 耗时（秒）
+        Returns:
+            bool: 是否成功
+        """
+        stat = self.stats.setdefault(phase, {'calls': 0, 'seconds': 0.0})
+        stat['calls'] += 1
+        stat['seconds'] += seconds
+        return True
+
+    def wrap(self, obj, method_name: str, phase: str = None) -> bool:
+        """
+        为对象的方法添加计时
+        Args:
+            obj: 对象
+            method_name: 方法名称
+            phase: 阶段名称，默认使用方法名称
+        Returns:
+            bool: 是否成功
+        """
+        method = getattr(obj, method_name)
+        phase = phase or method_name
+
+        def timed(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add(phase, time.perf_counter() - start_time)
+
+        setattr(obj, method_name, timed)
+        return True
+
+    def report(self, total_seconds: float = None) -> str:
+        """
+        生成计时报告（按累计耗时降序）
+        Args:
+            total_seconds: 总耗时（秒），指定时输出各阶段占比
+        Returns:
+            str: 计时报告
+        """
+        lines = [f"{'阶段':<24}{'调用次数':>10}{'累计耗时(秒)':>14}{'平均耗时(毫秒)':>16}{'占比':>8}"]
+        for phase, stat in sorted(self.stats.items(), key=lambda x: -x[1]['seconds']):
+            share = f"{stat['seconds'] / total_seconds * 100:.1f}%" if total_seconds else '-'
+            lines.append(f"{phase:<24}{stat['calls']:>10}{stat['seconds']:>14.3f}{stat['seconds'] / stat['calls'] * 1000:>16.3f}{share:>8}")
+        return '\n'.join(lines)
+
+
+def run_profiled(func, output: str, top: int = 30):
+    """
+    使用cProfile运行函数，保存分析结果并输出累计耗时最高的函数（只分析当前进程，子进程不计入）
+    Args:
+        func: 无参数函数
+        output: 分析结果文件路径（可使用 python -m pstats 或 snakeviz 查看）
+        top: 输出的函数数量
+    Returns:
+        func的返回值
+    """
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(func)
+    finally:
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        profile.dump_stats(output)
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(top)
+        info(f"性能分析结果已保存: {output}\n{stream.getvalue()}")
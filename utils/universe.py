@@ -0,0 +1,129 @@
+"""
+股票池预过滤模块
+回测开始前按股票分批读取一次整个回测区间的日K线，只保留每日汇总（收盘价、成交量、平均成交额），
+逐日选股时先用汇总表剔除价格区间外、停牌、ST、上市不足、流动性不足的股票，再对剩余股票读取日K线进行图形筛选
+
+汇总表中交易日T的数据只使用T日收盘及之前的行情（选股在T日收盘后进行），不引入未来数据；
+ST状态与上市日期来自当日合约信息，ST状态为当前状态（历史上曾被ST的股票按当前状态判断）
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from utils.logger import info
+from utils.data import get_daily_bars, get_instrument_detail_table
+
+
+class UniverseFilter:
+    """
+    股票池预过滤
+    价格区间按调用参数过滤（不同价格参数的策略可共用同一汇总表），其余条件在构造时指定
+    """
+
+    def __init__(self, exclude_suspended: bool = False, exclude_st: bool = False, min_listing_days: int = 0, min_amount: float = 0.0, amount_window: int = 20, batch_size: int = 500):
+        """
+        初始化预过滤
+        Args:
+            exclude_suspended: 是否剔除当日停牌（成交量为0）的股票
+            exclude_st: 是否剔除ST股票
+            min_listing_days: 最少上市天数（自然日，0为不限制）
+            min_amount: 最低日均成交额（元，0为不限制）
+            amount_window: 日均成交额计算天数
+            batch_size: 构建汇总表时每批读取的股票数量（控制内存峰值）
+        """
+        self.exclude_suspended = exclude_suspended
+        self.exclude_st = exclude_st
+        self.min_listing_days = min_listing_days
+        self.min_amount = min_amount
+        self.amount_window = amount_window
+        self.batch_size = batch_size
+        self.closes = None # 每日收盘价（停牌日沿用前收盘价） DataFrame[trade_date x stock_code]
+        self.volumes = None # 每日成交量 DataFrame[trade_date x stock_code]
+        self.avg_amounts = None # 日均成交额 DataFrame[trade_date x stock_code]
+        self.st_codes = set() # ST股票
+        self.open_dates = {} # 上市日期 {stock_code: 'YYYYMMDD'}
+
+    def get_params(self) -> dict:
+        """
+        获取与价格区间无关的过滤条件（用于选股结果缓存键）
+        Returns:
+            dict: 过滤条件
+        """
+        return {
+            'exclude_suspended': self.exclude_suspended,
+            'exclude_st': self.exclude_st,
+            'min_listing_days': self.min_listing_days,
+            'min_amount': self.min_amount,
+            'amount_window': self.amount_window,
+        }
+
+    def build(self, stock_list: list, trade_calendar: list) -> bool:
+        """
+        构建每日汇总表
+        Args:
+            stock_list: 股票列表
+            trade_calendar: 需要过滤的交易日列表
+        Returns:
+            bool: 是否成功
+        """
+        if not trade_calendar:
+            return True
+        count = len(trade_calendar) + self.amount_window
+        closes, volumes, amounts = {}, {}, {}
+        for start in range(0, len(stock_list), self.batch_size):
+            daily_bars = get_daily_bars(stock_list[start:start + self.batch_size], "1d", start_time="", end_time=trade_calendar[-1], count=count)
+            for stock_code, daily_bar in daily_bars.items():
+                if daily_bar.empty:
+                    continue
+                index = daily_bar.index.astype(str).str[:8]
+                closes[stock_code] = pd.Series(daily_bar['close'].to_numpy(dtype=np.float64), index=index)
+                volumes[stock_code] = pd.Series(daily_bar['volume'].to_numpy(dtype=np.float64), index=index)
+                if 'amount' in daily_bar:
+                    amounts[stock_code] = pd.Series(daily_bar['amount'].to_numpy(dtype=np.float64), index=index)
+                else:
+                    # 无成交额字段时以收盘价 x 成交量(手) x 100估算
+                    amounts[stock_code] = closes[stock_code] * volumes[stock_code] * 100
+        self.closes = pd.DataFrame(closes).sort_index().ffill()
+        self.volumes = pd.DataFrame(volumes).sort_index().fillna(0)
+        self.avg_amounts = pd.DataFrame(amounts).sort_index().fillna(0).rolling(self.amount_window, min_periods=1).mean()
+
+        if self.exclude_st or self.min_listing_days > 0:
+            details = get_instrument_detail_table(stock_list)
+            self.st_codes = set(details.index[details['is_st'].astype(bool)])
+            self.open_dates = {stock_code: open_date for stock_code, open_date in details['open_date'].items() if open_date and open_date != '0'}
+        info(f"构建股票池预过滤汇总表完成: {self.closes.shape[1]} 只股票，{self.closes.shape[0]} 个交易日")
+        return True
+
+    def filter(self, stock_list: list, trade_date: str, price_min: float = None, price_max: float = None) -> list:
+        """
+        过滤股票池（汇总表不包含该交易日时不过滤）
+        Args:
+            stock_list: 股票列表
+            trade_date: 交易日期
+            price_min: 最低收盘价，为None时不限制
+            price_max: 最高收盘价，为None时不限制
+        Returns:
+            list: 过滤后的股票列表（保持原顺序）
+        """
+        if self.closes is None or trade_date not in self.closes.index:
+            return list(stock_list)
+        close = self.closes.loc[trade_date].reindex(stock_list)
+        # 截至该交易日无行情的股票没有日K线，不可能被选中
+        keep = close.notna()
+        if price_min is not None:
+            keep &= close >= price_min
+        if price_max is not None:
+            keep &= close <= price_max
+        if self.exclude_suspended:
+            keep &= self.volumes.loc[trade_date].reindex(stock_list).fillna(0) > 0
+        if self.min_amount > 0:
+            keep &= self.avg_amounts.loc[trade_date].reindex(stock_list).fillna(0) >= self.min_amount
+        if self.exclude_st:
+            keep &= ~close.index.isin(list(self.st_codes))
+        if self.min_listing_days > 0:
+            date = datetime.strptime(trade_date, '%Y%m%d')
+            keep &= np.array([
+                stock_code in self.open_dates and (date - datetime.strptime(self.open_dates[stock_code], '%Y%m%d')).days >= self.min_listing_days
+                for stock_code in close.index
+            ], dtype=bool)
+        return close.index[keep.to_numpy()].tolist()
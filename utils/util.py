@@ -3,10 +3,29 @@
 提供基础工具函数，如日期转换、股票代码处理等
 """
 
+import datetime
 import pandas as pd
+from functools import lru_cache
 from utils.logger import error, warning
 import time
 
+@lru_cache(maxsize=65536)
+def _parse_date(date_str: str) -> datetime.date:
+    """
+    解析日期字符串（带缓存），优先按'YYYYMMDD'/'YYYY-MM-DD'整数切片解析，其他格式回退至pandas解析
+    Args:
+        date_str: 日期字符串，格式为'YYYYMMDD'或'YYYY-MM-DD'等
+    Returns:
+        datetime.date: 日期
+    """
+    s = str(date_str).strip()
+    if len(s) == 8 and s.isdigit():
+        return datetime.date(int(s[0:4]), int(s[4:6]), int(s[6:8]))
+    if len(s) == 10 and s[4] in '-/' and s[7] == s[4] and (s[0:4] + s[5:7] + s[8:10]).isdigit():
+        return datetime.date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+    return pd.to_datetime(s).date()
+
+@lru_cache(maxsize=65536)
 def date_str_to_num_str(date_str: str) -> str:
     """
     字符串日期转数字日期
@@ -15,7 +34,8 @@ def date_str_to_num_str(date_str: str) -> str:
     Returns:
         str: 数字日期，格式为'YYYYMMDD'
     """
-    return pd.to_datetime(date_str).strftime('%Y%m%d')
+    date = _parse_date(date_str)
+    return f"{date.year:04d}{date.month:02d}{date.day:02d}"
 
 def get_num_date_before_n_days(date_str: str, days: int = 1, format: str = 'number') -> str:
     """
@@ -29,12 +49,11 @@ def get_num_date_before_n_days(date_str: str, days: int = 1, format: str = 'numb
     Returns:
         str: 往前推N天的日期，格式为'number'或'str'
     """
-    date = pd.to_datetime(date_str)
-    date = date - pd.Timedelta(days=days)
+    date = _parse_date(date_str) - datetime.timedelta(days=days)
     if format == 'number':
-        return date.strftime('%Y%m%d')
+        return f"{date.year:04d}{date.month:02d}{date.day:02d}"
     elif format == 'str':
-        return date.strftime('%Y-%m-%d')
+        return f"{date.year:04d}-{date.month:02d}-{date.day:02d}"
     else:
         error(f"无效的格式: {format}")
         raise ValueError(f"无效的格式: {format}")
@@ -136,6 +155,33 @@ def generate_minute_snapshot(daily_bars: dict) -> list:
         snapshots.append({'minute': minute, 'snapshot': snap})
     return snapshots
 
+def iter_minute_snapshot(daily_bars: dict):
+    """
+    逐分钟生成分时行情快照（结果同generate_minute_snapshot，按需生成，不预先复制全部快照）
+    每只股票的时间索引只转换一次，快照中的bars为原数据的前缀切片（只读，需修改时请先copy）
+    Args:
+        daily_bars: 股票池各股票的分时K线数据（需按时间升序），形式如{"000001.SZ": DataFrame, ...}
+    Returns:
+        generator: 分时快照 {'minute': minute, 'snapshot': [{'stock_code': stock_code, 'bars': bars}]}
+    """
+    prepared = []
+    all_minute_set = set()
+    for stock_code, df in daily_bars.items():
+        if len(df) == 0:
+            warning(f"股票 {stock_code} 的分时K线数据为空")
+            continue
+        values = df.index.astype(str).values
+        minutes = set(values)
+        all_minute_set |= minutes
+        prepared.append((stock_code, df, values, minutes))
+
+    for minute in sorted(all_minute_set):
+        snap = []
+        for stock_code, df, values, minutes in prepared:
+            if minute in minutes:
+                snap.append({'stock_code': stock_code, 'bars': df.iloc[:values.searchsorted(minute, side='right')]})
+        yield {'minute': minute, 'snapshot': snap}
+
 
 def get_date_interval(date1: str, date2: str) -> int:
     """
@@ -146,7 +192,7 @@ def get_date_interval(date1: str, date2: str) -> int:
     Returns:
         int: 间隔天数
     """
-    return (pd.to_datetime(date1) - pd.to_datetime(date2)).days
+    return (_parse_date(date1) - _parse_date(date2)).days
 
 def get_elapsed_time_str(start_time: float) -> str:
     """
@@ -163,6 +209,7 @@ def get_elapsed_time_str(start_time: float) -> str:
     return f"{hours}小时{minutes}分{seconds}秒"
 
 # 时间转换，例如 20250909093900 转换为 2025-09-09 09:39:00
+@lru_cache(maxsize=65536)
 def time_str_to_datetime(time_str: str) -> str:
     """
     时间转换，例如 20250909093900 转换为 2025-09-09 09:39:00
@@ -171,7 +218,13 @@ def time_str_to_datetime(time_str: str) -> str:
     Returns:
         str: 时间字符串，格式为'YYYY-MM-DD HH:MM:SS'，例如 '2025-09-09 09:39:00'
     """
-    return pd.to_datetime(time_str, format='%Y%m%d%H%M%S').strftime('%Y-%m-%d %H:%M:%S')
+    s = str(time_str)
+    if len(s) != 14 or not s.isdigit():
+        error(f"无效的时间格式: {time_str}")
+        raise ValueError(f"无效的时间格式: {time_str}")
+    # 构造datetime以校验各字段取值范围
+    datetime.datetime(int(s[0:4]), int(s[4:6]), int(s[6:8]), int(s[8:10]), int(s[10:12]), int(s[12:14]))
+    return f"{s[0:4]}-{s[4:6]}-{s[6:8]} {s[8:10]}:{s[10:12]}:{s[12:14]}"
 
 #  基于交易日历，向前或向后推移天数，返回数字日期
 def add_num_date_days(date_str: str, days: int, trade_calendar: list) -> str:
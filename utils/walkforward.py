@@ -0,0 +1,220 @@
+"""
+滚动窗口（Walk-forward）评估模块
+将回测区间切分为滚动的训练/测试窗口：在训练窗口上对参数网格寻优，在紧随其后的测试窗口上以最优参数回测，
+最终将各测试窗口的资产曲线首尾衔接为一条样本外资产曲线
+
+训练窗口内的全部参数组合作为多策略（独立账户）一次运行，共用同一行情数据源，行情只读取一次；
+各窗口相互独立，可多进程并行
+"""
+
+import itertools
+import configparser
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from utils.logger import info, error
+from utils.data import get_trade_calendar
+from utils.engine import BacktestEngine, PortfolioEngine
+from utils.config import get_config
+
+# 寻优指标
+#   'total_return': 总收益率
+#   'sharpe': 年化夏普比率（按日收益计算，无风险利率为0）
+#   'calmar': 总收益率 / 最大回撤
+METRICS = ('total_return', 'sharpe', 'calmar')
+
+def expand_param_grid(param_grid: dict) -> list:
+    """
+    展开参数网格
+    Args:
+        param_grid: 参数网格，如{'price_min': [5.0, 8.0], 'price_max': [40.0, 60.0]}
+    Returns:
+        list: 参数组合列表，如[{'price_min': 5.0, 'price_max': 40.0}, ...]
+    """
+    if not param_grid:
+        return [{}]
+    keys = list(param_grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[key] for key in keys))]
+
+def get_param_name(params: dict) -> str:
+    """
+    获取参数组合名称（用作策略名称）
+    Args:
+        params: 参数组合
+    Returns:
+        str: 名称，如'price_min=5.0,price_max=40.0'
+    """
+    return ','.join(f"{key}={value}" for key, value in params.items()) or 'default'
+
+def split_windows(trade_calendar: list, train_days: int, test_days: int, step_days: int = 0) -> list:
+    """
+    切分滚动训练/测试窗口
+    回测引擎运行窗口内除最后一天外的每个交易日（最后一天用于分时回放），
+    因此测试窗口从训练窗口的最后一天开始，相邻窗口的运行日期不重叠
+    Args:
+        trade_calendar: 交易日历列表，元素为'YYYYMMDD'字符串（需升序排列）
+        train_days: 训练窗口运行天数
+        test_days: 测试窗口运行天数
+        step_days: 窗口滚动步长，默认等于test_days（各测试窗口首尾相接）
+    Returns:
+        list: 窗口列表 [{'train': (start_time, end_time), 'test': (start_time, end_time)}]
+    """
+    if train_days <= 0 or test_days <= 0:
+        error(f"训练窗口与测试窗口天数必须大于0: train_days: {train_days}, test_days: {test_days}")
+        raise ValueError(f"训练窗口与测试窗口天数必须大于0: train_days: {train_days}, test_days: {test_days}")
+    step_days = step_days or test_days
+    windows = []
+    start = 0
+    while start + train_days + test_days < len(trade_calendar):
+        train_end = start + train_days
+        test_end = train_end + test_days
+        windows.append({
+            'train': (trade_calendar[start], trade_calendar[train_end]),
+            'test': (trade_calendar[train_end], trade_calendar[test_end]),
+        })
+        start += step_days
+    return windows
+
+def evaluate_equity(changes: list, initial_amount: float) -> dict:
+    """
+    根据持仓与账户信息变动记录计算绩效指标
+    Args:
+        changes: 持仓与账户信息变动记录（Broker.position_and_account_changes）
+        initial_amount: 初始资金
+    Returns:
+        dict: {'total_return': 总收益率, 'max_drawdown': 最大回撤, 'sharpe': 年化夏普比率, 'calmar': 收益回撤比}
+    """
+    curve = np.array([initial_amount] + [change['total_assets'] for change in changes], dtype=float)
+    total_return = curve[-1] / curve[0] - 1
+    peak = np.maximum.accumulate(curve)
+    max_drawdown = float(((peak - curve) / peak).max())
+    returns = curve[1:] / curve[:-1] - 1
+    std = returns.std() if len(returns) > 1 else 0.0
+    sharpe = float(returns.mean() / std * np.sqrt(252)) if std > 0 else 0.0
+    calmar = total_return / max_drawdown if max_drawdown > 0 else total_return
+    return {
+        'total_return': float(total_return),
+        'max_drawdown': max_drawdown,
+        'sharpe': sharpe,
+        'calmar': float(calmar),
+    }
+
+def chain_equity_curves(results: list, initial_amount: float) -> pd.DataFrame:
+    """
+    将各测试窗口的资产曲线按窗口顺序首尾衔接（每个窗口按收益率缩放至上一窗口的期末资产）
+    Args:
+        results: 各窗口结果（见run_window）
+        initial_amount: 样本外资产曲线的初始资金
+    Returns:
+        pd.DataFrame: 样本外资产曲线，列为trade_date、window、total_assets
+    """
+    rows = []
+    equity = initial_amount
+    for result in sorted(results, key=lambda x: x['index']):
+        base = result['initial_amount']
+        changes = result['test_changes']
+        for change in changes:
+            rows.append({'trade_date': change['trade_date'], 'window': result['index'], 'total_assets': equity * change['total_assets'] / base})
+        if changes:
+            equity = equity * changes[-1]['total_assets'] / base
+    return pd.DataFrame(rows, columns=['trade_date', 'window', 'total_assets'])
+
+def run_window(task: dict) -> dict:
+    """
+    运行单个窗口：训练窗口内全部参数组合共用行情数据源一次运行，按寻优指标选出最优参数后在测试窗口回测
+    （模块级函数，可在子进程中执行）
+    Args:
+        task: {'index': 窗口序号, 'window': 窗口, 'strategy_class': 策略类, 'param_sets': 参数组合列表, 'metric': 寻优指标, 'strategy_kwargs': 策略其他参数}
+    Returns:
+        dict: {'index', 'train', 'test', 'params': 最优参数, 'train_metrics': {参数名称: 指标}, 'test_metrics': 指标, 'test_changes': 测试窗口持仓与账户变动记录, 'initial_amount': 初始资金}
+    """
+    strategy_class = task['strategy_class']
+    strategy_kwargs = task.get('strategy_kwargs') or {}
+    param_sets = task['param_sets']
+    metric = task['metric']
+    train_start, train_end = task['window']['train']
+    test_start, test_end = task['window']['test']
+
+    # 训练窗口：参数组合作为多策略一次运行（独立账户），行情只读取一次
+    strategies = [
+        strategy_class(name=get_param_name(params), backtest_start_time=train_start, backtest_end_time=train_end, download_required='false', **strategy_kwargs, **params)
+        for params in param_sets
+    ]
+    PortfolioEngine(strategies, strategies[0].feed, report=False).run()
+    train_metrics = {strategy.get_name(): evaluate_equity(strategy.broker.position_and_account_changes, strategy.broker.initial_amount) for strategy in strategies}
+    # 指标相同时取参数网格中靠前的组合
+    best = max(range(len(param_sets)), key=lambda i: (train_metrics[strategies[i].get_name()][metric], -i))
+    params = param_sets[best]
+    info(f"窗口 {task['index']} 训练 {train_start}-{train_end} 最优参数: {get_param_name(params)}，{metric}: {train_metrics[strategies[best].get_name()][metric]:.4f}")
+
+    # 测试窗口：最优参数回测
+    strategy = strategy_class(name=get_param_name(params), backtest_start_time=test_start, backtest_end_time=test_end, download_required='false', **strategy_kwargs, **params)
+    BacktestEngine(strategy, strategy.feed, report=False).run()
+    changes = list(strategy.broker.position_and_account_changes)
+    test_metrics = evaluate_equity(changes, strategy.broker.initial_amount)
+    info(f"窗口 {task['index']} 测试 {test_start}-{test_end} 收益率: {test_metrics['total_return'] * 100:.2f}%，最大回撤: {test_metrics['max_drawdown'] * 100:.2f}%")
+    return {
+        'index': task['index'],
+        'train': (train_start, train_end),
+        'test': (test_start, test_end),
+        'params': params,
+        'train_metrics': train_metrics,
+        'test_metrics': test_metrics,
+        'test_changes': changes,
+        'initial_amount': strategy.broker.initial_amount,
+    }
+
+def run_walk_forward(strategy_class, param_grid: dict, train_days: int = None, test_days: int = None, step_days: int = None, metric: str = None, workers: int = None, start_time: str = None, end_time: str = None, strategy_kwargs: dict = None, config: configparser.ConfigParser = None) -> dict:
+    """
+    滚动窗口评估（未指定的参数读取配置[WALKFORWARD]，回测区间读取配置[BACKTEST]）
+    注意：各窗口不下载行情数据，请先完成下载
+    Args:
+        strategy_class: 策略类（如BuyOnDips），构造参数需支持name、backtest_start_time、backtest_end_time、download_required、config及参数网格中的参数
+        param_grid: 参数网格，如{'price_min': [5.0, 8.0], 'price_max': [40.0, 60.0]}
+        train_days: 训练窗口运行天数
+        test_days: 测试窗口运行天数
+        step_days: 窗口滚动步长，默认等于test_days
+        metric: 寻优指标，见METRICS
+        workers: 并行进程数，为1时在当前进程顺序运行
+        start_time: 回测开始时间
+        end_time: 回测结束时间
+        strategy_kwargs: 策略的其他构造参数
+        config: 配置，默认读取配置文件config.ini（随任务传递给各窗口的策略）
+    Returns:
+        dict: {'windows': 各窗口结果, 'equity_curve': 样本外资产曲线DataFrame, 'metrics': 样本外绩效指标}
+    """
+    if config is None:
+        config = get_config()
+    train_days = train_days or config.getint('WALKFORWARD', 'train_days', fallback=60)
+    test_days = test_days or config.getint('WALKFORWARD', 'test_days', fallback=20)
+    step_days = step_days or config.getint('WALKFORWARD', 'step_days', fallback=0)
+    metric = metric or config.get('WALKFORWARD', 'metric', fallback='total_return')
+    workers = workers or config.getint('WALKFORWARD', 'workers', fallback=1)
+    start_time = start_time or config.get('BACKTEST', 'backtest_start_time')
+    end_time = end_time or config.get('BACKTEST', 'backtest_end_time')
+    if metric not in METRICS:
+        error(f"无效的寻优指标: {metric}")
+        raise ValueError(f"无效的寻优指标: {metric}")
+
+    windows = split_windows(get_trade_calendar(start_time, end_time), train_days, test_days, step_days)
+    if not windows:
+        error(f"回测区间过短，无法切分窗口: {start_time}-{end_time}, train_days: {train_days}, test_days: {test_days}")
+        raise ValueError(f"回测区间过短，无法切分窗口: {start_time}-{end_time}, train_days: {train_days}, test_days: {test_days}")
+    param_sets = expand_param_grid(param_grid)
+    info(f"滚动窗口评估: {len(windows)} 个窗口，{len(param_sets)} 组参数，{workers} 个进程")
+
+    tasks = [
+        {'index': index, 'window': window, 'strategy_class': strategy_class, 'param_sets': param_sets, 'metric': metric, 'strategy_kwargs': {**(strategy_kwargs or {}), 'config': config}}
+        for index, window in enumerate(windows)
+    ]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_window, tasks))
+    else:
+        results = [run_window(task) for task in tasks]
+
+    initial_amount = results[0]['initial_amount']
+    equity_curve = chain_equity_curves(results, initial_amount)
+    metrics = evaluate_equity(equity_curve.to_dict('records'), initial_amount)
+    info(f"样本外收益率: {metrics['total_return'] * 100:.2f}%，最大回撤: {metrics['max_drawdown'] * 100:.2f}%，夏普比率: {metrics['sharpe']:.2f}")
+    return {'windows': results, 'equity_curve': equity_curve, 'metrics': metrics}
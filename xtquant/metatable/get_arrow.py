@@ -1,3 +1,4 @@
+import threading
 from collections import OrderedDict
 
 from .meta_config import (
@@ -9,6 +10,45 @@ from .meta_config import (
 )
 from .get_bson import get_tabular_bson_head
 
+# 已打开的feather数据集缓存 { (path, mtime): (dataset, fields) }，文件更新后mtime变化自动失效
+__FEATHER_CACHE__ = OrderedDict()
+__FEATHER_CACHE_SIZE__ = 16
+__FEATHER_CACHE_LOCK__ = threading.Lock()
+
+
+def _open_feather_dataset(file_path):
+    '''
+    以内存映射方式打开feather文件，按(路径, 修改时间)缓存
+    :param file_path: (str)文件路径
+    :return: (pyarrow.dataset.Dataset, list) 数据集与字段列表
+    '''
+    import os
+    from pyarrow import dataset as ds
+
+    key = (file_path, os.stat(file_path).st_mtime_ns)
+    with __FEATHER_CACHE_LOCK__:
+        if key in __FEATHER_CACHE__:
+            __FEATHER_CACHE__.move_to_end(key)
+            return __FEATHER_CACHE__[key]
+
+    try:
+        from pyarrow import fs
+        dataset = ds.dataset(file_path, format='feather', filesystem=fs.LocalFileSystem(use_mmap=True))
+    except Exception:
+        # 旧版本feather格式（v1）不支持数据集扫描，内存映射读取后包装为内存数据集
+        from pyarrow import feather as fe
+        dataset = ds.dataset(fe.read_table(file_path, memory_map=True))
+
+    value = (dataset, [f.name for f in dataset.schema])
+    with __FEATHER_CACHE_LOCK__:
+        for k in [k for k in __FEATHER_CACHE__ if k[0] == file_path]:
+            del __FEATHER_CACHE__[k]
+        __FEATHER_CACHE__[key] = value
+        while len(__FEATHER_CACHE__) > __FEATHER_CACHE_SIZE__:
+            __FEATHER_CACHE__.popitem(last=False)
+    return value
+
+
 def _get_tabular_feather_single_ori(
         codes: list,
         table: str,
@@ -16,10 +56,16 @@ def _get_tabular_feather_single_ori(
         start_timetag: int,
         end_timetag: int,
         count: int = -1,
+        columns: list = None,
         **kwargs
 ):
+    '''
+    读取单张表的feather数据，时间与代码条件下推至数据集扫描
+    :param columns: (list)需要的字段，None表示全部字段
+    :return: (pyarrow.Table, list) 过滤后的数据与文件中的全部字段
+    '''
     from .. import xtdata
-    from pyarrow import feather as fe
+    from pyarrow import dataset as ds
     import os
 
     CONSTFIELD_TIME = '_time'
@@ -29,76 +75,32 @@ def _get_tabular_feather_single_ori(
     if not os.path.exists(file_path):
         return None, None
 
-    fe_table = fe.read_table(file_path)
-
-    schema = fe_table.schema
-    fe_fields = [f.name for f in schema]
-    def _old_arrow_filter():
-        from pyarrow import dataset as ds
-        nonlocal fe_table, fe_fields
+    dataset, fe_fields = _open_feather_dataset(file_path)
 
-        expressions = []
-        if CONSTFIELD_TIME in fe_fields:
-            if start_timetag > 0:
-                expressions.append(ds.field(CONSTFIELD_TIME) >= start_timetag)
+    expressions = []
+    if CONSTFIELD_TIME in fe_fields:
+        if start_timetag > 0:
+            expressions.append(ds.field(CONSTFIELD_TIME) >= start_timetag)
+        if end_timetag > 0:
+            expressions.append(ds.field(CONSTFIELD_TIME) <= end_timetag)
 
-            if end_timetag > 0:
-                expressions.append(ds.field(CONSTFIELD_TIME) <= end_timetag)
+    if CONSTFIELD_CODE in fe_fields and len(codes) > 0:
+        expressions.append(ds.field(CONSTFIELD_CODE).isin(codes))
 
-        if CONSTFIELD_CODE in fe_fields and len(codes) > 0:
-            expressions.append(ds.field(CONSTFIELD_CODE).isin(codes))
+    expr = None
+    for e in expressions:
+        expr = e if expr is None else expr & e
 
-        if len(expressions) > 0:
-            expr = expressions[0]
-            for e in expressions[1:]:
-                expr = expr & e
-            return ds.dataset(fe_table).to_table(filter=expr)
-        else:
-            return fe_table
+    if columns is not None:
+        columns = [f for f in fe_fields if f in set(columns)]
 
+    _table = dataset.to_table(columns=columns, filter=expr)
 
-    def _new_arrow_filter():
-        from pyarrow import compute as pc
-        nonlocal fe_table, fe_fields
+    if count > 0:
+        start_index = max(0, _table.num_rows - count)
+        _table = _table.slice(start_index, count)
 
-        expressions = []
-        if CONSTFIELD_TIME in fe_fields:
-            if start_timetag > 0:
-                expressions.append(pc.field(CONSTFIELD_TIME) >= start_timetag)
-            if end_timetag > 0:
-                expressions.append(pc.field(CONSTFIELD_TIME) <= end_timetag)
-
-        if CONSTFIELD_CODE in fe_fields and len(codes) > 0:
-            expressions.append(pc.field(CONSTFIELD_CODE).isin(codes))
-
-        if len(expressions) > 0:
-            expr = expressions[0]
-            for e in expressions[1:]:
-                expr = expr & e
-            return fe_table.filter(expr)
-        else:
-            return fe_table
-
-    def do_filter():
-        import pyarrow as pa
-        from distutils import version
-        nonlocal count
-        # python3.6 pyarrow-6.0.1
-        # python3.7 pyarrow-12.0.1
-        # python3.8~12 pyarrow-17.0.0
-        paver = version.LooseVersion(pa.__version__)
-        if paver <= version.LooseVersion('9.0.0'):
-            _table = _old_arrow_filter()
-        else:
-            _table = _new_arrow_filter()
-        
-        if count > 0:
-            start_index = max(0, _table.num_rows - count)
-            _table = _table.slice(start_index, count)
-        
-        return _table
-
-    return do_filter(), fe_fields
+    return _table, fe_fields
 
 
 def _parse_fields(fields):
@@ -265,7 +267,7 @@ def get_tabular_fe_data(
     dfs = []
     ordered_fields = []
     for table, show_fields, fe_fields in table_fields:
-        fe_table, fe_table_fields = _get_tabular_feather_single_ori(codes, table, int_period, start_timetag, end_timetag, count)
+        fe_table, fe_table_fields = _get_tabular_feather_single_ori(codes, table, int_period, start_timetag, end_timetag, count, columns=fe_fields)
         if not fe_table:
             continue
 
@@ -352,7 +354,9 @@ def get_tabular_fe_bson(
         table_head = get_tabular_bson_head(fields)
         ret_bsons.append(xtbson.encode(table_head))
 
-        fe_table, fe_table_fields = _get_tabular_feather_single_ori(codes, table, int_period, start_timetag, end_timetag, count)
+        fe_table, fe_table_fields = _get_tabular_feather_single_ori(codes, table, int_period, start_timetag, end_timetag, count, columns=fe_fields)
+        if fe_table is None:
+            continue
 
         ifields = list()
         new_columns = list()
@@ -104,7 +104,7 @@ def _get_tabular_data_single_ori(
             bson_datas = client.read_local_data(file_path, start_time, end_time, count)
 
             for data in bson_datas:
-                idata = xtbson.decode(data)
+                idata = xtbson.decode_fast(data)
                 ndata = {k: idata[k] for k in keys if k in idata}
                 ret_datas.append(ndata)
 
@@ -123,7 +123,7 @@ def _get_tabular_data_single_ori(
         bson_datas = client.read_local_data(file_path, start_time, end_time, -1)
         data_c = count
         for data in bson_datas:
-            idata = xtbson.decode(data)
+            idata = xtbson.decode_fast(data)
 
             valid = True
             for k, v in scan_whole_filters.items():
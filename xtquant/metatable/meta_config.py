@@ -20,6 +20,14 @@ __META_INFO__ = {}
 __META_FIELDS__ = {}
 __META_TABLES__ = {}
 
+# 元数据本地缓存：格式版本、客户端版本变化或超过有效期时重新从客户端获取，设置环境变量XTQUANT_METATABLE_CACHE=0时禁用
+__META_CACHE_VERSION__ = 1
+__META_CACHE_FILE__ = 'metatable_cache.pkl'
+__META_CACHE_TTL__ = 24 * 60 * 60
+# 当前元数据对应的客户端版本（服务数据路径和getapiversion结果）
+__META_CACHE_CLIENT_VERSION__ = [None]
+
+
 def download_metatable_data():
     '''
     下载metatable信息
@@ -31,21 +39,121 @@ def download_metatable_data():
     ret = xtdata._BSON_call_common(
         cl.commonControl, 'downloadmetatabledata', {}
     )
+    _clear_metainfos_cache()
     return ret
 
+def _get_metainfos_cache_path():
+    '''
+    元数据缓存文件路径，不连接客户端
+    设置过`xtdata.data_dir`时位于该路径的EP目录下，否则位于用户目录的.xtquant目录下
+    缓存中记录了对应客户端的数据路径和版本，多个客户端共用时版本不一致会重新获取
+    '''
+    import os
+    from .. import xtdata
+    if xtdata.data_dir is not None:
+        return os.path.join(xtdata.data_dir, 'EP', __META_CACHE_FILE__)
+    return os.path.join(os.path.expanduser('~'), '.xtquant', __META_CACHE_FILE__)
+
+def _load_metainfos_cache():
+    '''
+    读取元数据缓存
+    客户端已连接时同时校验缓存对应的客户端版本，未连接时在连接后由_check_metainfos_cache校验
+    return: (meta_info, meta_fields, meta_tables)，缓存不存在、已过期或版本不一致时返回None
+    '''
+    import os, time, pickle
+    from .. import xtdata
+    if os.environ.get('XTQUANT_METATABLE_CACHE', '1') == '0':
+        return None
+
+    try:
+        path = _get_metainfos_cache_path()
+        if not os.path.exists(path) or time.time() - os.path.getmtime(path) > __META_CACHE_TTL__:
+            return None
+        with open(path, 'rb') as f:
+            cache = pickle.load(f)
+        if cache.get('version') != __META_CACHE_VERSION__:
+            return None
+        client_version = xtdata._get_connected_client_version()
+        if client_version is not None and cache.get('client_version') != client_version:
+            return None
+        __META_CACHE_CLIENT_VERSION__[0] = cache.get('client_version')
+        return cache['info'], cache['fields'], cache['tables']
+    except Exception:
+        return None
+
+def _check_metainfos_cache():
+    '''
+    客户端连接后校验已加载的元数据缓存，与客户端版本不一致时清除，下次使用时重新获取
+    '''
+    from .. import xtdata
+    if not __META_INFO__:
+        return
+
+    client_version = xtdata._get_connected_client_version()
+    if __META_CACHE_CLIENT_VERSION__[0] != client_version:
+        _clear_metainfos_cache()
+
+def _save_metainfos_cache():
+    '''
+    写入元数据缓存（先写临时文件再替换，多进程同时写入时互不影响）
+    '''
+    import os, pickle
+    from .. import xtdata
+    __META_CACHE_CLIENT_VERSION__[0] = xtdata._get_connected_client_version()
+    if os.environ.get('XTQUANT_METATABLE_CACHE', '1') == '0':
+        return
+
+    try:
+        path = _get_metainfos_cache_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                'version': __META_CACHE_VERSION__,
+                'client_version': __META_CACHE_CLIENT_VERSION__[0],
+                'info': __META_INFO__,
+                'fields': __META_FIELDS__,
+                'tables': __META_TABLES__,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception:
+        pass
+
+def _clear_metainfos_cache():
+    '''
+    清除元数据缓存，下次使用时重新从客户端获取
+    '''
+    import os
+    try:
+        path = _get_metainfos_cache_path()
+        if os.path.exists(path):
+            os.remove(path)
+    except Exception:
+        pass
+
+    __META_INFO__.clear()
+    __META_FIELDS__.clear()
+    __META_TABLES__.clear()
+    __META_CACHE_CLIENT_VERSION__[0] = None
+
 def _init_metainfos():
     '''
     初始化metatable
+    优先读取本地缓存，缓存不可用时从客户端获取并写入缓存
     '''
     import traceback
     from .. import xtdata, xtbson
 
-    global __META_INFO__
-    global __META_FIELDS__
-    global __META_TABLES__
+    cache = _load_metainfos_cache()
+    if cache:
+        # 原地更新，其他模块通过import引用了这些字典
+        __META_INFO__.update(cache[0])
+        __META_FIELDS__.update(cache[1])
+        __META_TABLES__.update(cache[2])
+        return
 
     cl = xtdata.get_client()
-    result = xtbson.BSON.decode(cl.commonControl('getmetatabledatas', xtbson.BSON.encode({})))
+    result = xtbson.decode_fast(cl.commonControl('getmetatabledatas', xtbson.BSON.encode({})))
     all_metainfos = result['result']
 
     for metainfo in all_metainfos:
@@ -70,6 +178,9 @@ def _init_metainfos():
         except:
             traceback.print_exc()
             continue
+
+    if __META_INFO__:
+        _save_metainfos_cache()
     return
 
 def _check_metatable_key(metaid, key):
@@ -26,6 +26,7 @@ class ContextInfo:
         this.timelist = []
         this.barpos = -1
         this.lastrunbarpos = -1
+        this.runbar_batch = 0 #历史K线分批回放的每批数量，0为逐根回放
         this.result = {}
         this.push_result = {}
 
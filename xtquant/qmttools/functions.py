@@ -45,53 +45,74 @@ def subscribe_whole_quote(code_list, callback = None):
 def unsubscribe_quote(subscribe_id):
     return xtdata.unsubscribe_quote(subscribe_id)
 
+def _tick_frame(tick_data, stime_fmt):
+    '''
+    将分笔数据转换为DataFrame（向量化生成stime与时间索引）
+    '''
+    import pandas as pd
+
+    pd_data = pd.DataFrame(tick_data)
+    times = pd_data['time'].to_numpy()
+    pd_data['stime'] = xtdata._timetag_array_to_datetime(times, stime_fmt)
+    pd_data.index = pd.to_datetime((times + 28800000) * 1000000)
+    return pd_data
+
+def _timenode_keys(index):
+    '''
+    时间索引转换为字符串键，与str(Timestamp)一致
+    '''
+    if len(index) == 0 or not (index.nanosecond.any() or index.microsecond.any()):
+        return list(index.strftime('%Y-%m-%d %H:%M:%S'))
+    return [str(t) for t in index]
+
 def get_market_data(
     fields = [], stock_code = [], start_time = '', end_time = ''
     , skip_paused = True, period = '', dividend_type = '', count = -1
+    , result_type = ''
 ):
-    res = {}
+    '''
+    result_type: str
+        '': 与原有返回格式一致
+        'dataframe': 直接返回 { stock: pd.DataFrame }，分笔数据为全部字段，K线数据index为时间，columns为字段
+        'records': 直接返回 { stock: [ {field: value}, ... ] }
+    '''
+    import numpy as np
+    import pandas as pd
+
+    frames = {} # { stock: pd.DataFrame } index为时间节点，columns为全部字段
     if period == 'tick':
         refixed = False
         if count == -2:
             refixed = True
             count = 1
-        if 'quoter' not in fields:
+        if 'quoter' not in fields and not result_type:
             return xtdata.get_market_data_ori(
                     field_list=fields, stock_list=stock_code, period=period
                     , start_time=start_time, end_time=end_time, count=count
                     , dividend_type=dividend_type, fill_data=skip_paused
                 )
 
-        fields = []
         data = xtdata.get_market_data_ori(
-            field_list=fields, stock_list=stock_code, period=period
+            field_list=[] if 'quoter' in fields else fields, stock_list=stock_code, period=period
             , start_time=start_time, end_time=end_time, count=count
             , dividend_type=dividend_type, fill_data=skip_paused
         )
-        fields = ['quoter']
-
-        import pandas as pd
 
         stime_fmt = '%Y%m%d' if period == '1d' else '%Y%m%d%H%M%S'
-        for stock in data:
-            pd_data = pd.DataFrame(data[stock])
-            pd_data['stime'] = [timetag_to_datetime(t, stime_fmt) for t in pd_data['time']]
-            pd_data.index = pd.to_datetime((pd_data['time'] + 28800000) * 1000000)
-            ans = {}
-            for j, timetag in enumerate(pd_data['time']):
-                d_map = {}
-                for key in pd_data:
-                    d_map[key] = pd_data[key][j]
-                ans[str(pd_data.index[j])] = {}
-                ans[str(pd_data.index[j])]['quoter'] = d_map
-            res[stock] = ans
-
-        oriData = res
-            # if not pd_data.empty:
-            #     if count > 0:
-            #         return list(pd_data.T.to_dict().values())
-            #     return pd_data.iloc[-1].to_dict()
-            # return {}
+        tick_frames = {stock: _tick_frame(data[stock], stime_fmt) for stock in data}
+        if result_type == 'dataframe':
+            return tick_frames
+        if result_type == 'records':
+            return {stock: df.to_dict('records') for stock, df in tick_frames.items()}
+
+        fields = ['quoter']
+        for stock, pd_data in tick_frames.items():
+            frame = pd.DataFrame(
+                {'quoter': pd_data.to_dict('records')}, index = _timenode_keys(pd_data.index)
+            )
+            # 时间相同的分笔只保留最后一笔
+            frames[stock] = frame[~frame.index.duplicated(keep = 'last')]
+
         if refixed:
             count = -2
     else:
@@ -108,48 +129,40 @@ def get_market_data(
             end_time = ''
             count = -1
         for i, stock in enumerate(index[0]):
-            ans = {}
-            for j, timetag in enumerate(index[1]):
-                d_map = {}
-                for key in data:
-                    d_map[key] = data[key][i][j]
-                ans[timetag] = d_map
-            res[stock] = ans
-        oriData = res
-
-    resultDict = {}
-    for code in oriData:
-        for timenode in oriData[code]:
-            values = []
-            for field in fields:
-                values.append(oriData[code][timenode][field])
-            key = code + timenode
-            resultDict[key] = values
+            frames[stock] = pd.DataFrame({key: data[key][i] for key in data}, index = list(index[1]))
+
+        if result_type == 'dataframe':
+            return {stock: df[fields] if fields else df for stock, df in frames.items()}
+        if result_type == 'records':
+            return {stock: (df[fields] if fields else df).to_dict('records') for stock, df in frames.items()}
+
+    # 各股票按字段顺序取值的行数据 [ (timenode, values), ... ]
+    # 按列取值，各字段保持自身类型（整数字段不会随浮点字段转换为float64）
+    def _rows(code):
+        df = frames[code]
+        if not fields:
+            return ((timenode, []) for timenode in df.index)
+        columns = [df[field].to_numpy() for field in fields]
+        return zip(df.index, (list(row) for row in zip(*columns)))
 
     if len(fields) == 1 and len(stock_code) <= 1 and (
             (start_time == '' and end_time == '') or start_time == end_time) and (count == -1 or count == -2):
-        # if resultDict:
-            # keys = list(resultDict.keys())
-            # if resultDict[keys[-1]]:
-            #     return resultDict[keys[-1]]
-        for key in resultDict:
-            return resultDict[key][0]
+        for code in frames:
+            if len(frames[code]) > 0:
+                return frames[code][fields[0]].iloc[0]
         return -1
-    import numpy as np
-    import pandas as pd
     if len(stock_code) <= 1 and start_time == '' and end_time == '' and (count == -1 or count == -2):
-        for key in resultDict:
-            result = pd.Series(resultDict[key], index=fields)
-            return result
+        for code in frames:
+            for timenode, row in _rows(code):
+                return pd.Series(row, index=fields)
+        return
     if len(stock_code) > 1 and start_time == '' and end_time == '' and (count == -1 or count == -2):
         values = []
         for code in stock_code:
-            if code in oriData:
-                if not oriData[code]:
+            if code in frames:
+                if len(frames[code]) == 0:
                     values.append([np.nan])
-                for timenode in oriData[code]:
-                    key = code + timenode
-                    values.append(resultDict[key])
+                values.extend(row for timenode, row in _rows(code))
             else:
                 values.append([np.nan])
         result = pd.DataFrame(values, index=stock_code, columns=fields)
@@ -157,29 +170,24 @@ def get_market_data(
     if len(stock_code) <= 1 and ((start_time != '' or end_time != '') or count >= 0):
         values = []
         times = []
-        for code in oriData:
-            for timenode in oriData[code]:
-                key = code + timenode
+        for code in frames:
+            for timenode, row in _rows(code):
                 times.append(timenode)
-                values.append(resultDict[key])
+                values.append(row)
         result = pd.DataFrame(values, index=times, columns=fields)
         return result
     if len(stock_code) > 1 and ((start_time != '' or end_time != '') or count >= 0):
         values = {}
         for code in stock_code:
-            times = []
-            value = []
-            if code in oriData:
-                for timenode in oriData[code]:
-                    key = code + timenode
-                    times.append(timenode)
-                    value.append(resultDict[key])
-            values[code] = pd.DataFrame(value, index=times, columns=fields)
+            if code in frames:
+                values[code] = pd.DataFrame({field: frames[code][field].to_numpy() for field in fields}, index=list(frames[code].index), columns=fields)
+            else:
+                values[code] = pd.DataFrame([], index=[], columns=fields)
         try:
             result = pd.Panel(values)
             return result
         except:
-            return oriData
+            return {code: dict(zip(df.index, df.to_dict('records'))) for code, df in frames.items()}
     return
 
 def get_market_data_ex(
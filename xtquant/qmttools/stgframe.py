@@ -50,6 +50,7 @@ class StrategyLoader:
                 , 31536000000   :'1y'
             }.get(C.period, '')
         C.dividend_type = C._param.get('dividend_type', 'none')
+        C.runbar_batch = C._param.get('runbar_batch', 0)
 
         backtest = C._param.get('backtest', {})
         if backtest:
@@ -221,9 +222,20 @@ class StrategyLoader:
         this.run_bar()
         return
 
+    def is_bar_in_range(this, bartime):
+        C = this.C
+        return (
+            not C.start_time_num or C.start_time_num <= bartime
+        ) and (
+            not C.end_time_num or bartime <= C.end_time_num
+        )
+
     def run_bar(this):
         C = this.C
 
+        if C.runbar_batch and C.runbar_batch > 1:
+            return this.run_bar_batch(C.runbar_batch)
+
         push_timelist = []
         bar_timelist = []
 
@@ -234,11 +246,7 @@ class StrategyLoader:
             push_timelist.append(bartime)
             bar_timelist.append(bartime)
 
-            if (
-                not C.start_time_num or C.start_time_num <= bartime
-            ) and (
-                not C.end_time_num or bartime <= C.end_time_num
-            ):
+            if this.is_bar_in_range(bartime):
                 this.call_formula('runbar', {'timelist': bar_timelist})
                 bar_timelist = []
 
@@ -258,6 +266,48 @@ class StrategyLoader:
             this.call_formula('index', push_result)
         return
 
+    def run_bar_batch(this, batch_size):
+        '''
+        分批回放K线：每批历史K线只调用一次runbar，再逐根设置C.barpos并调用handlebar
+        公式端在一批K线内的位置为该批最后一根，适用于handlebar不依赖公式端逐根状态的历史回放
+        最新一根K线（实时行情下仍在更新）按逐根方式处理，绘图与推送结果在全部K线处理后统一推送
+        :param batch_size: (int)每批K线数量
+        '''
+        C = this.C
+
+        push_timelist = []
+        start = max(C.lastrunbarpos, 0)
+        last = len(C.timelist) - 1
+
+        for chunk_start in range(start, last, batch_size):
+            chunk = range(chunk_start, min(chunk_start + batch_size, last))
+            bar_timelist = C.timelist[chunk.start : chunk.stop]
+            push_timelist.extend(bar_timelist)
+
+            this.call_formula('runbar', {'timelist': bar_timelist})
+            for i in chunk:
+                C.barpos = i
+                if this.is_bar_in_range(C.timelist[i]):
+                    C.handlebar()
+                C.lastrunbarpos = i
+
+        if last >= start:
+            C.barpos = last
+            bartime = C.timelist[last]
+            push_timelist.append(bartime)
+
+            this.call_formula('runbar', {'timelist': [bartime]})
+            if this.is_bar_in_range(bartime):
+                C.handlebar()
+            C.lastrunbarpos = last
+
+        push_result = {}
+        push_result['timelist'] = push_timelist
+        push_result['outputs'] = C.push_result
+        C.push_result = {}
+        this.call_formula('index', push_result)
+        return
+
     def create_formula(this, callback = None):
         C = this.C
         client = xtdata.get_client()
@@ -0,0 +1,147 @@
+#coding:utf-8
+'''
+xtdata的asyncio接口
+
+xtdata的接口均为阻塞调用，本模块将其放入线程池执行，使多个相互独立的请求可以并发等待；
+下载进度回调转换为异步迭代器。
+
+示例:
+    async def main():
+        dates, stocks = await asyncio.gather(
+            xtasync.get_trading_dates('SH', '20240101', '20241231')
+            , xtasync.get_stock_list_in_sector('沪深A股')
+        )
+        task = xtasync.download_history_data2(stocks, '1d', '20240101')
+        async for progress in task:
+            print(progress['finished'], progress['total'])
+        result = await task
+'''
+
+import asyncio as _ASYNCIO_
+import functools as _FUNCTOOLS_
+import threading as _THREADING_
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+
+from . import xtdata as _XTDATA_
+
+
+_executor = None
+_executor_lock = _THREADING_.Lock()
+_max_workers = 8
+
+
+def set_max_workers(max_workers):
+    '''
+    设置执行阻塞调用的线程数，需在首次调用前设置
+    :param max_workers: (int)线程数
+    '''
+    global _max_workers
+    _max_workers = max_workers
+
+
+def get_executor():
+    '''
+    获取执行阻塞调用的线程池（首次使用时创建）
+    '''
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = _ThreadPoolExecutor(max_workers = _max_workers, thread_name_prefix = 'xtasync')
+        return _executor
+
+
+async def call(func, *args, **kwargs):
+    '''
+    在线程池中执行阻塞函数
+    :param func: 阻塞函数
+    :return: 函数返回值
+    '''
+    loop = _ASYNCIO_.get_running_loop()
+    return await loop.run_in_executor(get_executor(), _FUNCTOOLS_.partial(func, *args, **kwargs))
+
+
+def _wrap(func):
+    @_FUNCTOOLS_.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await call(func, *args, **kwargs)
+    return wrapper
+
+
+get_market_data = _wrap(_XTDATA_.get_market_data)
+get_market_data_ex = _wrap(_XTDATA_.get_market_data_ex)
+get_local_data = _wrap(_XTDATA_.get_local_data)
+get_full_tick = _wrap(_XTDATA_.get_full_tick)
+get_divid_factors = _wrap(_XTDATA_.get_divid_factors)
+get_trading_dates = _wrap(_XTDATA_.get_trading_dates)
+get_trading_calendar = _wrap(_XTDATA_.get_trading_calendar)
+get_sector_list = _wrap(_XTDATA_.get_sector_list)
+get_stock_list_in_sector = _wrap(_XTDATA_.get_stock_list_in_sector)
+get_instrument_detail = _wrap(_XTDATA_.get_instrument_detail)
+get_instrument_detail_list = _wrap(_XTDATA_.get_instrument_detail_list)
+get_instrument_detail_table = _wrap(_XTDATA_.get_instrument_detail_table)
+get_financial_data = _wrap(_XTDATA_.get_financial_data)
+get_financial_data_table = _wrap(_XTDATA_.get_financial_data_table)
+download_history_data = _wrap(_XTDATA_.download_history_data)
+download_financial_data = _wrap(_XTDATA_.download_financial_data)
+
+
+class ProgressTask:
+    '''
+    带进度回调的阻塞任务
+    async for 迭代进度回调数据，await 获取任务返回值
+    '''
+    def __init__(self, func, *args, **kwargs):
+        '''
+        :param func: 阻塞函数，需支持callback关键字参数接收进度回调
+        '''
+        self._loop = _ASYNCIO_.get_running_loop()
+        self._queue = _ASYNCIO_.Queue()
+        self._future = self._loop.run_in_executor(
+            get_executor(), _FUNCTOOLS_.partial(func, *args, callback = self._on_progress, **kwargs)
+        )
+
+    def _on_progress(self, data):
+        # 在工作线程中回调，转交事件循环线程入队（先于任务完成通知执行，进度不会丢失）
+        # 部分接口复用同一个进度字典，入队前复制
+        if isinstance(data, dict):
+            data = dict(data)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, data)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        if self._future.done():
+            raise StopAsyncIteration
+
+        getter = _ASYNCIO_.ensure_future(self._queue.get())
+        await _ASYNCIO_.wait({getter, self._future}, return_when = _ASYNCIO_.FIRST_COMPLETED)
+        if getter.done():
+            return getter.result()
+        getter.cancel()
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        raise StopAsyncIteration
+
+    def __await__(self):
+        return self._future.__await__()
+
+
+def download_history_data2(stock_list, period, start_time = '', end_time = '', incrementally = None):
+    '''
+    异步下载历史行情数据，参数同xtdata.download_history_data2
+    :return: ProgressTask
+        async for 迭代下载进度 {'finished': int, 'total': int, ...}
+        await 获取下载结果，同xtdata.download_history_data2返回值
+    '''
+    return ProgressTask(_XTDATA_.download_history_data2, stock_list, period, start_time, end_time, incrementally = incrementally)
+
+
+def download_financial_data2(stock_list, table_list = [], start_time = '', end_time = ''):
+    '''
+    异步下载财务数据，参数同xtdata.download_financial_data2
+    :return: ProgressTask
+    '''
+    return ProgressTask(_XTDATA_.download_financial_data2, stock_list, table_list, start_time, end_time)
@@ -5,3 +5,5 @@ if sys.version_info.major == 3 and sys.version_info.minor == 6:
     from .bson36 import *
 else:
     from .bson37 import *
+
+from .fastdecode import decode_fast, USE_COMPILED
@@ -0,0 +1,168 @@
+#coding:utf-8
+'''
+BSON快速解码
+
+行情推送、下载进度等回调中的BSON数据多为由数值、字符串、布尔值组成的扁平文档，
+通用解码器需要按CodecOptions逐元素分派，开销较大。本模块提供decode_fast：
+    1. 可导入编译版bson（pymongo附带的C扩展）时，优先使用编译版解码
+       （数值、字符串、布尔、日期、嵌套文档与数组的结果与BSON.decode一致，
+        二进制、ObjectId等类型返回编译版bson自身的类）
+    2. 否则使用针对常见类型特化的纯Python解码
+    3. 遇到特化解码不支持的类型（日期、二进制、ObjectId等）或数据不合法时，回退至通用解码器，
+       保证纯Python路径的返回结果及异常与BSON.decode一致
+'''
+
+import os as _OS_
+import sys as _SYS_
+import struct as _STRUCT_
+
+if _SYS_.version_info.major == 3 and _SYS_.version_info.minor == 6:
+    from .bson36 import decode as _decode, Int64 as _Int64
+else:
+    from .bson37 import decode as _decode, Int64 as _Int64
+
+
+_UNPACK_INT = _STRUCT_.Struct('<i').unpack_from
+_UNPACK_LONG = _STRUCT_.Struct('<q').unpack_from
+_UNPACK_DOUBLE = _STRUCT_.Struct('<d').unpack_from
+
+_BSON_DOUBLE = 0x01
+_BSON_STRING = 0x02
+_BSON_OBJECT = 0x03
+_BSON_ARRAY = 0x04
+_BSON_BOOL = 0x08
+_BSON_NULL = 0x0A
+_BSON_INT32 = 0x10
+_BSON_INT64 = 0x12
+
+
+# 字段名缓存（行情推送的字段名高度重复，避免重复utf-8解码）
+_NAME_CACHE = {}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _load_compiled_decode():
+    '''
+    加载编译版bson解码函数，设置环境变量XTQUANT_BSON_COMPILED=0时禁用
+    :return: 解码函数，不可用时返回None
+    '''
+    if _OS_.environ.get('XTQUANT_BSON_COMPILED', '1') == '0':
+        return None
+    try:
+        import bson
+        if bson.has_c():
+            return bson.decode
+    except Exception:
+        pass
+    return None
+
+
+_compiled_decode = _load_compiled_decode()
+USE_COMPILED = _compiled_decode is not None
+
+
+def _decode_document(data, position, as_list):
+    '''
+    解码一个BSON文档或数组
+    :param data: (bytes)BSON数据
+    :param position: (int)文档起始位置
+    :param as_list: (bool)是否按数组解码
+    :return: (dict | list, int) 解码结果与文档结束位置
+    '''
+    unpack_int = _UNPACK_INT
+    unpack_double = _UNPACK_DOUBLE
+    find = data.index
+
+    size = unpack_int(data, position)[0]
+    end = position + size - 1
+    if size < 5 or data[end] != 0:
+        raise _Unsupported()
+
+    result = [] if as_list else {}
+    append = result.append if as_list else None
+    position += 4
+    while position < end:
+        element_type = data[position]
+        name_end = find(b'\x00', position + 1)
+        if not as_list:
+            raw_name = data[position + 1 : name_end]
+            name = _NAME_CACHE.get(raw_name)
+            if name is None:
+                name = raw_name.decode('utf-8')
+                if len(_NAME_CACHE) < 4096:
+                    _NAME_CACHE[raw_name] = name
+        position = name_end + 1
+
+        if element_type == _BSON_DOUBLE:
+            value = unpack_double(data, position)[0]
+            position += 8
+        elif element_type == _BSON_INT32:
+            value = unpack_int(data, position)[0]
+            position += 4
+        elif element_type == _BSON_INT64:
+            value = _Int64(_UNPACK_LONG(data, position)[0])
+            position += 8
+        elif element_type == _BSON_STRING:
+            length = unpack_int(data, position)[0]
+            str_end = position + 4 + length - 1
+            if length < 1 or data[str_end] != 0:
+                raise _Unsupported()
+            value = data[position + 4 : str_end].decode('utf-8')
+            position = str_end + 1
+        elif element_type == _BSON_BOOL:
+            flag = data[position]
+            if flag > 1:
+                raise _Unsupported()
+            value = flag == 1
+            position += 1
+        elif element_type == _BSON_NULL:
+            value = None
+        elif element_type == _BSON_OBJECT:
+            value, position = _decode_document(data, position, False)
+        elif element_type == _BSON_ARRAY:
+            value, position = _decode_document(data, position, True)
+        else:
+            raise _Unsupported()
+
+        if as_list:
+            append(value)
+        else:
+            result[name] = value
+
+    if position != end:
+        raise _Unsupported()
+    return result, end + 1
+
+
+def decode_python(data):
+    '''
+    纯Python特化解码，不支持的类型回退至通用解码器
+    :param data: (bytes)BSON数据
+    :return: dict
+    '''
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    try:
+        result, end = _decode_document(data, 0, False)
+        if end == len(data):
+            return result
+    except (_Unsupported, _STRUCT_.error, IndexError, ValueError):
+        pass
+    return _decode(data)
+
+
+def decode_fast(data):
+    '''
+    快速解码BSON数据，结果与BSON.decode一致
+    :param data: (bytes)BSON数据
+    :return: dict
+    '''
+    if _compiled_decode is not None:
+        try:
+            return _compiled_decode(data)
+        except Exception:
+            return _decode(data)
+    return decode_python(data)
@@ -5,6 +5,7 @@ import time as _TIME_
 import traceback as _TRACEBACK_
 
 from . import xtbson as _BSON_
+from .xtdispatch import QuoteDispatcher
 from .metatable import *
 from .metatable import get_tabular_data as _get_tabular_data
 
@@ -12,6 +13,7 @@ from .metatable import get_tabular_data as _get_tabular_data
 __all__ = [
     'subscribe_quote'
     , 'subscribe_whole_quote'
+    , 'QuoteDispatcher'
     , 'unsubscribe_quote'
     , 'run'
     , 'get_market_data'
@@ -23,8 +25,10 @@ __all__ = [
     , 'get_l2_transaction'
     , 'download_history_data'
     , 'get_financial_data'
+    , 'get_financial_data_table'
     , 'download_financial_data'
     , 'get_instrument_detail'
+    , 'get_instrument_detail_table'
     , 'get_instrument_type'
     , 'get_trading_dates'
     , 'get_sector_list'
@@ -89,12 +93,14 @@ __client_last_spec = ('', None)
 
 __hk_broke_info = {}
 __download_version = None
+__api_version = None
 
 
 def connect(ip = '', port = None, remember_if_success = True):
     global __client
     global __data_dir_from_server
     global __download_version
+    global __api_version
 
     if __client:
         if __client.is_connected():
@@ -147,11 +153,15 @@ def connect(ip = '', port = None, remember_if_success = True):
     __data_dir_from_server = _OS_.path.abspath(__data_dir_from_server)
 
     try:
-        __download_version = _BSON_call_common(
+        __api_version = _BSON_call_common(
             __client.commonControl, 'getapiversion', {}
-        ).get('downloadversion', None)
+        )
+        __download_version = __api_version.get('downloadversion', None)
     except:
-        pass
+        __api_version = None
+
+    from .metatable import meta_config
+    meta_config._check_metainfos_cache()
 
     hello()
     return __client
@@ -234,6 +244,15 @@ def get_data_dir():
     return data_dir if data_dir != None else __data_dir_from_server
 
 
+def _get_connected_client_version():
+    '''
+    已连接服务的版本信息（服务数据路径和getapiversion结果），未连接时返回None
+    '''
+    if not __client or not __client.is_connected():
+        return None
+    return {'data_dir': __data_dir_from_server, 'api_version': __api_version}
+
+
 __meta_field_list = {}
 
 def get_field_list(metaid):
@@ -280,7 +299,7 @@ __register_create_nparray(create_array)
 
 
 def _BSON_call_common(interface, func, param):
-    return _BSON_.BSON.decode(interface(func, _BSON_.BSON.encode(param)))
+    return _BSON_.decode_fast(interface(func, _BSON_.BSON.encode(param)))
 
 
 ### function
@@ -315,21 +334,7 @@ def get_index_weight(index_code):
     return client.get_weight_in_index(index_code)
 
 
-def get_financial_data(stock_list, table_list=[], start_time='', end_time='', report_type='report_time'):
-    '''
-     获取财务数据
-    :param stock_list: (list)合约代码列表
-    :param table_list: (list)报表名称列表
-    :param start_time: (str)起始时间
-    :param end_time: (str)结束时间
-    :param report_type: (str) 时段筛选方式 'announce_time' / 'report_time'
-    :return:
-        field: list[str]
-        date: list[int]
-        stock: list[str]
-        value: list[list[float]]
-    '''
-    client = get_client()
+def _get_financial_request(table_list):
     all_table = {
         'Balance' : 'ASHAREBALANCESHEET'
         , 'Income' : 'ASHAREINCOME'
@@ -351,75 +356,125 @@ def get_financial_data(stock_list, table_list=[], start_time='', end_time='', re
         req_table = all_table_upper.get(table.upper(), table)
         req_list.append(req_table)
         names[req_table] = table
+    return req_list, names
+
+
+def _get_financial_data_chunks(stock_list, req_list, start_time, end_time, report_type, workers = 1):
+    '''
+    按每批20个合约分批请求财务数据
+    :param workers: (int)并发请求的线程数，1为顺序请求
+    :return: { stock: { table: [row_dict, ...] } }
+    '''
+    client = get_client()
 
-    data = {}
     sl_len = 20
     stock_list2 = [stock_list[i : i + sl_len] for i in range(0, len(stock_list), sl_len)]
-    for sl in stock_list2:
-        data2 = client.get_financial_data(sl, req_list, start_time, end_time, report_type)
-        for s in data2:
-            data[s] = data2[s]
-
-    import math
-    def conv_date(data, key, key2):
-        if key in data:
-            tmp_data = data[key]
-            if math.isnan(tmp_data):
-                if key2 not in data or math.isnan(data[key2]):
-                    data[key] = ''
-                else:
-                    tmp_data = data[key2]
-            data[key] = _TIME_.strftime('%Y%m%d', _TIME_.localtime(tmp_data / 1000))
-        return
 
-    result = {}
+    def _request(sl):
+        return client.get_financial_data(sl, req_list, start_time, end_time, report_type)
+
+    data = {}
+    if workers > 1 and len(stock_list2) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers = workers) as executor:
+            for data2 in executor.map(_request, stock_list2):
+                data.update(data2)
+    else:
+        for sl in stock_list2:
+            data.update(_request(sl))
+    return data
+
+
+def _conv_financial_dates(df):
+    '''
+    向量化转换财务数据的日期字段为'YYYYMMDD'字符串，m_anntime缺失时取m_timetag，无效时间为空字符串
+    '''
     import pandas as pd
+
+    def _values(key):
+        return pd.to_numeric(df[key], errors = 'coerce').to_numpy(dtype = 'float64')
+
+    timetags = {key: _values(key) for key in ('m_anntime', 'm_timetag', 'declareDate', 'endDate') if key in df.columns}
+    if 'm_anntime' in timetags and 'm_timetag' in timetags:
+        import numpy as np
+        anntime = timetags['m_anntime']
+        timetags['m_anntime'] = np.where(np.isnan(anntime), timetags['m_timetag'], anntime)
+
+    for key, values in timetags.items():
+        res = _timetag_array_to_datetime(values, '%Y%m%d')
+        df[key] = pd.Series(res, index = df.index, dtype = object).fillna('')
+    return df
+
+
+def get_financial_data(stock_list, table_list=[], start_time='', end_time='', report_type='report_time', workers = 1):
+    '''
+     获取财务数据
+    :param stock_list: (list)合约代码列表
+    :param table_list: (list)报表名称列表
+    :param start_time: (str)起始时间
+    :param end_time: (str)结束时间
+    :param report_type: (str) 时段筛选方式 'announce_time' / 'report_time'
+    :param workers: (int)并发请求的线程数，默认1为顺序请求
+    :return:
+        field: list[str]
+        date: list[int]
+        stock: list[str]
+        value: list[list[float]]
+    '''
+    import pandas as pd
+
+    req_list, names = _get_financial_request(table_list)
+    data = _get_financial_data_chunks(stock_list, req_list, start_time, end_time, report_type, workers)
+
+    result = {}
     for stock in data:
         stock_data = data[stock]
         result[stock] = {}
         for table in stock_data:
-            table_data = stock_data[table]
-            for row_data in table_data:
-                conv_date(row_data, 'm_anntime', 'm_timetag')
-                conv_date(row_data, 'm_timetag', '')
-                conv_date(row_data, 'declareDate', '')
-                conv_date(row_data, 'endDate', '')
-            result[stock][names.get(table, table)] = pd.DataFrame(table_data)
+            df = pd.DataFrame(stock_data[table])
+            if len(df) > 0:
+                _conv_financial_dates(df)
+            result[stock][names.get(table, table)] = df
     return result
 
 
-def get_financial_data_ori(stock_list, table_list=[], start_time='', end_time='', report_type='report_time'):
-    client = get_client()
-    all_table = {
-        'Balance' : 'ASHAREBALANCESHEET'
-        , 'Income' : 'ASHAREINCOME'
-        , 'CashFlow' : 'ASHARECASHFLOW'
-        , 'Capital' : 'CAPITALSTRUCTURE'
-        , 'HolderNum' : 'SHAREHOLDER'
-        , 'Top10Holder' : 'TOP10HOLDER'
-        , 'Top10FlowHolder' : 'TOP10FLOWHOLDER'
-        , 'PershareIndex' : 'PERSHAREINDEX'
-    }
+def get_financial_data_table(stock_list, table_list=[], start_time='', end_time='', report_type='report_time', workers = 1):
+    '''
+    获取财务数据，每张报表的全部合约数据合并为一张长表
+    :param stock_list: (list)合约代码列表
+    :param table_list: (list)报表名称列表
+    :param start_time: (str)起始时间
+    :param end_time: (str)结束时间
+    :param report_type: (str) 时段筛选方式 'announce_time' / 'report_time'
+    :param workers: (int)并发请求的线程数，默认1为顺序请求
+    :return: { table: pd.DataFrame }
+        'stock'列为合约代码，其余字段与get_financial_data一致
+    '''
+    import pandas as pd
 
-    if not table_list:
-        table_list = list(all_table.keys())
+    req_list, names = _get_financial_request(table_list)
+    data = _get_financial_data_chunks(stock_list, req_list, start_time, end_time, report_type, workers)
 
-    all_table_upper = {table.upper() : all_table[table] for table in all_table}
-    req_list = []
-    names = {}
-    for table in table_list:
-        req_table = all_table_upper.get(table.upper(), table)
-        req_list.append(req_table)
-        names[req_table] = table
+    rows = {}
+    stocks = {}
+    for stock in data:
+        for table, table_data in data[stock].items():
+            rows.setdefault(table, []).extend(table_data)
+            stocks.setdefault(table, []).extend([stock] * len(table_data))
 
-    data = {}
-    sl_len = 20
-    stock_list2 = [stock_list[i : i + sl_len] for i in range(0, len(stock_list), sl_len)]
-    for sl in stock_list2:
-        data2 = client.get_financial_data(sl, req_list, start_time, end_time, report_type)
-        for s in data2:
-            data[s] = data2[s]
-    return data
+    result = {}
+    for table in dict.fromkeys(req_list + list(rows)):
+        df = pd.DataFrame(rows.get(table, []))
+        if len(df) > 0:
+            _conv_financial_dates(df)
+        df.insert(0, 'stock', stocks.get(table, []))
+        result[names.get(table, table)] = df
+    return result
+
+
+def get_financial_data_ori(stock_list, table_list=[], start_time='', end_time='', report_type='report_time'):
+    req_list, names = _get_financial_request(table_list)
+    return _get_financial_data_chunks(stock_list, req_list, start_time, end_time, report_type)
 
 
 def get_market_data_ori(
@@ -569,7 +624,7 @@ def get_market_data_ex(
         for s in ori_data:
             sdata = pd.DataFrame(ori_data[s], columns = fl2)
             sdata2 = sdata[fl]
-            sdata2.index = [timetag_to_datetime(t, stime_fmt) for t in sdata[ifield]]
+            sdata2.index = _timetag_array_to_datetime(sdata[ifield], stime_fmt)
             result[s] = sdata2
     else:
         needconvert, metaid  = _needconvert_period(spec_period)
@@ -587,12 +642,12 @@ def get_market_data_ex(
 
                 sdata = pd.DataFrame(odata)
                 if ifield in sdata.columns:
-                    sdata.index = [timetag_to_datetime(t, stime_fmt) for t in sdata[ifield]]
+                    sdata.index = _timetag_array_to_datetime(sdata[ifield], stime_fmt)
                 result[s] = sdata
         else:
             for s in ori_data:
                 sdata = pd.DataFrame(ori_data[s])
-                sdata.index = [timetag_to_datetime(t, stime_fmt) for t in sdata[ifield]]
+                sdata.index = _timetag_array_to_datetime(sdata[ifield], stime_fmt)
                 result[s] = sdata
 
     return result
@@ -821,7 +876,7 @@ def _get_market_data_ex_tuple_period_ori(
 
         cdata_list = []
         for data in data_list:
-            cdata_list.append(_BSON_.BSON.decode(data))
+            cdata_list.append(_BSON_.decode_fast(data))
 
         ori_data[stockcode] = cdata_list
 
@@ -899,12 +954,12 @@ def get_local_data(field_list=[], stock_list=[], period='1d', start_time='', end
         for s in ori_data:
             sdata = pd.DataFrame(ori_data[s], columns = fl2)
             sdata2 = sdata[fl]
-            sdata2.index = [timetag_to_datetime(t, stime_fmt) for t in sdata[ifield]]
+            sdata2.index = _timetag_array_to_datetime(sdata[ifield], stime_fmt)
             result[s] = sdata2
     else:
         for s in ori_data:
             sdata = pd.DataFrame(ori_data[s])
-            sdata.index = [timetag_to_datetime(t, stime_fmt) for t in sdata[ifield]]
+            sdata.index = _timetag_array_to_datetime(sdata[ifield], stime_fmt)
             result[s] = sdata
 
     return result
@@ -1113,6 +1168,41 @@ def timetag_to_datetime(timetag, format):
     return timetagToDateTime(timetag, format)
 
 
+def _timetag_array_to_datetime(timetags, format):
+    '''
+    将毫秒时间戳数组批量转换成日期时间字符串（向量化，固定东八区偏移，与_get_market_data_ex_221207一致）
+    :param timetags: (array-like)时间戳毫秒数
+    :param format: (str)时间格式
+    :return: np.ndarray 无效时间戳对应位置为None
+    '''
+    import numpy as np
+
+    values = np.asarray(timetags)
+    if values.dtype.kind not in 'iuf':
+        # object等类型的列（含None或非数值）按无效时间戳处理，与逐个调用timetag_to_datetime一致
+        import pandas as pd
+        values = pd.to_numeric(pd.Series(values.ravel(), dtype = object), errors = 'coerce').to_numpy(dtype = 'float64')
+    if len(values) == 0:
+        return np.array([], dtype = object)
+    valid = np.isfinite(values) if values.dtype.kind == 'f' else np.ones(len(values), dtype = bool)
+    ms = np.where(valid, values, 0).astype('int64') + 28800000
+    dts = ms.astype('datetime64[ms]')
+
+    if format == '%Y%m%d%H%M%S':
+        iso = np.datetime_as_string(dts, unit = 's')
+        res = np.char.replace(np.char.replace(np.char.replace(iso, '-', ''), 'T', ''), ':', '')
+    elif format == '%Y%m%d':
+        res = np.char.replace(np.datetime_as_string(dts, unit = 'D'), '-', '')
+    else:
+        import pandas as pd
+        res = pd.DatetimeIndex(dts).strftime(format).to_numpy()
+
+    if not valid.all():
+        res = res.astype(object)
+        res[~valid] = None
+    return res
+
+
 @try_except
 def timetagToDateTime(timetag, format):
     import time
@@ -1154,7 +1244,7 @@ def subscribe_callback_wrapper(callback):
     def subscribe_callback(datas):
         try:
             if type(datas) == bytes:
-                datas = _BSON_.BSON.decode(datas)
+                datas = _BSON_.decode_fast(datas)
             if callback:
                 callback(datas)
         except:
@@ -1167,7 +1257,7 @@ def subscribe_callback_wrapper_1820(callback):
     def subscribe_callback(datas):
         try:
             if type(datas) == bytes:
-                datas = _BSON_.BSON.decode(datas)
+                datas = _BSON_.decode_fast(datas)
             datas = _covert_hk_broke_data(datas)
             if callback:
                 callback(datas)
@@ -1178,21 +1268,29 @@ def subscribe_callback_wrapper_1820(callback):
     return subscribe_callback
 
 
+def subscribe_decoder_convert(metaid):
+    convert_field_list = get_field_list(metaid)
+    def subscribe_decoder(datas):
+        if type(datas) == bytes:
+            datas = _BSON_.decode_fast(datas)
+        if convert_field_list:
+            for s in datas:
+                sdata = datas[s]
+                convert_data_list = []
+                for data in sdata:
+                    convert_data = _convert_component_info(data, convert_field_list)
+                    convert_data_list.append(convert_data)
+                datas[s] = convert_data_list
+        return datas
+    return subscribe_decoder
+
+
 def subscribe_callback_wrapper_convert(callback, metaid):
     import traceback
-    convert_field_list = get_field_list(metaid)
+    decoder = subscribe_decoder_convert(metaid)
     def subscribe_callback(datas):
         try:
-            if type(datas) == bytes:
-                datas = _BSON_.BSON.decode(datas)
-            if convert_field_list:
-                for s in datas:
-                    sdata = datas[s]
-                    convert_data_list = []
-                    for data in sdata:
-                        convert_data = _convert_component_info(data, convert_field_list)
-                        convert_data_list.append(convert_data)
-                    datas[s] = convert_data_list
+            datas = decoder(datas)
             if callback:
                 callback(datas)
         except:
@@ -1236,6 +1334,7 @@ def subscribe_quote2(stock_code, period='1d', start_time='', end_time='', count=
     :param callback:
         订阅回调函数onSubscribe(datas)
         :param datas: {stock : [data1, data2, ...]} 数据字典
+        也可以传入QuoteDispatcher，推送在分发器的线程中解码并按间隔批量回调
     :return: int 订阅序号
     '''
     import datetime as dt
@@ -1244,7 +1343,17 @@ def subscribe_quote2(stock_code, period='1d', start_time='', end_time='', count=
     if isinstance(end_time, dt.datetime):
         end_time = int(end_time.timestamp() * 1000)
 
-    if callback:
+    if isinstance(callback, QuoteDispatcher):
+        # 分发器在自身的解码线程中解码，行情线程只入队
+        # 解码函数与合并方式按订阅绑定，同一分发器可用于多个不同周期的订阅
+        needconvert, metaid = _needconvert_period(period)
+        decoder = None
+        if needconvert:
+            decoder = subscribe_decoder_convert(metaid)
+        elif period == 'brokerqueue2':
+            decoder = lambda datas: _covert_hk_broke_data(_BSON_.decode_fast(datas) if type(datas) == bytes else datas)
+        callback = callback.subscriber(decoder, period)
+    elif callback:
         needconvert, metaid = _needconvert_period(period)
         if needconvert:
             callback = subscribe_callback_wrapper_convert(callback, metaid)
@@ -1479,6 +1588,7 @@ def subscribe_whole_quote(code_list, callback = None):
                 pass
             datas:
                 {stock1 : data1, stock2 : data2, ...}
+            也可以传入QuoteDispatcher，推送在分发器的线程中解码，按代码合并后批量回调
     返回:
         int 订阅号
     示例:
@@ -1491,7 +1601,9 @@ def subscribe_whole_quote(code_list, callback = None):
         datas: dict
             {'000001.SZ': {'time': 1733118954000, 'lastPrice': 11.39, 'open': 11.39, 'high': 11.4, 'low': 11.31, 'lastClose': 11.38, 'amount': 862127800.0, 'volume': 758613, 'pvolume': 75861284, 'stockStatus': 3, 'openInt': 13, 'transactionNum': 37062, 'lastSettlementPrice': 11.38, 'settlementPrice': 0.0, 'pe': 0.0, 'askPrice': [11.4, 11.41, 11.42, 11.43, 11.44], 'bidPrice': [11.39, 11.38, 11.370000000000001, 11.36, 11.35], 'askVol': [10929, 12401, 6671, 4555, 6708], 'bidVol': [2429, 7127, 7146, 9111, 12189], 'volRatio': 0.0, 'speed1Min': 0.0, 'speed5Min': 0.0}}
     '''
-    if callback:
+    if isinstance(callback, QuoteDispatcher):
+        callback = callback.subscriber()
+    elif callback:
         callback = subscribe_callback_wrapper(callback)
 
     param = {'needCallback': callback != None}
@@ -1745,6 +1857,10 @@ def get_instrument_detail(stock_code, iscomplete = False):
     '''
 
     inst = _get_instrument_detail(stock_code)
+    return _format_instrument_detail(inst, iscomplete)
+
+
+def _format_instrument_detail(inst, iscomplete = False):
     if not inst:
         return None
 
@@ -1832,7 +1948,7 @@ def get_instrument_detail(stock_code, iscomplete = False):
     return ret
 
 
-def get_instrument_detail_list(stock_list, iscomplete = False):
+def get_instrument_detail_list(stock_list, iscomplete = False, use_cache = False):
     '''
     获取合约信息列表
 
@@ -1840,13 +1956,115 @@ def get_instrument_detail_list(stock_list, iscomplete = False):
         股票代码列表 [ stock1, stock2,... ]
     iscomplete: bool
         是否返回完整信息，默认False，只返回部分信息
+    use_cache: bool
+        是否使用当日缓存，默认False
 
     return: dict
         合约信息列表 { stock1: inst1, stock2: inst2, ... }
             stock: 股票代码
             inst: 合约信息字典，格式同get_instrument_detail返回值
     '''
-    return {s: get_instrument_detail(s, iscomplete) for s in stock_list}
+    insts = _get_instrument_detail_batch(stock_list, use_cache)
+    return {s: _format_instrument_detail(dict(inst) if inst else inst, iscomplete) for s, inst in insts.items()}
+
+
+__instrument_detail_cache = {}
+__instrument_detail_cache_date = None
+
+
+def _get_instrument_detail_batch(stock_list, use_cache = True):
+    '''
+    批量获取合约原始信息，按日缓存（合约名称、股本、涨跌停价等盘中不变，同一日内只请求一次）
+    重复的代码只请求一次，请求结果无论是否使用缓存都会更新当日缓存
+    :param stock_list: (list)股票代码列表
+    :param use_cache: (bool)是否使用当日缓存
+    :return: dict { stock: inst }，合约不存在时inst为None，inst为缓存中的原始字典，调用方不应修改
+    '''
+    global __instrument_detail_cache_date
+
+    today = _TIME_.strftime('%Y%m%d')
+    if __instrument_detail_cache_date != today:
+        __instrument_detail_cache.clear()
+        __instrument_detail_cache_date = today
+
+    codes = list(dict.fromkeys(stock_list))
+    if use_cache:
+        missing = [s for s in codes if s not in __instrument_detail_cache]
+    else:
+        missing = codes
+
+    for s in missing:
+        __instrument_detail_cache[s] = _get_instrument_detail(s)
+
+    return {s: __instrument_detail_cache.get(s) for s in stock_list}
+
+
+def _get_instrument_board(stock_code, exchange_id):
+    '''
+    根据代码判断股票所属板块
+    :return: str '主板'/'创业板'/'科创板'/'北交所'，非沪深京市场返回''
+    '''
+    code, _, market = stock_code.partition('.')
+    market = market or exchange_id
+    if market == 'BJ':
+        return '北交所'
+    if market not in ('SH', 'SZ'):
+        return ''
+    if code.startswith(('688', '689')):
+        return '科创板'
+    if code.startswith('30'):
+        return '创业板'
+    return '主板'
+
+
+def get_instrument_detail_table(stock_list, use_cache = True):
+    '''
+    批量获取合约信息，以列式表格返回
+
+    stock_list: list
+        股票代码列表 [ stock1, stock2,... ]
+    use_cache: bool
+        是否使用当日缓存，默认True，同一日内重复请求的代码不再请求客户端
+
+    return: pd.DataFrame
+        index为股票代码，合约不存在的代码不返回
+        columns = ['name', 'exchange', 'board', 'open_date', 'float_volume', 'total_volume',
+                   'pre_close', 'up_stop_price', 'down_stop_price', 'is_st', 'instrument_status', 'trading_day']
+    '''
+    import pandas as pd
+
+    columns = ['name', 'exchange', 'board', 'open_date', 'float_volume', 'total_volume',
+               'pre_close', 'up_stop_price', 'down_stop_price', 'is_st', 'instrument_status', 'trading_day']
+    insts = _get_instrument_detail_batch(stock_list, use_cache)
+
+    codes = []
+    data = {c: [] for c in columns}
+    for s, inst in insts.items():
+        if not inst:
+            continue
+        name = inst.get('InstrumentName', '')
+        exchange = inst.get('ExchangeID', '')
+        float_volume = inst.get('FloatVolume')
+        total_volume = inst.get('TotalVolume')
+
+        codes.append(s)
+        data['name'].append(name)
+        data['exchange'].append(exchange)
+        data['board'].append(_get_instrument_board(s, exchange))
+        data['open_date'].append(str(inst.get('OpenDate', '')))
+        data['float_volume'].append(float_volume if float_volume is not None else inst.get('FloatVolumn'))
+        data['total_volume'].append(total_volume if total_volume is not None else inst.get('TotalVolumn'))
+        data['pre_close'].append(inst.get('PreClose'))
+        data['up_stop_price'].append(inst.get('UpStopPrice'))
+        data['down_stop_price'].append(inst.get('DownStopPrice'))
+        data['is_st'].append('ST' in name.upper())
+        data['instrument_status'].append(inst.get('InstrumentStatus'))
+        data['trading_day'].append(str(inst.get('TradingDay', '')))
+
+    df = pd.DataFrame(data, index = pd.Index(codes, name = 'code'), columns = columns)
+    for c in ('float_volume', 'total_volume', 'pre_close', 'up_stop_price', 'down_stop_price'):
+        df[c] = pd.to_numeric(df[c], errors = 'coerce')
+    return df
 
 
 def download_index_weight():
@@ -1964,7 +2182,9 @@ def download_history_data2(stock_list, period, start_time='', end_time='', callb
         param['metaid'] = meta_id
         param['period'] = period_num
 
+    import threading
     status = [False, 0, 1, '', {}]
+    done_event = threading.Event()
     def on_progress(data):
         try:
             finished = data['finished']
@@ -1976,7 +2196,7 @@ def download_history_data2(stock_list, period, start_time='', end_time='', callb
 
             if finished == total:
                 if 'result' in data:
-                    regino_result = _BSON_.BSON.decode(data.get('result'))
+                    regino_result = _BSON_.decode_fast(data.get('result'))
                     for stock, info in regino_result.items():
                         info['start_time'] = dt.datetime.fromtimestamp(info.get('start_time') / 1000)
                         info['end_time'] = dt.datetime.fromtimestamp(info.get('end_time') / 1000)
@@ -1986,6 +2206,8 @@ def download_history_data2(stock_list, period, start_time='', end_time='', callb
             status[0] = done
             status[1] = finished
             status[2] = total
+            if done:
+                done_event.set()
 
             try:
                 if callback:
@@ -1997,13 +2219,14 @@ def download_history_data2(stock_list, period, start_time='', end_time='', callb
         except:
             status[0] = True
             status[3] = data.get('message', '')
+            done_event.set()
             return True
     result = client.supply_history_data2(stock_list, spec_period, start_time, end_time, _BSON_.BSON.encode(param), on_progress)
     if not result:
         import time
         try:
             while not status[0] and client.is_connected():
-                _TIME_.sleep(0.1)
+                done_event.wait(0.1)
         except:
             if status[1] < status[2]:
                 client.stop_supply_history_data2()
@@ -2014,7 +2237,7 @@ def download_history_data2(stock_list, period, start_time='', end_time='', callb
             raise Exception('下载数据失败：' + status[3])
     else:
         while not status[0] and client.is_connected():
-            _TIME_.sleep(0.1)
+            done_event.wait(0.1)
 
     return status[4]
 
@@ -3066,7 +3289,7 @@ class QuoteServer:
         return
 
     def _BSON_call_common(self, interface, func, param):
-        return _BSON_.BSON.decode(interface(func, _BSON_.BSON.encode(param)))
+        return _BSON_.decode_fast(interface(func, _BSON_.BSON.encode(param)))
 
     def __str__(self):
         return str(self.info)
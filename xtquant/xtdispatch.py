@@ -0,0 +1,298 @@
+#coding:utf-8
+'''
+行情推送分发
+
+订阅回调默认在客户端的行情线程中同步执行（包括BSON解码），回调耗时会阻塞后续推送。
+QuoteDispatcher将推送处理拆分为三段：
+    1. 行情线程：on_push只将原始推送放入有界队列后立即返回，队列满时丢弃最旧的推送
+    2. 解码线程：解码推送，按代码合并，每隔interval秒生成一个批次
+    3. 消费者线程：每个消费者一个有界批次队列与一个线程，队列满时将最旧的两个批次合并
+
+合并方式按订阅区分：K线周期的推送按代码追加K线列表，其他推送（分笔、全推快照等）按代码保留最新数据
+同一分发器可用于多个订阅，每个订阅通过subscriber()生成各自的回调（解码函数与合并方式互不影响）
+
+示例:
+    dispatcher = QuoteDispatcher(interval = 0.2)
+    dispatcher.add_consumer(on_data)
+    dispatcher.start()
+    seq = xtdata.subscribe_whole_quote(['SH', 'SZ'], dispatcher)
+    seq = xtdata.subscribe_quote('000001.SZ', '1m', callback = dispatcher)
+'''
+
+import time as _TIME_
+import queue as _QUEUE_
+import threading as _THREADING_
+import traceback as _TRACEBACK_
+from collections import deque as _DEQUE_
+
+from . import xtbson as _BSON_
+
+# K线周期，推送按代码追加K线列表，不合并为最新一条
+KLINE_PERIODS = {'1m', '5m', '15m', '30m', '1h', '60m', '1d', '1w', '1mon', '1q', '1hy', '1y'}
+
+
+def _merge(batch, batch_append, datas, datas_append):
+    '''
+    将datas合并到batch（原地修改）
+    :param batch: {stock: data} 合并目标
+    :param batch_append: set 合并目标中按K线追加的代码
+    :param datas: {stock: data} 新数据
+    :param datas_append: set 新数据中按K线追加的代码
+    '''
+    for code, data in datas.items():
+        if code in datas_append and code in batch_append and code in batch:
+            batch[code] = list(batch[code]) + list(data)
+        else:
+            batch[code] = data
+        if code in datas_append:
+            batch_append.add(code)
+        else:
+            batch_append.discard(code)
+
+
+class _Consumer:
+    def __init__(self, name, callback, queue_size):
+        self.name = name
+        self.callback = callback
+        self.queue_size = queue_size
+        self.batches = _DEQUE_()
+        self.cond = _THREADING_.Condition()
+        self.thread = None
+        self.running = False
+
+        self.delivered = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.last_seq = 0
+        self.last_delay = 0.0
+        self.max_delay = 0.0
+
+    def put(self, seq, created, batch, append):
+        with self.cond:
+            self.batches.append((seq, created, batch, append))
+            while len(self.batches) > self.queue_size:
+                # 队列已满，合并最旧的两个批次，K线追加，其他数据以较新的覆盖较旧的
+                _, _, oldest, oldest_append = self.batches.popleft()
+                next_seq, next_created, next_batch, next_append = self.batches.popleft()
+                merged, merged_append = dict(oldest), set(oldest_append)
+                _merge(merged, merged_append, next_batch, next_append)
+                self.batches.appendleft((next_seq, next_created, merged, merged_append))
+                self.coalesced += 1
+            self.cond.notify()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while self.running and not self.batches:
+                    self.cond.wait()
+                if not self.batches:
+                    return
+                seq, created, batch, _ = self.batches.popleft()
+
+            delay = _TIME_.time() - created
+            self.last_delay = delay
+            self.max_delay = max(self.max_delay, delay)
+            try:
+                self.callback(batch)
+            except:
+                self.errors += 1
+                print('dispatch callback error:', self.callback)
+                _TRACEBACK_.print_exc()
+            self.delivered += 1
+            self.last_seq = seq
+
+
+class QuoteDispatcher:
+    def __init__(self, interval = 0.1, raw_queue_size = 10000, consumer_queue_size = 64, decoder = None):
+        '''
+        :param interval: (float)批次间隔（秒），间隔内同一代码的多次推送合并为一次（K线追加，其他数据保留最新）
+        :param raw_queue_size: (int)原始推送队列长度
+        :param consumer_queue_size: (int)消费者批次队列的默认长度
+        :param decoder: 默认的推送数据解码函数，默认对bytes使用BSON快速解码（订阅可通过subscriber()单独指定）
+        '''
+        self.interval = interval
+        self.consumer_queue_size = consumer_queue_size
+        self.decoder = decoder
+        self._raw = _QUEUE_.Queue(maxsize = raw_queue_size)
+        self._consumers = {}
+        self._lock = _THREADING_.Lock()
+        self._thread = None
+        self._running = False
+        self._seq = 0
+
+        self.received = 0
+        self.dropped = 0
+        self.decode_errors = 0
+        self.batches = 0
+
+    def on_push(self, datas, decoder = None, append = False):
+        '''
+        订阅回调，在行情线程中执行，只入队不处理
+        :param datas: 推送数据
+        :param decoder: 该推送的解码函数，None时使用分发器默认的解码函数
+        :param append: (bool)是否按K线追加合并
+        '''
+        self.received += 1
+        while True:
+            try:
+                self._raw.put_nowait((datas, decoder, append))
+                return
+            except _QUEUE_.Full:
+                try:
+                    self._raw.get_nowait()
+                    self.dropped += 1
+                except _QUEUE_.Empty:
+                    pass
+
+    def __call__(self, datas):
+        self.on_push(datas)
+
+    def subscriber(self, decoder = None, period = None):
+        '''
+        生成单个订阅的推送回调
+        :param decoder: 该订阅的解码函数，None时使用分发器默认的解码函数
+        :param period: (str)订阅周期，K线周期的推送按代码追加，其他周期按代码保留最新数据
+        :return: 订阅回调函数callback(datas)
+        '''
+        append = period in KLINE_PERIODS
+        def on_push(datas):
+            self.on_push(datas, decoder, append)
+        return on_push
+
+    def add_consumer(self, callback, name = None, queue_size = None):
+        '''
+        添加消费者
+        :param callback: 批次回调函数callback(datas)，datas: {stock: data} 间隔内各代码的最新数据
+        :param name: (str)消费者名称，默认使用自增序号
+        :param queue_size: (int)批次队列长度，默认consumer_queue_size
+        :return: str 消费者名称
+        '''
+        with self._lock:
+            if name is None:
+                name = str(len(self._consumers))
+            if name in self._consumers:
+                raise Exception(f'消费者已存在: {name}')
+            consumer = _Consumer(name, callback, queue_size or self.consumer_queue_size)
+            self._consumers[name] = consumer
+            if self._running:
+                self._start_consumer(consumer)
+        return name
+
+    def remove_consumer(self, name, timeout = None):
+        '''
+        移除消费者，已入队的批次处理完后线程退出
+        '''
+        with self._lock:
+            consumer = self._consumers.pop(name, None)
+        if consumer:
+            self._stop_consumer(consumer, timeout)
+        return consumer is not None
+
+    def _start_consumer(self, consumer):
+        consumer.running = True
+        consumer.thread = _THREADING_.Thread(target = consumer.run, name = f'QuoteDispatcher-{consumer.name}', daemon = True)
+        consumer.thread.start()
+
+    def _stop_consumer(self, consumer, timeout = None):
+        with consumer.cond:
+            consumer.running = False
+            consumer.cond.notify()
+        if consumer.thread:
+            consumer.thread.join(timeout)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        with self._lock:
+            for consumer in self._consumers.values():
+                self._start_consumer(consumer)
+        self._thread = _THREADING_.Thread(target = self._run, name = 'QuoteDispatcher', daemon = True)
+        self._thread.start()
+
+    def stop(self, timeout = None):
+        '''
+        停止分发，已接收的推送处理完后线程退出
+        '''
+        if not self._running:
+            return
+        self._running = False
+        self._thread.join(timeout)
+        with self._lock:
+            consumers = list(self._consumers.values())
+        for consumer in consumers:
+            self._stop_consumer(consumer, timeout)
+
+    def _decode(self, datas, decoder = None):
+        decoder = decoder or self.decoder
+        if decoder:
+            return decoder(datas)
+        if isinstance(datas, (bytes, bytearray, memoryview)):
+            return _BSON_.decode_fast(datas)
+        return datas
+
+    def _run(self):
+        pending, pending_append = {}, set()
+        deadline = _TIME_.time() + self.interval
+        while True:
+            timeout = deadline - _TIME_.time()
+            try:
+                datas, decoder, append = self._raw.get(timeout = max(timeout, 0)) if timeout > 0 else self._raw.get_nowait()
+                try:
+                    datas = self._decode(datas, decoder)
+                    _merge(pending, pending_append, datas, set(datas) if append else set())
+                except:
+                    self.decode_errors += 1
+                    _TRACEBACK_.print_exc()
+                if timeout > 0:
+                    continue
+            except _QUEUE_.Empty:
+                if not self._running:
+                    break
+
+            if pending:
+                self._publish(pending, pending_append)
+                pending, pending_append = {}, set()
+            deadline = _TIME_.time() + self.interval
+
+        if pending:
+            self._publish(pending, pending_append)
+
+    def _publish(self, batch, append):
+        self._seq += 1
+        self.batches += 1
+        created = _TIME_.time()
+        with self._lock:
+            consumers = list(self._consumers.values())
+        for consumer in consumers:
+            consumer.put(self._seq, created, batch, append)
+
+    def get_stats(self):
+        '''
+        获取分发统计
+        :return: dict
+            received: 接收的推送数, dropped: 原始队列满时丢弃的推送数, decode_errors: 解码失败数
+            , pending: 待解码的推送数, batches: 生成的批次数
+            , consumers: { name: { delivered: 已投递批次数, coalesced: 队列满时被合并的批次数, errors: 回调异常数
+                , queued: 排队中的批次数, lag: 落后的批次数, last_delay / max_delay: 批次生成到开始回调的延迟（秒） } }
+        '''
+        with self._lock:
+            consumers = list(self._consumers.values())
+        return {
+            'received': self.received
+            , 'dropped': self.dropped
+            , 'decode_errors': self.decode_errors
+            , 'pending': self._raw.qsize()
+            , 'batches': self.batches
+            , 'consumers': {
+                c.name: {
+                    'delivered': c.delivered
+                    , 'coalesced': c.coalesced
+                    , 'errors': c.errors
+                    , 'queued': len(c.batches)
+                    , 'lag': self._seq - c.last_seq
+                    , 'last_delay': c.last_delay
+                    , 'max_delay': c.max_delay
+                } for c in consumers
+            },
+        }
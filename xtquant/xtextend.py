@@ -33,6 +33,27 @@ class FileLock:
         this.fhandle = None
         return True
 
+    def wait_unlock(this, timeout = None, interval = 0.01, max_interval = 1.0):
+        '''
+        等待文件锁释放（指数退避）
+        :param timeout: (float)超时时间（秒），None表示一直等待
+        :param interval: (float)首次等待间隔（秒）
+        :param max_interval: (float)最大等待间隔（秒）
+        :return: bool 超时前锁已释放返回True
+        '''
+        import time
+        deadline = None if timeout is None else time.time() + timeout
+        while this.is_lock():
+            if deadline is not None:
+                remain = deadline - time.time()
+                if remain <= 0:
+                    return False
+                time.sleep(min(interval, remain))
+            else:
+                time.sleep(interval)
+            interval = min(interval * 2, max_interval)
+        return True
+
     def clean(this):
         import os
         if not os.path.exists(this.path):
@@ -54,22 +75,35 @@ class Extender:
         import os
         self.base_dir = os.path.join(base_dir, 'EP')
 
-    def read_config(self):
+    def load_config(self, path):
+        '''
+        读取配置文件（不修改实例状态）
+        :param path: (str)因子数据目录
+        :return: (stocklist, timedatelist)，配置为空时返回None
+        '''
         import json, os
         data = None
-        with open(os.path.join(self.file, 'config'), 'r', encoding='utf-8') as f:
+        with open(os.path.join(path, 'config'), 'r', encoding='utf-8') as f:
             data = json.loads(f.read())
 
-        if data:
-            self.stocklist = []
-            for i in range(1, len(data['stocklist']), 2):
-                for stock in data['stocklist'][i]:
-                    self.stocklist.append("%s.%s" % (stock, data['stocklist'][i - 1]))
+        if not data:
+            return None
+
+        stocklist = []
+        for i in range(1, len(data['stocklist']), 2):
+            for stock in data['stocklist'][i]:
+                stocklist.append("%s.%s" % (stock, data['stocklist'][i - 1]))
+        return stocklist, data['tradedatelist']
 
-            self.timedatelist = data['tradedatelist']
+    def read_config(self):
+        config = self.load_config(self.file)
+        if config:
+            self.stocklist, self.timedatelist = config
 
-    def read_data(self, data, time_indexs, stock_length):
+    def read_data(self, data, time_indexs, stock_length, timedatelist = None):
         from ctypes import c_float, c_short, sizeof, cast, POINTER
+        if timedatelist is None:
+            timedatelist = self.timedatelist
         res = {}
         num = (sizeof(self.value_type) + sizeof(self.rank_type)) * stock_length
         for time_index in time_indexs:
@@ -78,61 +112,231 @@ class Extender:
             values = cast(value_data, POINTER(c_float))
             rank_data = data[index + sizeof(self.value_type) * stock_length: index + num]
             ranks = cast(rank_data, POINTER(c_short))
-            res[self.timedatelist[time_index]] = [(round(values[i], 3), ranks[i]) for i in range(stock_length)]
+            res[timedatelist[time_index]] = [(round(values[i], 3), ranks[i]) for i in range(stock_length)]
 
         return res
 
-    def format_time(self, times):
+    def get_record_dtype(self, stock_length):
+        '''
+        单个交易日数据块的numpy结构化类型：stock_length个因子值，其后为stock_length个排名
+        :param stock_length: (int)股票数量
+        :return: np.dtype
+        '''
+        import numpy as np
+        from ctypes import sizeof
+        value_dtype = np.dtype('<f%d' % sizeof(self.value_type))
+        rank_dtype = np.dtype('<i%d' % sizeof(self.rank_type))
+        return np.dtype([('value', value_dtype, (stock_length,)), ('rank', rank_dtype, (stock_length,))])
+
+    def map_data(self, file):
+        '''
+        以内存映射方式打开因子数据文件（不读取、不复制数据）
+        :param file: (str)因子名称
+        :return: (stocklist, timedatelist, records)
+            records: np.memmap 结构化数组，形状为(交易日数,)，records['value']/records['rank']为(交易日数, 股票数)的视图
+            数据文件不存在时返回None
+        '''
+        import os
+        import numpy as np
+        self.file = os.path.join(self.base_dir, file + '_Xdat')
+        if not os.path.isdir(self.file):
+            return None
+
+        self.read_config()
+        record_dtype = self.get_record_dtype(len(self.stocklist))
+        data_path = os.path.join(self.file, 'data')
+        # 文件中可能只写入了部分交易日，按实际完整记录数映射
+        record_count = min(len(self.timedatelist), os.path.getsize(data_path) // record_dtype.itemsize)
+        if record_count == 0:
+            records = np.empty(0, dtype = record_dtype)
+        else:
+            records = np.memmap(data_path, dtype = record_dtype, mode = 'r', shape = (record_count,))
+        return self.stocklist, self.timedatelist[:record_count], records
+
+    def read_data_array(self, file, start_time = None, end_time = None):
+        '''
+        按日期区间读取因子数据（零拷贝，只访问所请求交易日所在的页）
+        :param file: (str)因子名称
+        :param start_time: 起始时间，'YYYYMMDD'或毫秒时间戳，None表示不限
+        :param end_time: 结束时间，'YYYYMMDD'或毫秒时间戳，None表示不限
+        :return: (stocklist, timedatelist, values, ranks)
+            values: np.ndarray (交易日数, 股票数) 因子值视图
+            ranks: np.ndarray (交易日数, 股票数) 排名视图
+            数据文件不存在时返回None
+        '''
+        import bisect
+        mapped = self.map_data(file)
+        if mapped is None:
+            return None
+
+        stocklist, timedatelist, records = mapped
+        start = 0 if start_time in (None, '') else bisect.bisect_left(timedatelist, self.format_time(start_time))
+        end = len(timedatelist) if end_time in (None, '') else bisect.bisect_right(timedatelist, self.format_time(end_time))
+        records = records[start:end]
+        return stocklist, timedatelist[start:end], records['value'], records['rank']
+
+    def format_time(self, times, timedatelist = None):
         import time
+        if timedatelist is None:
+            timedatelist = self.timedatelist
         if type(times) == str:
             return int(time.mktime(time.strptime(times, '%Y%m%d'))) * 1000
         elif type(times) == int:
             if times < 0:
-                return self.timedatelist[times]
+                return timedatelist[times]
             elif times < ((1 << 31) - 1):
                 return times * 1000
             else:
                 return times
 
-    def show_extend_data(self, file, times):
+    def get_time_index(self, times, timedatelist = None):
+        if timedatelist is None:
+            timedatelist = self.timedatelist
+        time_list = []
+
+        if not times:
+            time_list = timedatelist
+        elif type(times) == list:
+            time_list.extend([self.format_time(i, timedatelist) for i in times])
+        else:
+            time_list.append(self.format_time(times, timedatelist))
+
+        time_pos = {t: i for i, t in enumerate(timedatelist)}
+        return [time_pos[t] for t in time_list if t in time_pos]
+
+    def get_data_version(self, path = None):
+        '''
+        数据文件版本（修改时间与大小），用于判断读取期间文件是否被改写
+        :param path: (str)因子数据目录，None表示当前读取的目录
+        '''
+        import os
+        stat = os.stat(os.path.join(self.file if path is None else path, 'data'))
+        return stat.st_mtime_ns, stat.st_size
+
+    def read_snapshot(self, fs, path):
+        '''
+        不加锁读取配置与数据文件，读取前后文件版本不变且未被加锁时视为一致的快照
+        只使用局部变量，可在多个线程中同时调用
+        :param fs: FileLock 写入方的文件锁
+        :param path: (str)因子数据目录
+        :return: (stocklist, timedatelist, data)，读取期间文件被改写时返回None
+        '''
+        import os
+        version = self.get_data_version(path)
+        config = self.load_config(path)
+        with open(os.path.join(path, 'data'), 'rb') as f:
+            data = f.read()
+        if not config or fs.is_lock() or self.get_data_version(path) != version:
+            return None
+        return config[0], config[1], data
+
+    def show_extend_data(self, file, times, timeout = None, shared = True):
+        '''
+        读取因子数据
+        :param file: (str)因子名称
+        :param times: 时间或时间列表，为空时读取全部交易日
+        :param timeout: (float)等待文件锁的超时时间（秒），None表示一直等待，超时抛出TimeoutError
+        :param shared: (bool)True时以快照方式读取，不独占文件锁，多个读取方互不阻塞；
+            False时与原有方式一致，读取期间独占文件锁
+        :return: (stocklist, {timedate: [(value, rank), ...]})
+        '''
         import time, os
         self.file = os.path.join(self.base_dir, file + '_Xdat')
         if not os.path.isdir(self.file):
             return "No such file"
 
         fs = FileLock(os.path.join(self.file, 'filelock'), False)
+        deadline = None if timeout is None else time.time() + timeout
 
-        while fs.is_lock():
-            print('文件被占用')
-            time.sleep(1)
-        fs.lock()
+        data = None
+        interval = 0.01
+        while data is None:
+            remain = None if deadline is None else max(deadline - time.time(), 0)
+            if not fs.wait_unlock(remain, interval):
+                raise TimeoutError('文件被占用: %s' % self.file)
+            if shared:
+                snapshot = self.read_snapshot(fs, self.file)
+                if snapshot is not None:
+                    self.stocklist, self.timedatelist, data = snapshot
+                    break
+                # 读取期间文件被改写，退避后重新读取，每次重试前检查是否超时
+                if deadline is not None and time.time() >= deadline:
+                    raise TimeoutError('文件被占用: %s' % self.file)
+                time.sleep(interval if deadline is None else min(interval, max(deadline - time.time(), 0)))
+                interval = min(interval * 2, 1.0)
+            else:
+                fs.lock()
+                try:
+                    self.read_config()
+                    with open(os.path.join(self.file, 'data'), 'rb') as f:
+                        data = f.read()
+                finally:
+                    fs.unlock()
 
-        self.read_config()
+        time_index = self.get_time_index(times)
+        res = self.read_data(data, time_index, len(self.stocklist))
+        return self.stocklist, res
 
-        time_list = []
+    async def show_extend_data_async(self, file, times, timeout = None):
+        '''
+        异步读取因子数据（快照方式），等待文件锁时不阻塞事件循环，文件读取在线程池中执行
+        读取结果只保存在局部变量中，同一实例可并发调用
+        参数与返回值同show_extend_data
+        '''
+        import asyncio, time, os
+        path = os.path.join(self.base_dir, file + '_Xdat')
+        if not os.path.isdir(path):
+            return "No such file"
 
-        if not times:
-            time_list = self.timedatelist
-        elif type(times) == list:
-            time_list.extend([self.format_time(i) for i in times])
-        else:
-            time_list.append(self.format_time(times))
+        loop = asyncio.get_running_loop()
+        fs = FileLock(os.path.join(path, 'filelock'), False)
+        deadline = None if timeout is None else time.time() + timeout
 
+        snapshot = None
+        interval = 0.01
+        while snapshot is None:
+            if not fs.is_lock():
+                snapshot = await loop.run_in_executor(None, self.read_snapshot, fs, path)
+                if snapshot is not None:
+                    break
+            if deadline is not None and time.time() >= deadline:
+                raise TimeoutError('文件被占用: %s' % path)
+            await asyncio.sleep(interval if deadline is None else min(interval, max(deadline - time.time(), 0)))
+            interval = min(interval * 2, 1.0)
 
-        time_index = [self.timedatelist.index(time) for time in time_list if self.timedatelist.count(time) != 0]
+        stocklist, timedatelist, data = snapshot
+        time_index = self.get_time_index(times, timedatelist)
+        res = await loop.run_in_executor(None, self.read_data, data, time_index, len(stocklist), timedatelist)
+        return stocklist, res
 
-        stock_length = len(self.stocklist)
-        data = None
-        with open(os.path.join(self.file, 'data'), 'rb') as f:
-            data = f.read()
-        fs.unlock()
-        res = self.read_data(data, time_index, stock_length)
-        return self.stocklist, res
+def show_extend_data(file, times, timeout = None, shared = True):
+    '''
+    读取因子数据，参见Extender.show_extend_data
+    '''
+    import os
+    from . import xtdata as xd
+    exd = Extender(os.path.join(xd.init_data_dir(), '..', 'datadir'))
+
+    return exd.show_extend_data(file, times, timeout, shared)
+
+
+async def show_extend_data_async(file, times, timeout = None):
+    '''
+    异步读取因子数据，参见Extender.show_extend_data_async
+    '''
+    import os
+    from . import xtdata as xd
+    exd = Extender(os.path.join(xd.init_data_dir(), '..', 'datadir'))
+
+    return await exd.show_extend_data_async(file, times, timeout)
 
 
-def show_extend_data(file, times):
+def get_extend_data_array(file, start_time = None, end_time = None):
+    '''
+    以numpy视图读取因子数据，参见Extender.read_data_array
+    '''
     import os
     from . import xtdata as xd
     exd = Extender(os.path.join(xd.init_data_dir(), '..', 'datadir'))
 
-    return exd.show_extend_data(file, times)
+    return exd.read_data_array(file, start_time, end_time)